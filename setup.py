@@ -27,7 +27,7 @@ setuptools.setup(
         'pdfminer.six>=20200726',
         'pyyaml>=5.3.1',
         'requests>=2.24.0',
-        'sqlalchemy>=1.3.19',
+        'sqlalchemy>=1.4.0',
     ],
     entry_points={
         'console_scripts': ['zoia=zoia.cli:zoia'],
@@ -1,16 +1,28 @@
+import hashlib
+import io
 import json
 import os
 import tempfile
+import threading
 import unittest
 import unittest.mock
+from concurrent.futures import Future
 from pathlib import Path
 
 import requests
 
 from ..context import zoia
 from ..fixtures.metadata import ZoiaUnitTest
+from ..parse.test_pdf import _make_pdf
 import zoia.backend.add
+import zoia.backend.config
+import zoia.backend.download
+import zoia.backend.http
 import zoia.backend.json
+from zoia.backend.pdf_pool import ZoiaPdfException
+from zoia.backend.review import ReviewQueue
+from zoia.parse.classification import IdType
+from zoia.parse.pdf import IdentifierCandidate
 
 
 class TestValidateResponse(unittest.TestCase):
@@ -35,8 +47,7 @@ class TestValidateResponse(unittest.TestCase):
 
 
 class TestGetArxivMetadata(unittest.TestCase):
-    @unittest.mock.patch('zoia.backend.add.requests.get')
-    def test__get_arxiv_metadata(self, mock_requests_get):
+    def test__get_arxiv_metadata(self):
         response = unittest.mock.MagicMock()
         response.status_code = 200
         with open(
@@ -46,9 +57,12 @@ class TestGetArxivMetadata(unittest.TestCase):
         ) as fp:
             response.text = fp.read()
 
-        mock_requests_get.return_value = response
+        session = unittest.mock.MagicMock()
+        session.get.return_value = response
 
-        observed_metadata = zoia.backend.add._get_arxiv_metadata('1601.00001')
+        observed_metadata = zoia.backend.add._get_arxiv_metadata(
+            '1601.00001', session
+        )
         expected_metadata = {
             'entry_type': 'article',
             'arxiv_id': '1601.00001',
@@ -64,12 +78,97 @@ class TestGetArxivMetadata(unittest.TestCase):
 
         self.assertEqual(observed_metadata, expected_metadata)
 
+    def test__get_arxiv_metadata_fallback(self):
+        session = unittest.mock.MagicMock()
+        resolvers = zoia.backend.add._Resolvers(
+            session, arxiv_provider=zoia.backend.config.ArxivProvider.ARXIV
+        )
+        resolvers.arxiv = unittest.mock.MagicMock()
+        resolvers.arxiv.get.return_value = {
+            'id': '1601.00001v1',
+            'title': 'Foo',
+            'authors': ['John Doe'],
+            'published': '2015-12-31T21:00:04Z',
+            'doi': None,
+        }
+        resolvers.semantic_scholar = unittest.mock.MagicMock()
+        resolvers.semantic_scholar.get.return_value = {
+            'title': 'Foo',
+            'authors': [{'name': 'John Doe'}],
+            'year': 2016,
+            'externalIds': {'DOI': '10.1000/foo'},
+        }
+
+        metadata = zoia.backend.add._get_arxiv_metadata(
+            '1601.00001', session, resolvers=resolvers
+        )
+        self.assertEqual(metadata['year'], 2015)
+        self.assertNotIn('doi', metadata)
+        resolvers.semantic_scholar.get.assert_not_called()
+
+        # Fall back to Semantic Scholar if arXiv is unavailable.
+        response = requests.Response()
+        response.status_code = 503
+        resolvers.arxiv.get.side_effect = requests.HTTPError(response=response)
+        metadata = zoia.backend.add._get_arxiv_metadata(
+            '1601.00001', session, resolvers=resolvers
+        )
+        self.assertEqual(metadata['year'], 2016)
+        self.assertEqual(metadata['doi'], '10.1000/foo')
+
 
 class TestGetDoiMetadata(unittest.TestCase):
-    @unittest.mock.patch('zoia.backend.add.requests.get')
-    def test__get_doi_metadata(self, mock_requests_get):
+    def test__get_doi_metadata(self):
         response = unittest.mock.MagicMock()
         response.status_code = 200
+        response.headers = {
+            'Content-Type': 'application/vnd.citationstyles.csl+json'
+        }
+        with open(
+            os.path.join(
+                os.path.dirname(__file__), '../fixtures/doi_response.json'
+            )
+        ) as fp:
+            response.text = fp.read()
+
+        session = unittest.mock.MagicMock()
+        session.get.return_value = response
+
+        entry = zoia.backend.add._get_doi_metadata(
+            '10.3847/1538-3881/aa9e09', session
+        )
+        self.assertEqual(
+            session.get.call_args.kwargs['headers'],
+            {'Accept': zoia.backend.add.DOI_ACCEPT},
+        )
+
+        expected_entry = {
+            'entry_type': 'article',
+            'title': (
+                'Identifying Exoplanets with Deep Learning: A Five-planet '
+                'Resonant Chain around Kepler-80 and an Eighth Planet around '
+                'Kepler-90'
+            ),
+            'authors': [
+                ['Christopher J.', 'Shallue'],
+                ['Andrew', 'Vanderburg'],
+            ],
+            'doi': '10.3847/1538-3881/aa9e09',
+            'year': 2018,
+            'month': 'jan',
+            'journal': 'The Astronomical Journal',
+            'volume': '155',
+            'number': '2',
+            'pages': '94',
+            'publisher': 'American Astronomical Society',
+            'url': 'http://dx.doi.org/10.3847/1538-3881/aa9e09',
+        }
+        self.assertEqual(entry, expected_entry)
+
+    def test__get_doi_metadata_bibtex(self):
+        response = unittest.mock.MagicMock()
+        response.status_code = 200
+        response.headers = {'Content-Type': 'application/x-bibtex'}
         with open(
             os.path.join(
                 os.path.dirname(__file__), '../fixtures/doi_response.bib'
@@ -77,15 +176,68 @@ class TestGetDoiMetadata(unittest.TestCase):
         ) as fp:
             response.text = fp.read()
 
-        mock_requests_get.return_value = response
+        session = unittest.mock.MagicMock()
+        session.get.return_value = response
 
-        entry = zoia.backend.add._get_doi_metadata('10.3847/1538-3881/aa9e09')
+        entry = zoia.backend.add._get_doi_metadata(
+            '10.3847/1538-3881/aa9e09', session
+        )
         self.assertEqual(entry['year'], 2018)
         self.assertEqual(
             entry['authors'],
             [['Christopher J.', 'Shallue'], ['Andrew', 'Vanderburg']],
         )
 
+    def test__parse_csl_json_minimal(self):
+        entry = zoia.backend.add._parse_csl_json(
+            {
+                'type': 'dataset',
+                'title': ['Foo'],
+                'author': [{'literal': 'John Doe'}],
+                'published-online': {'date-parts': [[2020]]},
+            },
+            '10.1000/foo',
+        )
+        self.assertEqual(
+            entry,
+            {
+                'entry_type': 'misc',
+                'title': 'Foo',
+                'authors': [['John', 'Doe']],
+                'doi': '10.1000/foo',
+                'year': 2020,
+            },
+        )
+
+    def test__parse_bibtex_no_authors(self):
+        with self.assertRaises(zoia.backend.add.ZoiaAddException):
+            zoia.backend.add._parse_bibtex(
+                '@book{foo, title={Foo}, editor={Doe, John}, year={2020}}'
+            )
+
+    def test__parse_csl_json_invalid_year(self):
+        with self.assertRaises(zoia.backend.add.ZoiaAddException):
+            zoia.backend.add._parse_csl_json(
+                {'title': 'Foo', 'issued': {'date-parts': [['soon']]}},
+                '10.1000/foo',
+            )
+
+    def test__parse_csl_json_no_year(self):
+        with self.assertRaises(RuntimeError):
+            zoia.backend.add._parse_csl_json(
+                {'title': 'Foo', 'issued': {'date-parts': [[None]]}},
+                '10.1000/foo',
+            )
+
+    def test__parse_csl_json_invalid_month(self):
+        for month in [0, 13, 21, None]:
+            entry = zoia.backend.add._parse_csl_json(
+                {'title': 'Foo', 'issued': {'date-parts': [[2020, month]]}},
+                '10.1000/foo',
+            )
+            self.assertEqual(entry['year'], 2020)
+            self.assertNotIn('month', entry)
+
 
 class TestGetIsbnMetadata(unittest.TestCase):
     @unittest.mock.patch('zoia.backend.add.isbnlib.meta')
@@ -99,8 +251,12 @@ class TestGetIsbnMetadata(unittest.TestCase):
             'Language': 'en',
         }
 
+        session = unittest.mock.MagicMock()
         observed_metadata = zoia.backend.add._get_isbn_metadata(
-            '9781400848898'
+            '9781400848898', session
+        )
+        session.rate_limiter.acquire.assert_called_once_with(
+            zoia.backend.add.GOOGLE_BOOKS_URL
         )
 
         expected_metadata = {
@@ -119,17 +275,17 @@ class TestGetIsbnMetadata(unittest.TestCase):
 class TestAddArxivId(unittest.TestCase):
     @unittest.mock.patch('zoia.backend.add._get_doi_metadata')
     @unittest.mock.patch('zoia.backend.add._get_arxiv_metadata')
-    @unittest.mock.patch('zoia.backend.add.requests.get')
     def test__add_arxiv_id(
         self,
-        mock_requests_get,
         mock_get_arxiv_metadata,
         mock_get_doi_metadata,
     ):
         response = unittest.mock.MagicMock()
         response.status_code = 200
-        response.content = b'\xde\xad\xbe\xef'
-        mock_requests_get.return_value = response
+        response.iter_content.return_value = [b'\xde\xad', b'\xbe\xef']
+        response.headers = {}
+        session = unittest.mock.MagicMock()
+        session.get.return_value = response
 
         mock_get_arxiv_metadata.return_value = {
             'arxiv_id': '1601.00001',
@@ -171,7 +327,9 @@ class TestAddArxivId(unittest.TestCase):
                 library_root=library_root, db_root=db_root
             )
             metadata = zoia.backend.json.JSONMetadata(config)
-            zoia.backend.add._add_arxiv_id(metadata, '1601.00001')
+            zoia.backend.add._add_arxiv_id(
+                metadata, '1601.00001', None, session
+            )
 
             document_path = (
                 library_root / 'kilgour+segal16-inelastic/document.pdf'
@@ -197,7 +355,10 @@ class TestAddIsbn(ZoiaUnitTest):
         mock_create_citekey.return_value = mock_citekey
 
         zoia.backend.add._add_isbn(
-            self.metadata, identifier='9781400848898', citekey=None
+            self.metadata,
+            identifier='9781400848898',
+            citekey=None,
+            session=unittest.mock.MagicMock(),
         )
 
         self.assertTrue(
@@ -206,27 +367,28 @@ class TestAddIsbn(ZoiaUnitTest):
 
 
 class TestAddDoi(ZoiaUnitTest):
-    @unittest.mock.patch('zoia.backend.add.requests.get')
     @unittest.mock.patch('zoia.backend.add._get_doi_metadata')
     @unittest.mock.patch('zoia.backend.add.zoia.parse.citekey.create_citekey')
     def test__add_doi(
         self,
         mock_create_citekey,
         mock__get_doi_metadata,
-        mock_requests_get,
     ):
         mock_arxiv_response = unittest.mock.MagicMock()
         mock_arxiv_response.status_code = 200
-        mock_arxiv_response.text = json.dumps({'arxivId': '1504.05957'})
+        mock_arxiv_response.text = json.dumps(
+            {'externalIds': {'ArXiv': '1504.05957'}}
+        )
 
         mock_pdf_response = unittest.mock.MagicMock()
         mock_pdf_response.status_code = 200
-        mock_pdf_response.content = b'%PDF'
+        mock_pdf_response.iter_content.return_value = [b'%PDF']
+        mock_pdf_response.headers = {}
 
-        def requests_side_effect(url):
+        def requests_side_effect(url, **kwargs):
             semantic_scholar_url = (
-                'https://api.semanticscholar.org/v1/paper/10.1093/mnras/'
-                'stv1552'
+                'https://api.semanticscholar.org/graph/v1/paper/'
+                'DOI:10.1093/mnras/stv1552'
             )
             if url == semantic_scholar_url:
                 return mock_arxiv_response
@@ -235,7 +397,8 @@ class TestAddDoi(ZoiaUnitTest):
             else:
                 raise ValueError(f'Bad url {url}')
 
-        mock_requests_get.side_effect = requests_side_effect
+        session = unittest.mock.MagicMock()
+        session.get.side_effect = requests_side_effect
 
         mock__get_doi_metadata.return_value = {
             'authors': [['J.', 'Antognini']],
@@ -247,7 +410,7 @@ class TestAddDoi(ZoiaUnitTest):
         mock_create_citekey.return_value = citekey
 
         zoia.backend.add._add_doi(
-            self.metadata, '10.1093/mnras/stv1552', citekey=None
+            self.metadata, '10.1093/mnras/stv1552', None, session
         )
 
         self.assertTrue(
@@ -257,21 +420,123 @@ class TestAddDoi(ZoiaUnitTest):
         )
 
 
-class TestAddPdf(ZoiaUnitTest):
-    @unittest.mock.patch('zoia.backend.add.click.confirm')
+class TestFetchDoi(unittest.TestCase):
     @unittest.mock.patch('zoia.backend.add._get_doi_metadata')
-    @unittest.mock.patch('zoia.backend.add.zoia.parse.pdf.get_doi_from_pdf')
-    def test__add_pdf(
-        self,
-        mock_get_doi_from_pdf,
-        mock_get_doi_metadata,
-        mock_click_confirm,
+    def test__fetch_doi_downloads_early(self, mock_get_doi_metadata):
+        # The DOI metadata only arrive once the PDF is being downloaded, so
+        # this only finishes if the download doesn't wait for them.
+        pdf_requested = threading.Event()
+
+        def get_doi_metadata(doi, session, cache=None):
+            self.assertTrue(pdf_requested.wait(timeout=5))
+            return {'title': 'Foo', 'authors': [['John', 'Doe']], 'year': 2015}
+
+        mock_get_doi_metadata.side_effect = get_doi_metadata
+
+        def get(url, **kwargs):
+            response = unittest.mock.MagicMock()
+            response.status_code = 200
+            response.headers = {}
+            if 'semanticscholar' in url:
+                response.text = json.dumps(
+                    {'externalIds': {'ArXiv': '1504.05957'}}
+                )
+            else:
+                pdf_requested.set()
+                response.iter_content.return_value = [b'%PDF']
+            return response
+
+        session = unittest.mock.MagicMock()
+        session.get.side_effect = get
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fetched = zoia.backend.add._fetch_doi(
+                '10.1093/mnras/stv1552', session, tmpdir
+            )
+            self.assertEqual(fetched.metadatum['arxiv_id'], '1504.05957')
+            self.assertEqual(fetched.download.size, 4)
+            fetched.download.discard()
+
+        self.assertEqual(
+            set(fetched.timings), {'doi_metadata', 'arxiv_id', 'pdf'}
+        )
+
+    @unittest.mock.patch('zoia.backend.add._get_doi_metadata')
+    def test__fetch_doi_malformed_semantic_scholar_response(
+        self, mock_get_doi_metadata
     ):
-        identifier = os.path.join(self.config.library_root, 'foo.pdf')
-        with open(identifier, 'wb') as fp:
+        mock_get_doi_metadata.return_value = {
+            'title': 'Foo',
+            'authors': [['John', 'Doe']],
+            'year': 2015,
+        }
+        response = unittest.mock.MagicMock()
+        response.status_code = 200
+        response.text = '{"externalIds": '
+        session = unittest.mock.MagicMock()
+        session.get.return_value = response
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fetched = zoia.backend.add._fetch_doi(
+                '10.1093/mnras/stv1552', session, tmpdir
+            )
+
+        self.assertNotIn('arxiv_id', fetched.metadatum)
+        self.assertIsNone(fetched.download)
+        self.assertEqual(
+            fetched.info_messages, ['Was unable to query Semantic Scholar']
+        )
+
+
+class TestGetPdfMd5(unittest.TestCase):
+    @unittest.mock.patch('zoia.backend.add.HASH_BUFFER_SIZE', 7)
+    def test__get_pdf_md5(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / 'foo.pdf'
+            pdf = _make_pdf(['doi:10.1000/foo'])
+            path.write_bytes(pdf)
+            self.assertEqual(
+                zoia.backend.add._get_pdf_md5(str(path)),
+                hashlib.md5(pdf).hexdigest(),
+            )
+
+
+class TestAddPdf(ZoiaUnitTest):
+    def setUp(self):
+        super().setUp()
+        self.identifier = os.path.join(self.config.library_root, 'foo.pdf')
+        with open(self.identifier, 'wb') as fp:
             fp.write(b'%PDF')
 
-        mock_get_doi_from_pdf.return_value = '10.1000/foo'
+    def _patch_metadata_fns(self, metadata_fns):
+        patcher = unittest.mock.patch.dict(
+            zoia.backend.add._METADATA_FNS, metadata_fns
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _add_pdf(self, candidates=(), error=None):
+        search = Future()
+        if error is None:
+            search.set_result(list(candidates))
+        else:
+            search.set_exception(error)
+
+        return zoia.backend.add._add_pdf(
+            self.metadata,
+            self.identifier,
+            citekey=None,
+            session=unittest.mock.MagicMock(),
+            search=search,
+        )
+
+    @unittest.mock.patch('zoia.backend.add.click.confirm')
+    def test__add_pdf(self, mock_click_confirm):
+        mock_get_doi_metadata = unittest.mock.MagicMock()
+        self._patch_metadata_fns({IdType.DOI: mock_get_doi_metadata})
+        candidates = [
+            IdentifierCandidate(IdType.DOI, '10.1000/foo', 13, 'metadata')
+        ]
         mock_metadata = {
             'title': 'Foo',
             'authors': [['John', 'Doe']],
@@ -281,12 +546,575 @@ class TestAddPdf(ZoiaUnitTest):
 
         mock_click_confirm.return_value = True
 
-        zoia.backend.add._add_pdf(
-            self.metadata, identifier, citekey=None, move_paper=False
+        self._add_pdf(candidates)
+
+        self.assertTrue(
+            (
+                Path(self.config.library_root) / 'doe99-foo/document.pdf'
+            ).is_file()
+        )
+        self.assertEqual(self.metadata['doe99-foo']['doi'], '10.1000/foo')
+
+    @unittest.mock.patch('zoia.backend.add.click.confirm')
+    def test__add_pdf_next_candidate(self, mock_click_confirm):
+        mock_get_doi_metadata = unittest.mock.MagicMock()
+        mock_get_arxiv_metadata = unittest.mock.MagicMock()
+        self._patch_metadata_fns(
+            {
+                IdType.DOI: mock_get_doi_metadata,
+                IdType.ARXIV: mock_get_arxiv_metadata,
+            }
+        )
+        candidates = [
+            IdentifierCandidate(IdType.DOI, '10.1000/foo', 3, 'text'),
+            IdentifierCandidate(IdType.ARXIV, '1601.00001', 2, 'text'),
+        ]
+        mock_get_doi_metadata.side_effect = zoia.backend.add.ZoiaAddException(
+            'Not found.'
+        )
+        mock_get_arxiv_metadata.return_value = {
+            'arxiv_id': '1601.00001',
+            'title': 'Foo',
+            'authors': [['John', 'Doe']],
+            'year': 2016,
+        }
+        mock_click_confirm.return_value = True
+
+        _, _, info_messages = self._add_pdf(candidates)
+
+        self.assertEqual(self.metadata['doe16-foo']['arxiv_id'], '1601.00001')
+        self.assertEqual(
+            info_messages,
+            ['Could not fetch the metadata of DOI 10.1000/foo: Not found.'],
+        )
+
+    @unittest.mock.patch('zoia.backend.add.zoia.parse.yaml.edit_until_valid')
+    def test__add_pdf_next_candidate_existing(self, mock_edit_until_valid):
+        self.metadata['doe16-foo'] = {
+            'arxiv_id': '1601.00001',
+            'title': 'Foo',
+            'authors': [['John', 'Doe']],
+            'year': 2016,
+        }
+        self._patch_metadata_fns(
+            {
+                IdType.DOI: unittest.mock.MagicMock(
+                    side_effect=zoia.backend.add.ZoiaAddException('Not found.')
+                )
+            }
+        )
+        candidates = [
+            IdentifierCandidate(IdType.DOI, '10.1000/bar', 3, 'text'),
+            IdentifierCandidate(IdType.ARXIV, '1601.00001', 2, 'text'),
+        ]
+        mock_edit_until_valid.return_value = {
+            'title': 'Bar',
+            'authors': [['Jane', 'Roe']],
+            'year': 1999,
+        }
+
+        # A worse identifier that is in the library (e.g., from a reference)
+        # doesn't stop the PDF from being added.
+        citekey, _, info_messages = self._add_pdf(candidates)
+
+        self.assertEqual(citekey, 'roe99-bar')
+        self.assertIn('DOI 10.1000/bar: Not found.', info_messages[0])
+
+    def test__add_pdf_existing_identifier(self):
+        self.metadata['doe16-foo'] = {
+            'arxiv_id': '1601.00001',
+            'title': 'Foo',
+            'authors': [['John', 'Doe']],
+            'year': 2016,
+        }
+        candidates = [
+            IdentifierCandidate(IdType.ARXIV, '1601.00001', 2, 'text'),
+        ]
+
+        with self.assertRaises(zoia.backend.add.ZoiaAddException):
+            self._add_pdf(candidates)
+
+    @unittest.mock.patch('zoia.backend.add.click.confirm')
+    def test__add_pdf_hardlink(self, mock_click_confirm):
+        self.config.pdf.placement = zoia.backend.config.PdfPlacement.HARDLINK
+        self._patch_metadata_fns(
+            {
+                IdType.DOI: unittest.mock.MagicMock(
+                    return_value={
+                        'title': 'Foo',
+                        'authors': [['John', 'Doe']],
+                        'year': 1999,
+                    }
+                )
+            }
+        )
+        mock_click_confirm.return_value = True
+
+        self._add_pdf(
+            [IdentifierCandidate(IdType.DOI, '10.1000/foo', 3, 'text')]
         )
 
+        document_path = (
+            Path(self.config.library_root) / 'doe99-foo/document.pdf'
+        )
+        self.assertEqual(
+            os.stat(self.identifier).st_ino, os.stat(document_path).st_ino
+        )
+
+    @unittest.mock.patch('zoia.backend.add.zoia.parse.yaml.edit_until_valid')
+    def test__add_pdf_search_failed(self, mock_edit_until_valid):
+        mock_edit_until_valid.return_value = {
+            'title': 'Foo',
+            'authors': [['John', 'Doe']],
+            'year': 1999,
+        }
+
+        citekey, _, info_messages = self._add_pdf(
+            error=ZoiaPdfException('Timed out after 60.0 seconds.')
+        )
+
+        self.assertEqual(citekey, 'doe99-foo')
+        self.assertIn('Timed out', info_messages[0])
+
+
+class TestAddMany(ZoiaUnitTest):
+    def setUp(self):
+        super().setUp()
+
+        def requests_side_effect(url, **kwargs):
+            response = unittest.mock.MagicMock()
+            response.status_code = 200
+            response.iter_content.return_value = [url.encode()]
+            response.headers = {}
+            response.text = '{}'
+            response.raw = io.BytesIO(
+                b'<feed xmlns="http://www.w3.org/2005/Atom"/>'
+            )
+            return response
+
+        patcher = unittest.mock.patch.object(
+            zoia.backend.http.ZoiaSession,
+            'get',
+            side_effect=requests_side_effect,
+        )
+        self.mock_get = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        # Semantic Scholar doesn't know any of the papers in its batch
+        # responses unless a test says otherwise.
+        self.papers = {}
+
+        def batch_side_effect(url, **kwargs):
+            response = unittest.mock.MagicMock()
+            response.status_code = 200
+            response.text = json.dumps(
+                [self.papers.get(elem) for elem in kwargs['json']['ids']]
+            )
+            return response
+
+        patcher = unittest.mock.patch.object(
+            zoia.backend.http.ZoiaSession,
+            'post',
+            side_effect=batch_side_effect,
+        )
+        self.mock_post = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def _arxiv_metadata(identifier):
+        return {
+            'arxiv_id': identifier,
+            'entry_type': 'article',
+            'title': f'Paper {identifier}',
+            'authors': [['John', 'Doe']],
+            'year': 2016,
+        }
+
+    def _add_many(self, identifiers, jobs=8):
+        return {
+            result.identifier: result
+            for result in zoia.backend.add.add_many(
+                self.config, identifiers, jobs=jobs
+            )
+        }
+
+    @unittest.mock.patch('zoia.backend.add._get_arxiv_metadata')
+    def test_add_many_fetches_concurrently(self, mock_get_arxiv_metadata):
+        identifiers = ['1601.00001', '1601.00002', '1601.00003']
+
+        # Each request waits for the others, so this only finishes if the
+        # requests are made at the same time.
+        barrier = threading.Barrier(len(identifiers), timeout=5)
+
+        def get_arxiv_metadata(
+            identifier, session, cache=None, resolvers=None
+        ):
+            barrier.wait()
+            return self._arxiv_metadata(identifier)
+
+        mock_get_arxiv_metadata.side_effect = get_arxiv_metadata
+
+        results = self._add_many(identifiers, jobs=len(identifiers))
+        self.assertEqual(set(results), set(identifiers))
+        self.assertTrue(all(elem.error is None for elem in results.values()))
+
+        metadata = zoia.backend.json.JSONMetadata(self.config)
+        for identifier in identifiers:
+            citekey = metadata.find_citekey('arxiv_id', identifier)
+            self.assertEqual(results[identifier].citekey, citekey)
+            self.assertTrue(
+                (
+                    Path(self.config.library_root) / citekey / 'document.pdf'
+                ).is_file()
+            )
+
+    @unittest.mock.patch('zoia.backend.add._get_arxiv_metadata')
+    def test_add_many_download_failed(self, mock_get_arxiv_metadata):
+        mock_get_arxiv_metadata.side_effect = (
+            lambda identifier, *args, **kwargs: self._arxiv_metadata(
+                identifier
+            )
+        )
+        requests_side_effect = self.mock_get.side_effect
+
+        def download_side_effect(url, **kwargs):
+            if url.startswith('https://arxiv.org/pdf/'):
+                raise requests.ConnectionError('Connection reset.')
+            return requests_side_effect(url, **kwargs)
+
+        self.mock_get.side_effect = download_side_effect
+
+        results = self._add_many(['1601.00001'])
+
+        result = results['1601.00001']
+        self.assertIsNone(result.error)
+        self.assertEqual(result.citekey, 'doe16-paper')
+        self.assertIn('zoia download', result.info_messages[0])
+        self.assertFalse(
+            (
+                Path(self.config.library_root) / 'doe16-paper/document.pdf'
+            ).exists()
+        )
+
+    @unittest.mock.patch('zoia.backend.add._get_arxiv_metadata')
+    def test_add_many_errors(self, mock_get_arxiv_metadata):
+        def get_arxiv_metadata(
+            identifier, session, cache=None, resolvers=None
+        ):
+            if identifier == '1601.00002':
+                raise zoia.backend.add.ZoiaAddException('Bad paper.')
+            return self._arxiv_metadata(identifier)
+
+        mock_get_arxiv_metadata.side_effect = get_arxiv_metadata
+        self.metadata['doe16-paper'] = self._arxiv_metadata('1601.00003')
+
+        results = self._add_many(
+            ['1601.00001', '1601.00002', '1601.00003', 'foo', '1601.00001']
+        )
+
+        self.assertIsNone(results['1601.00001'].error)
+        self.assertEqual(results['1601.00002'].error, 'Bad paper.')
+        self.assertIn(
+            'already exists as doe16-paper', results['1601.00003'].error
+        )
+        self.assertIsNotNone(results['foo'].error)
+        self.assertEqual(mock_get_arxiv_metadata.call_count, 2)
+
+    @unittest.mock.patch('zoia.backend.add._get_doi_metadata')
+    @unittest.mock.patch('zoia.backend.add._get_arxiv_metadata')
+    def test_add_many_same_paper_twice(
+        self, mock_get_arxiv_metadata, mock_get_doi_metadata
+    ):
+        mock_get_arxiv_metadata.return_value = dict(
+            self._arxiv_metadata('1601.00001'), doi='10.1000/foo'
+        )
+        mock_get_doi_metadata.return_value = {
+            'entry_type': 'article',
+            'title': 'Paper 1601.00001',
+            'authors': [['John', 'Doe']],
+            'year': 2016,
+            'doi': '10.1000/foo',
+        }
+
+        results = self._add_many(['1601.00001', '10.1000/foo'])
+        errors = [elem.error for elem in results.values()]
+        self.assertEqual(errors.count(None), 1)
+
+    @unittest.mock.patch('zoia.backend.add._get_doi_metadata')
+    def test_add_many_resolves_in_batches(self, mock_get_doi_metadata):
+        mock_get_doi_metadata.return_value = {
+            'entry_type': 'article',
+            'title': 'Foo',
+            'authors': [['Jane', 'Roe']],
+            'year': 2016,
+            'doi': '10.1000/foo',
+        }
+        identifiers = ['1601.00001', '1601.00002', '10.1000/foo']
+        for identifier in identifiers[:2]:
+            self.papers[f'arXiv:{identifier}'] = {
+                'title': f'Paper {identifier}',
+                'authors': [{'name': 'John Doe'}],
+                'year': 2016,
+            }
+
+        results = self._add_many(identifiers)
+        self.assertIsNone(results['1601.00001'].error)
+        self.assertIsNone(results['1601.00002'].error)
+        self.assertIsNone(results['10.1000/foo'].error)
+
+        self.mock_post.assert_called_once()
+        self.assertEqual(
+            self.mock_post.call_args.kwargs['json'],
+            {
+                'ids': [
+                    'arXiv:1601.00001',
+                    'arXiv:1601.00002',
+                    'DOI:10.1000/foo',
+                ]
+            },
+        )
+
+        # Only the DOI that the batch didn't resolve is requested on its own.
+        semantic_scholar_urls = [
+            elem.args[0]
+            for elem in self.mock_get.call_args_list
+            if 'semanticscholar' in elem.args[0]
+        ]
+        self.assertEqual(
+            semantic_scholar_urls,
+            ['https://api.semanticscholar.org/graph/v1/paper/DOI:10.1000/foo'],
+        )
+
+    @unittest.mock.patch('zoia.backend.add._get_doi_metadata')
+    def test_add_many_incomplete_metadata(self, mock_get_doi_metadata):
+        def get_doi_metadata(identifier, session, cache=None, resolvers=None):
+            metadatum = {
+                'title': 'T',
+                'authors': [['John', 'Doe']],
+                'year': 1,
+                'doi': identifier,
+            }
+            if identifier == '10.1000/bad':
+                del metadatum['year']
+            return metadatum
+
+        mock_get_doi_metadata.side_effect = get_doi_metadata
+
+        results = self._add_many(['10.1000/foo', '10.1000/bad', '10.1000/baz'])
+        self.assertIsNone(results['10.1000/foo'].error)
+        self.assertIn('have no year', results['10.1000/bad'].error)
+        self.assertIsNone(results['10.1000/baz'].error)
+
+        # Only the documents that were added have directories.
+        self.assertEqual(
+            sorted(os.listdir(self.config.library_root)),
+            sorted(
+                [
+                    results['10.1000/foo'].citekey,
+                    results['10.1000/baz'].citekey,
+                ]
+            ),
+        )
+
+    def test_add_many_invalid_response(self):
+        requests_side_effect = self.mock_get.side_effect
+
+        def doi_side_effect(url, **kwargs):
+            if 'doi.org' not in url:
+                return requests_side_effect(url, **kwargs)
+
+            doi = url.partition('doi.org/')[2]
+            response = unittest.mock.MagicMock()
+            response.status_code = 200
+            response.headers = {'Content-Type': 'application/json'}
+            if doi == '10.1000/bad':
+                response.text = '{"title": '
+            else:
+                response.text = json.dumps(
+                    {
+                        'title': doi.rpartition('/')[2].title(),
+                        'author': [{'given': 'John', 'family': 'Doe'}],
+                        'issued': {'date-parts': [[2016]]},
+                    }
+                )
+            return response
+
+        self.mock_get.side_effect = doi_side_effect
+
+        results = self._add_many(['10.1000/foo', '10.1000/bad', '10.1000/baz'])
+        self.assertIn('invalid response', results['10.1000/bad'].error)
+        self.assertEqual(results['10.1000/foo'].citekey, 'doe16-foo')
+        self.assertEqual(results['10.1000/baz'].citekey, 'doe16-baz')
+
+        metadata = zoia.backend.json.JSONMetadata(self.config)
+        self.assertIn('doe16-foo', metadata)
+        self.assertIn('doe16-baz', metadata)
+
+    @unittest.mock.patch('zoia.backend.add._get_doi_metadata')
+    def test_add_many_rollback(self, mock_get_doi_metadata):
+        mock_get_doi_metadata.return_value = {
+            'title': 'T',
+            'authors': [['John', 'Doe']],
+            'year': 1,
+            'doi': '10.1000/foo',
+        }
+
+        with unittest.mock.patch.object(
+            zoia.backend.json.JSONMetadata,
+            '_commit_transaction',
+            side_effect=OSError('Disk full.'),
+        ):
+            with self.assertRaises(OSError):
+                self._add_many(['10.1000/foo'])
+
+        self.assertEqual(os.listdir(self.config.library_root), [])
+
+
+class TestStore(ZoiaUnitTest):
+    def test__store_duplicate_pdf(self):
+        self.metadata['doe16-foo'] = {
+            'title': 'Foo',
+            'authors': [['John', 'Doe']],
+            'year': 2016,
+            'pdf_md5': 'foobar',
+        }
+
+        download_path = Path(self.config.library_root) / '.zoia-foo.pdf.part'
+        download_path.write_bytes(b'%PDF')
+        fetched = zoia.backend.add._Fetched(
+            {'title': 'Bar', 'authors': [['Jane', 'Roe']], 'year': 2016},
+            zoia.backend.download.Download(str(download_path), 'foobar', 4),
+        )
+
+        with self.assertRaises(zoia.backend.add.ZoiaAddException):
+            zoia.backend.add._store(self.metadata, 'Bar', fetched)
+
+        self.assertEqual(os.listdir(self.config.library_root), [])
+        self.assertNotIn('roe16-bar', self.metadata)
+
+
+class TestImportPdfs(ZoiaUnitTest):
+    def setUp(self):
+        super().setUp()
+        self.directory = Path(self.tmpdir.name) / 'papers'
+        (self.directory / 'sub').mkdir(parents=True)
+        (self.directory / '.hidden').mkdir()
+
+        pdf = _make_pdf(['doi:10.1000/foo'])
+        (self.directory / 'a.pdf').write_bytes(pdf)
+        (self.directory / 'sub' / 'b.pdf').write_bytes(_make_pdf(['Foo']))
+        (self.directory / 'sub' / 'c.pdf').write_bytes(pdf)
+        (self.directory / '.hidden' / 'd.pdf').write_bytes(pdf)
+        (self.directory / 'notes.txt').write_text('doi:10.1000/bar')
+
+        self.mock_get_doi_metadata = unittest.mock.MagicMock(
+            return_value={
+                'title': 'Foo',
+                'authors': [['John', 'Doe']],
+                'year': 1999,
+                'doi': '10.1000/foo',
+            }
+        )
+        patcher = unittest.mock.patch.dict(
+            zoia.backend.add._METADATA_FNS,
+            {IdType.DOI: self.mock_get_doi_metadata},
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _import_pdfs(self):
+        return {
+            os.path.relpath(result.identifier, self.directory): result
+            for result in zoia.backend.add.import_pdfs(
+                self.config, str(self.directory)
+            )
+        }
+
+    def test_find_pdfs(self):
+        self.assertEqual(
+            list(zoia.backend.add.find_pdfs(str(self.directory))),
+            [
+                str(self.directory / 'a.pdf'),
+                str(self.directory / 'sub' / 'b.pdf'),
+                str(self.directory / 'sub' / 'c.pdf'),
+            ],
+        )
+
+    def test_import_pdfs(self):
+        results = self._import_pdfs()
+
+        self.assertEqual(set(results), {'a.pdf', 'sub/b.pdf', 'sub/c.pdf'})
+        self.assertEqual(results['a.pdf'].citekey, 'doe99-foo')
+        self.assertEqual(
+            results['sub/b.pdf'].review_reason, 'No identifiers found.'
+        )
+        self.assertIn('is a copy of', results['sub/c.pdf'].error)
+
+        metadata = zoia.backend.json.JSONMetadata(self.config)
+        self.assertEqual(metadata['doe99-foo']['doi'], '10.1000/foo')
         self.assertTrue(
             (
                 Path(self.config.library_root) / 'doe99-foo/document.pdf'
             ).is_file()
         )
+
+        review_queue = ReviewQueue.from_config(self.config)
+        self.assertEqual(
+            [item.path for item in review_queue],
+            [str(self.directory / 'sub' / 'b.pdf')],
+        )
+
+        # Importing again skips the PDFs that were added.
+        results = self._import_pdfs()
+        self.assertIn('already exists as doe99-foo', results['a.pdf'].error)
+
+    def test_import_pdfs_incomplete_metadata(self):
+        self.mock_get_doi_metadata.return_value = {
+            'title': 'Foo',
+            'authors': [['John', 'Doe']],
+            'doi': '10.1000/foo',
+        }
+        results = self._import_pdfs()
+
+        self.assertIn('have no year', results['a.pdf'].review_reason)
+        self.assertEqual(os.listdir(self.config.library_root), [])
+        self.assertIn(
+            str(self.directory / 'a.pdf'),
+            [item.path for item in ReviewQueue.from_config(self.config)],
+        )
+
+    def test_import_pdfs_rollback(self):
+        self.config.pdf.placement = zoia.backend.config.PdfPlacement.MOVE
+
+        with unittest.mock.patch.object(
+            zoia.backend.json.JSONMetadata,
+            '_commit_transaction',
+            side_effect=OSError('Disk full.'),
+        ):
+            with self.assertRaises(OSError):
+                self._import_pdfs()
+
+        # The moved PDF is put back.
+        self.assertTrue((self.directory / 'a.pdf').is_file())
+        self.assertEqual(os.listdir(self.config.library_root), [])
+
+    @unittest.mock.patch('zoia.backend.add.click.confirm')
+    def test_review_pdfs(self, mock_click_confirm):
+        self.mock_get_doi_metadata.side_effect = (
+            zoia.backend.add.ZoiaAddException('Not found.')
+        )
+        results = self._import_pdfs()
+        self.assertIn('Not found.', results['a.pdf'].review_reason)
+
+        (self.directory / 'sub' / 'b.pdf').unlink()
+        self.mock_get_doi_metadata.side_effect = None
+        mock_click_confirm.return_value = True
+
+        results = {
+            os.path.relpath(result.identifier, self.directory): result
+            for result in zoia.backend.add.review_pdfs(self.config)
+        }
+
+        self.assertEqual(results['a.pdf'].citekey, 'doe99-foo')
+        self.assertIn('no longer exists', results['sub/b.pdf'].error)
+        self.assertEqual(len(ReviewQueue.from_config(self.config)), 0)
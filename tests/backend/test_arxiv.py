@@ -0,0 +1,166 @@
+import http.server
+import io
+import unittest
+import urllib.parse
+
+from ..context import zoia
+from ..fixtures.server import start_server
+import zoia.backend.arxiv
+import zoia.backend.http
+
+_ENTRIES = {
+    '1601.00001v2': '''
+        <entry>
+            <id>http://arxiv.org/abs/1601.00001v2</id>
+            <published>2015-12-31T21:00:04Z</published>
+            <title>Inelastic effects in molecular transport junctions:
+                The probe technique at high bias</title>
+            <author><name>Michael Kilgour</name></author>
+            <author><name>Dvira Segal</name></author>
+            <arxiv:doi>10.1063/1.4944470</arxiv:doi>
+        </entry>
+    ''',
+    'hep-th/9901001v1': '''
+        <entry>
+            <id>http://arxiv.org/abs/hep-th/9901001v1</id>
+            <published>1999-01-01T00:00:00Z</published>
+            <title>Foo</title>
+            <author><name>John Doe</name></author>
+        </entry>
+    ''',
+}
+
+_ERROR_ENTRY = '''
+    <entry>
+        <id>http://arxiv.org/api/errors#incorrect_id_format_for_foo</id>
+        <title>Error</title>
+        <summary>incorrect id format for foo</summary>
+    </entry>
+'''
+
+
+def _make_feed(entries):
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<feed xmlns="http://www.w3.org/2005/Atom" '
+        'xmlns:arxiv="http://arxiv.org/schemas/atom">'
+        + ''.join(entries)
+        + '</feed>'
+    ).encode()
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    """A stand-in for the arXiv API."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
+        arxiv_ids = query['id_list'][0].split(',')
+        self.server.requests.append(arxiv_ids)
+
+        entries = []
+        for arxiv_id in arxiv_ids:
+            if arxiv_id == 'foo':
+                # arXiv answers the whole query with a single error.
+                entries = [_ERROR_ENTRY]
+                break
+            for key, entry in _ENTRIES.items():
+                if key.startswith(arxiv_id):
+                    entries.append(entry)
+
+        body = _make_feed(entries)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/atom+xml')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestParseFeed(unittest.TestCase):
+    def test_parse_feed(self):
+        entries = list(
+            zoia.backend.arxiv.parse_feed(
+                io.BytesIO(_make_feed(_ENTRIES.values()))
+            )
+        )
+        self.assertEqual(
+            entries[0],
+            {
+                'id': '1601.00001v2',
+                'title': (
+                    'Inelastic effects in molecular transport junctions: The '
+                    'probe technique at high bias'
+                ),
+                'authors': ['Michael Kilgour', 'Dvira Segal'],
+                'published': '2015-12-31T21:00:04Z',
+                'doi': '10.1063/1.4944470',
+            },
+        )
+        self.assertEqual(entries[1]['id'], 'hep-th/9901001v1')
+        self.assertIsNone(entries[1]['doi'])
+
+    def test_parse_feed_error(self):
+        with self.assertRaises(ValueError):
+            list(
+                zoia.backend.arxiv.parse_feed(
+                    io.BytesIO(_make_feed([_ERROR_ENTRY]))
+                )
+            )
+
+    def test_parse_feed_malformed(self):
+        with self.assertRaises(ValueError):
+            list(zoia.backend.arxiv.parse_feed(io.BytesIO(b'<feed>')))
+
+
+class TestArxivResolver(unittest.TestCase):
+    def setUp(self):
+        self.server, url = start_server(self, _Handler, requests=[])
+
+        session = zoia.backend.http.ZoiaSession()
+        self.addCleanup(session.close)
+        self.resolver = zoia.backend.arxiv.ArxivResolver(
+            session,
+            api_url=f'{url}/api',
+        )
+
+    def test_prefetch(self):
+        unresolved = self.resolver.prefetch(
+            ['1601.00001', 'hep-th/9901001v1', '1601.99999']
+        )
+        self.assertEqual(unresolved, ['1601.99999'])
+        self.assertEqual(len(self.server.requests), 1)
+
+        self.assertEqual(
+            self.resolver.get('1601.00001')['doi'], '10.1063/1.4944470'
+        )
+        self.assertEqual(self.resolver.get('hep-th/9901001v1')['title'], 'Foo')
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_batch_size(self):
+        self.resolver.prefetch(
+            ['1601.00001', 'hep-th/9901001v1', '1601.99999'], batch_size=2
+        )
+        self.assertEqual(
+            self.server.requests,
+            [['1601.00001', 'hep-th/9901001v1'], ['1601.99999']],
+        )
+
+    def test_failed_batch(self):
+        # A bad ID spoils the whole batch, so the others are requested one at
+        # a time.
+        unresolved = self.resolver.prefetch(['1601.00001', 'foo'])
+        self.assertEqual(unresolved, ['1601.00001', 'foo'])
+
+        entry = self.resolver.get('1601.00001')
+        self.assertTrue(entry['title'].startswith('Inelastic'))
+        self.assertEqual(self.server.requests[1:], [['1601.00001']])
+
+        with self.assertRaises(ValueError):
+            self.resolver.get('foo')
+
+    def test_missing(self):
+        self.assertIsNone(self.resolver.get('1601.99999'))
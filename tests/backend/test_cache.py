@@ -0,0 +1,111 @@
+import os
+import tempfile
+import time
+import unittest
+import unittest.mock
+from pathlib import Path
+
+from ..context import zoia
+import zoia.backend.add
+import zoia.backend.cache
+import zoia.backend.config
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmpdir.name) / 'cache'
+        self.cache = zoia.backend.cache.ResponseCache(
+            str(self.root), ttls={'doi': 100}, max_size=1000
+        )
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def test_get_set(self):
+        self.assertIsNone(self.cache.get('doi', '10.1000/foo'))
+        self.cache.set('doi', '10.1000/foo', {'title': 'Foo'})
+        self.assertEqual(
+            self.cache.get('doi', '10.1000/foo'), {'title': 'Foo'}
+        )
+        self.assertIsNone(self.cache.get('doi', '10.1000/bar'))
+
+    def test_unknown_provider_is_not_cached(self):
+        self.cache.set('semantic_scholar', '1601.00001', 'foo')
+        self.assertIsNone(self.cache.get('semantic_scholar', '1601.00001'))
+        self.assertEqual(list(self.root.rglob('*.json')), [])
+
+    def test_expired(self):
+        self.cache.set('doi', '10.1000/foo', 'foo')
+        with unittest.mock.patch(
+            'zoia.backend.cache.time.time', return_value=time.time() + 101
+        ):
+            self.assertIsNone(self.cache.get('doi', '10.1000/foo'))
+        self.assertEqual(list(self.root.rglob('*.json')), [])
+
+    def test_evicts_least_recently_used(self):
+        value = 'x' * 200
+        for i in range(3):
+            self.cache.set('doi', f'10.1000/{i}', value)
+
+        # Make sure that the first entry was used most recently.
+        for i, path in enumerate(sorted(self.root.rglob('*.json'))):
+            os.utime(path, (i, i))
+        self.cache.get('doi', '10.1000/0')
+
+        for i in range(3, 5):
+            self.cache.set('doi', f'10.1000/{i}', value)
+
+        self.assertEqual(self.cache.get('doi', '10.1000/0'), value)
+        self.assertEqual(self.cache.get('doi', '10.1000/4'), value)
+        total_size = sum(
+            path.stat().st_size for path in self.root.rglob('*.json')
+        )
+        self.assertLessEqual(total_size, 1000)
+
+
+class TestCachedMetadata(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        config = zoia.backend.config.ZoiaConfig(
+            library_root=self._tmpdir.name, db_root=self._tmpdir.name
+        )
+        self.cache = zoia.backend.cache.ResponseCache.from_config(config)
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def test__get_arxiv_metadata_cached(self):
+        response = unittest.mock.MagicMock()
+        response.status_code = 200
+        with open(
+            os.path.join(
+                os.path.dirname(__file__), '../fixtures/arxiv_response.json'
+            )
+        ) as fp:
+            response.text = fp.read()
+        session = unittest.mock.MagicMock()
+        session.get.return_value = response
+
+        first = zoia.backend.add._get_arxiv_metadata(
+            '1601.00001', session, self.cache
+        )
+        second = zoia.backend.add._get_arxiv_metadata(
+            '1601.00001', session, self.cache
+        )
+
+        self.assertEqual(first, second)
+        self.assertEqual(session.get.call_count, 1)
+
+    def test_failures_are_not_cached(self):
+        response = unittest.mock.MagicMock()
+        response.status_code = 404
+        session = unittest.mock.MagicMock()
+        session.get.return_value = response
+
+        for _ in range(2):
+            with self.assertRaises(zoia.backend.add.ZoiaAddException):
+                zoia.backend.add._get_doi_metadata(
+                    '10.1000/foo', session, self.cache
+                )
+        self.assertEqual(session.get.call_count, 2)
@@ -19,9 +19,157 @@ class TestZoiaConfigDataclass(unittest.TestCase):
             'library_root': '/tmp/foo',
             'db_root': '/tmp/bar',
             'backend': 'json',
+            'json_journal': False,
+            'sqlite_pragmas': {
+                'journal_mode': 'wal',
+                'synchronous': 'normal',
+                'mmap_size': 268435456,
+                'cache_size': -65536,
+                'busy_timeout': 5000,
+            },
+            'http': {
+                'connect_timeout': 5.0,
+                'read_timeout': 30.0,
+                'pool_connections': 10,
+                'pool_maxsize': 16,
+                'max_retries': 5,
+                'backoff_base': 1.0,
+                'backoff_max': 60.0,
+                'rate_limits': {
+                    'api.semanticscholar.org': {'rate': 1.0, 'burst': 3},
+                    'doi.org': {'rate': 10.0, 'burst': 10},
+                    'arxiv.org': {'rate': 1.0, 'burst': 4},
+                    'export.arxiv.org': {'rate': 1 / 3, 'burst': 1},
+                    'www.googleapis.com': {'rate': 2.0, 'burst': 5},
+                },
+            },
+            'cache': {
+                'enabled': True,
+                'max_size': 67108864,
+                'ttl_days': {
+                    'semantic_scholar': 7,
+                    'arxiv': 30,
+                    'doi': 90,
+                    'google_books': 90,
+                },
+            },
+            'arxiv_provider': 'semantic_scholar',
+            'pdf': {
+                'max_pages': 5,
+                'search_last_page': True,
+                'timeout': 10.0,
+                'worker_timeout': 60.0,
+                'memory_limit': 1024,
+                'workers': None,
+                'placement': 'copy',
+            },
         }
         self.assertEqual(config.to_dict(), expected_dict)
 
+    def test_zoia_config_from_dict(self):
+        config = zoia.backend.config.ZoiaConfig(
+            library_root='/tmp/foo',
+            sqlite_pragmas={'journal_mode': 'DELETE', 'mmap_size': 0},
+        )
+        self.assertEqual(config.sqlite_pragmas.journal_mode, 'delete')
+        self.assertEqual(config.sqlite_pragmas.mmap_size, 0)
+        self.assertEqual(config.sqlite_pragmas.synchronous, 'normal')
+
+
+class TestHttpConfig(unittest.TestCase):
+    def test_from_dict(self):
+        config = zoia.backend.config.ZoiaConfig(
+            library_root='/tmp/foo', http={'read_timeout': 60}
+        )
+        self.assertEqual(config.http.read_timeout, 60)
+        self.assertEqual(config.http.connect_timeout, 5.0)
+
+    def test_invalid_timeout(self):
+        with self.assertRaises(ValueError):
+            zoia.backend.config.HttpConfig(connect_timeout=0)
+
+    def test_rate_limits(self):
+        config = zoia.backend.config.HttpConfig(
+            rate_limits={'doi.org': {'rate': 50, 'burst': 50}}
+        )
+        self.assertEqual(config.rate_limits['doi.org']['rate'], 50)
+        self.assertIn('arxiv.org', config.rate_limits)
+
+        with self.assertRaises(ValueError):
+            zoia.backend.config.HttpConfig(
+                rate_limits={'doi.org': {'rate': 0, 'burst': 1}}
+            )
+
+
+class TestCacheConfig(unittest.TestCase):
+    def test_from_dict(self):
+        config = zoia.backend.config.ZoiaConfig(
+            library_root='/tmp/foo', cache={'ttl_days': {'doi': 1}}
+        )
+        self.assertEqual(config.cache.ttl_days['doi'], 1)
+        self.assertEqual(config.cache.ttl_days['semantic_scholar'], 7)
+
+    def test_unknown_provider(self):
+        with self.assertRaises(ValueError):
+            zoia.backend.config.CacheConfig(ttl_days={'crossref': 1})
+
+
+class TestPdfConfig(unittest.TestCase):
+    def test_from_dict(self):
+        config = zoia.backend.config.ZoiaConfig(
+            library_root='/tmp/foo', pdf={'max_pages': 2}
+        )
+        self.assertEqual(config.pdf.max_pages, 2)
+        self.assertTrue(config.pdf.search_last_page)
+
+    def test_invalid_max_pages(self):
+        with self.assertRaises(ValueError):
+            zoia.backend.config.PdfConfig(max_pages=0)
+
+    def test_placement(self):
+        config = zoia.backend.config.PdfConfig(placement='hardlink')
+        self.assertEqual(
+            config.placement, zoia.backend.config.PdfPlacement.HARDLINK
+        )
+        with self.assertRaises(ValueError):
+            zoia.backend.config.PdfConfig(placement='symlink')
+
+    def test_invalid_memory_limit(self):
+        self.assertIsNone(
+            zoia.backend.config.PdfConfig(memory_limit=None).memory_limit
+        )
+        with self.assertRaises(ValueError):
+            zoia.backend.config.PdfConfig(memory_limit=0)
+
+
+class TestSQLitePragmas(unittest.TestCase):
+    def test_to_statements(self):
+        pragmas = zoia.backend.config.SQLitePragmas(
+            journal_mode='wal',
+            synchronous='full',
+            mmap_size=0,
+            cache_size=-2000,
+            busy_timeout=100,
+        )
+        self.assertEqual(
+            pragmas.to_statements(),
+            [
+                'PRAGMA journal_mode = wal',
+                'PRAGMA synchronous = full',
+                'PRAGMA mmap_size = 0',
+                'PRAGMA cache_size = -2000',
+                'PRAGMA busy_timeout = 100',
+            ],
+        )
+
+    def test_invalid_journal_mode(self):
+        with self.assertRaises(ValueError):
+            zoia.backend.config.SQLitePragmas(journal_mode='wal; DROP TABLE')
+
+    def test_invalid_synchronous(self):
+        with self.assertRaises(ValueError):
+            zoia.backend.config.SQLitePragmas(synchronous='sometimes')
+
 
 class TestConfig(unittest.TestCase):
     @unittest.mock.patch('zoia.backend.config.os.getenv')
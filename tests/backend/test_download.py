@@ -0,0 +1,222 @@
+import hashlib
+import http.server
+import re
+import tempfile
+import unittest
+import unittest.mock
+from pathlib import Path
+
+import requests
+
+from ..context import zoia
+from ..fixtures.metadata import ZoiaUnitTest
+from ..fixtures.server import start_server
+import zoia.backend.download
+
+PDF = b'%PDF-1.4\n' + bytes(range(256)) * 1024
+
+
+class _PdfHandler(http.server.BaseHTTPRequestHandler):
+    """Serve `PDF`, supporting range requests like most servers do."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        server.request_headers.append(dict(self.headers))
+
+        start = 0
+        range_header = self.headers.get('Range')
+        if range_header and self.headers.get('If-Range') == server.etag:
+            start = int(re.match(r'bytes=(\d+)-', range_header).group(1))
+            self.send_response(206)
+            self.send_header(
+                'Content-Range', f'bytes {start}-{len(PDF) - 1}/{len(PDF)}'
+            )
+        else:
+            self.send_response(200)
+        self.send_header('ETag', server.etag)
+        self.send_header('Content-Length', str(len(PDF) - start))
+        self.end_headers()
+
+        if server.cut_after is not None:
+            # Simulate a dropped connection.
+            self.wfile.write(PDF[start : server.cut_after])
+            self.wfile.flush()
+            server.cut_after = None
+            self.close_connection = True
+            return
+
+        self.wfile.write(PDF[start:])
+
+    def log_message(self, *args):
+        pass
+
+
+def _mock_session(status_code=200, chunks=()):
+    response = unittest.mock.MagicMock()
+    response.status_code = status_code
+    response.headers = {}
+    response.iter_content.return_value = chunks
+    session = unittest.mock.MagicMock()
+    session.get.return_value = response
+    return session
+
+
+class TestDownloadPdf(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.tmpdir = Path(self._tmpdir.name)
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _start_server(self, cut_after=None):
+        server, url = start_server(
+            self,
+            _PdfHandler,
+            etag='"v1"',
+            cut_after=cut_after,
+            request_headers=[],
+        )
+
+        session = requests.Session()
+        self.addCleanup(session.close)
+        return server, session, f'{url}/foo.pdf'
+
+    def _get_files(self):
+        return sorted(
+            str(path.relative_to(self.tmpdir))
+            for path in self.tmpdir.rglob('*')
+            if path.is_file()
+        )
+
+    def test_download_pdf(self):
+        session = _mock_session(chunks=[b'%PDF', b'-1.4'])
+        download = zoia.backend.download.download_pdf(
+            session, 'https://example.org/foo.pdf', str(self.tmpdir)
+        )
+
+        self.assertEqual(Path(download.path).parent, self.tmpdir)
+        self.assertEqual(Path(download.path).read_bytes(), b'%PDF-1.4')
+        self.assertEqual(download.md5, hashlib.md5(b'%PDF-1.4').hexdigest())
+        self.assertEqual(download.size, 8)
+
+        download.move(str(self.tmpdir / 'document.pdf'))
+        download.discard()
+        self.assertEqual(self._get_files(), ['document.pdf'])
+
+    def test_download_pdf_not_found(self):
+        session = _mock_session(status_code=404)
+        download = zoia.backend.download.download_pdf(
+            session, 'https://example.org/foo.pdf', str(self.tmpdir)
+        )
+        self.assertIsNone(download)
+        self.assertEqual(self._get_files(), [])
+
+    def test_download_pdf_interrupted_without_validator(self):
+        def chunks():
+            yield b'%PDF'
+            raise ValueError
+
+        session = _mock_session(chunks=chunks())
+        with self.assertRaises(ValueError):
+            zoia.backend.download.download_pdf(
+                session, 'https://example.org/foo.pdf', str(self.tmpdir)
+            )
+        self.assertEqual(self._get_files(), [])
+
+    def test_resume_later(self):
+        server, session, url = self._start_server(cut_after=150_000)
+
+        with self.assertRaises(requests.RequestException):
+            zoia.backend.download.download_pdf(
+                session, url, str(self.tmpdir), attempts=1
+            )
+        part_path, state_path = zoia.backend.download._get_partial_paths(
+            url, str(self.tmpdir)
+        )
+        # Only the chunks that arrived completely were written.
+        part = Path(part_path).read_bytes()
+        self.assertGreater(len(part), 0)
+        self.assertEqual(part, PDF[: len(part)])
+        self.assertTrue(Path(state_path).is_file())
+
+        download = zoia.backend.download.download_pdf(
+            session, url, str(self.tmpdir)
+        )
+        self.assertEqual(
+            server.request_headers[-1]['Range'], f'bytes={len(part)}-'
+        )
+        self.assertEqual(Path(download.path).read_bytes(), PDF)
+        self.assertEqual(download.md5, hashlib.md5(PDF).hexdigest())
+        self.assertEqual(download.size, len(PDF))
+        self.assertFalse(Path(part_path).exists())
+        self.assertFalse(Path(state_path).exists())
+
+    def test_retry_resumes(self):
+        server, session, url = self._start_server(cut_after=150_000)
+
+        download = zoia.backend.download.download_pdf(
+            session, url, str(self.tmpdir)
+        )
+        self.assertEqual(len(server.request_headers), 2)
+        self.assertIn('Range', server.request_headers[1])
+        self.assertEqual(Path(download.path).read_bytes(), PDF)
+
+    def test_changed_pdf_is_downloaded_again(self):
+        server, session, url = self._start_server(cut_after=150_000)
+
+        with self.assertRaises(requests.RequestException):
+            zoia.backend.download.download_pdf(
+                session, url, str(self.tmpdir), attempts=1
+            )
+
+        server.etag = '"v2"'
+        download = zoia.backend.download.download_pdf(
+            session, url, str(self.tmpdir)
+        )
+        self.assertEqual(Path(download.path).read_bytes(), PDF)
+        self.assertEqual(download.md5, hashlib.md5(PDF).hexdigest())
+
+
+class TestDownloadDocument(ZoiaUnitTest):
+    def setUp(self):
+        super().setUp()
+        self.metadata['doe16-foo'] = {
+            'title': 'Foo',
+            'authors': [['John', 'Doe']],
+            'year': 2016,
+            'arxiv_id': '1601.00001',
+        }
+
+    @unittest.mock.patch('zoia.backend.download.download_pdf')
+    def test_download_document(self, mock_download_pdf):
+        def download_pdf(session, url, directory):
+            self.assertEqual(url, 'https://arxiv.org/pdf/1601.00001.pdf')
+            path = Path(directory) / '.zoia-foo.pdf.part'
+            path.write_bytes(b'%PDF')
+            return zoia.backend.download.Download(str(path), 'foobar', 4)
+
+        mock_download_pdf.side_effect = download_pdf
+
+        zoia.backend.download.download_document(self.config, 'doe16-foo')
+
+        document_path = (
+            Path(self.config.library_root) / 'doe16-foo' / 'document.pdf'
+        )
+        self.assertEqual(document_path.read_bytes(), b'%PDF')
+        metadata = zoia.backend.json.JSONMetadata(self.config)
+        self.assertEqual(metadata['doe16-foo']['pdf_md5'], 'foobar')
+
+        with self.assertRaises(zoia.backend.download.ZoiaDownloadException):
+            zoia.backend.download.download_document(self.config, 'doe16-foo')
+
+    def test_download_document_unknown_source(self):
+        self.metadata['roe02-bar'] = {
+            'title': 'Bar',
+            'authors': [['Jane', 'Roe']],
+            'year': 2002,
+        }
+        with self.assertRaises(zoia.backend.download.ZoiaDownloadException):
+            zoia.backend.download.download_document(self.config, 'roe02-bar')
@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+
+from ..context import zoia
+import zoia.backend.files
+
+
+class TestOpenAtomically(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.filename = os.path.join(self.tmpdir.name, 'foo.json')
+        with open(self.filename, 'w') as fp:
+            fp.write('old')
+
+    def test_replace(self):
+        with zoia.backend.files.open_atomically(self.filename) as fp:
+            fp.write('new')
+
+        with open(self.filename) as fp:
+            self.assertEqual(fp.read(), 'new')
+        self.assertEqual(os.listdir(self.tmpdir.name), ['foo.json'])
+
+    def test_error(self):
+        with self.assertRaises(ValueError):
+            with zoia.backend.files.open_atomically(self.filename) as fp:
+                fp.write('new')
+                raise ValueError
+
+        with open(self.filename) as fp:
+            self.assertEqual(fp.read(), 'old')
+        self.assertEqual(os.listdir(self.tmpdir.name), ['foo.json'])
+
+
+class TestRemoveIfExists(unittest.TestCase):
+    def test_remove_if_exists(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'foo.pdf')
+            open(path, 'w').close()
+
+            zoia.backend.files.remove_if_exists(path)
+            self.assertFalse(os.path.exists(path))
+            zoia.backend.files.remove_if_exists(path)
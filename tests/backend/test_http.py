@@ -0,0 +1,208 @@
+import http.server
+import unittest
+import unittest.mock
+
+import requests
+
+from ..context import zoia
+from ..fixtures.server import start_server
+import zoia.backend.config
+import zoia.backend.http
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.client_ports.add(self.client_address[1])
+        body = b'ok'
+        if self.server.rejections:
+            self.server.rejections -= 1
+            self.send_response(429)
+            self.send_header('Retry-After', '7')
+        else:
+            self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestZoiaSession(unittest.TestCase):
+    @unittest.mock.patch('zoia.backend.http.requests.Session.request')
+    def test_default_timeout(self, mock_request):
+        http_config = zoia.backend.config.HttpConfig(
+            connect_timeout=1, read_timeout=2
+        )
+        session = zoia.backend.http.ZoiaSession(http_config)
+
+        session.get('https://example.org')
+        self.assertEqual(mock_request.call_args.kwargs['timeout'], (1, 2))
+
+        session.get('https://example.org', timeout=3)
+        self.assertEqual(mock_request.call_args.kwargs['timeout'], 3)
+
+    def test_pool_maxsize(self):
+        session = zoia.backend.http.ZoiaSession(pool_maxsize=32)
+        adapter = session.get_adapter('https://example.org')
+        self.assertIsInstance(adapter, requests.adapters.HTTPAdapter)
+        self.assertEqual(adapter._pool_maxsize, 32)
+
+    def _start_server(self, rejections=0):
+        server, url = start_server(
+            self, _Handler, client_ports=set(), rejections=rejections
+        )
+        return server, f'{url}/'
+
+    def test_connections_are_reused(self):
+        server, url = self._start_server()
+        with zoia.backend.http.ZoiaSession() as session:
+            for _ in range(3):
+                self.assertEqual(session.get(url).text, 'ok')
+
+        self.assertEqual(len(server.client_ports), 1)
+
+    def test_retry_after(self):
+        server, url = self._start_server(rejections=2)
+        clock = _FakeClock()
+        rate_limiter = zoia.backend.http.RateLimiter(
+            {}, clock=clock, sleep=clock.sleep
+        )
+        with zoia.backend.http.ZoiaSession(
+            rate_limiter=rate_limiter
+        ) as session:
+            response = session.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(clock.sleeps, [7, 7])
+
+    def test_gives_up_after_max_retries(self):
+        server, url = self._start_server(rejections=10)
+        clock = _FakeClock()
+        rate_limiter = zoia.backend.http.RateLimiter(
+            {}, clock=clock, sleep=clock.sleep
+        )
+        http_config = zoia.backend.config.HttpConfig(max_retries=2)
+        with zoia.backend.http.ZoiaSession(
+            http_config, rate_limiter=rate_limiter
+        ) as session:
+            response = session.get(url)
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(server.rejections, 7)
+
+    def test_retry_after_too_long(self):
+        server, url = self._start_server(rejections=1)
+        clock = _FakeClock()
+        rate_limiter = zoia.backend.http.RateLimiter(
+            {}, clock=clock, sleep=clock.sleep
+        )
+        http_config = zoia.backend.config.HttpConfig(backoff_max=5)
+        with zoia.backend.http.ZoiaSession(
+            http_config, rate_limiter=rate_limiter
+        ) as session:
+            with self.assertRaises(requests.HTTPError) as cm:
+                session.get(url)
+
+        self.assertEqual(cm.exception.response.status_code, 429)
+        self.assertEqual(clock.sleeps, [])
+
+    @unittest.mock.patch('zoia.backend.http.random.uniform')
+    def test_backoff(self, mock_uniform):
+        session = zoia.backend.http.ZoiaSession(
+            zoia.backend.config.HttpConfig(backoff_base=1, backoff_max=10)
+        )
+        for attempt in range(5):
+            session._get_backoff(attempt)
+        self.assertEqual(
+            [elem.args for elem in mock_uniform.call_args_list],
+            [(0, 1), (0, 2), (0, 4), (0, 8), (0, 10)],
+        )
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_then_rate(self):
+        clock = _FakeClock()
+        bucket = zoia.backend.http.TokenBucket(
+            rate=2, burst=3, clock=clock, sleep=clock.sleep
+        )
+        for _ in range(5):
+            bucket.acquire()
+
+        self.assertEqual(clock.sleeps, [0.5, 0.5])
+
+    def test_refill(self):
+        clock = _FakeClock()
+        bucket = zoia.backend.http.TokenBucket(
+            rate=1, burst=2, clock=clock, sleep=clock.sleep
+        )
+        bucket.acquire()
+        bucket.acquire()
+        clock.now += 10
+        bucket.acquire()
+        bucket.acquire()
+        self.assertEqual(clock.sleeps, [])
+
+    def test_pause(self):
+        clock = _FakeClock()
+        bucket = zoia.backend.http.TokenBucket(
+            rate=1, burst=5, clock=clock, sleep=clock.sleep
+        )
+        bucket.pause(30)
+        bucket.acquire()
+        self.assertGreaterEqual(clock.now, 30)
+
+        # Tokens don't accumulate during the pause.
+        bucket.acquire()
+        self.assertEqual(clock.sleeps[-1], 1)
+
+    def test_unlimited(self):
+        clock = _FakeClock()
+        bucket = zoia.backend.http.TokenBucket(
+            rate=None, burst=1, clock=clock, sleep=clock.sleep
+        )
+        for _ in range(100):
+            bucket.acquire()
+        self.assertEqual(clock.sleeps, [])
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_hosts(self):
+        clock = _FakeClock()
+        rate_limiter = zoia.backend.http.RateLimiter(
+            {'arxiv.org': {'rate': 1, 'burst': 1}},
+            clock=clock,
+            sleep=clock.sleep,
+        )
+        rate_limiter.acquire('https://arxiv.org/pdf/1601.00001.pdf')
+        rate_limiter.acquire('https://doi.org/10.1000/foo')
+        self.assertEqual(clock.sleeps, [])
+
+        # Subdomains share the limit of their domain.
+        rate_limiter.acquire('https://export.arxiv.org/api/query')
+        self.assertEqual(clock.sleeps, [1])
+
+    def test_pause_unlimited_host(self):
+        clock = _FakeClock()
+        rate_limiter = zoia.backend.http.RateLimiter(
+            {}, clock=clock, sleep=clock.sleep
+        )
+        rate_limiter.pause('https://doi.org/10.1000/foo', 5)
+        rate_limiter.acquire('https://doi.org/10.1000/bar')
+        rate_limiter.acquire('https://arxiv.org/pdf/1601.00001.pdf')
+        self.assertEqual(clock.sleeps, [5])
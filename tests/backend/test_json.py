@@ -1,3 +1,4 @@
+import json
 import tempfile
 import unittest
 import unittest.mock
@@ -79,13 +80,15 @@ class TestMetadata(unittest.TestCase):
 class TestMetadataGetters(ZoiaUnitTest):
     def setUp(self):
         super().setUp()
-        self.metadata._metadata = {
+        metadata = {
             'doe09-foo': {'arxiv_id': '0901.0123'},
             'johnson13-qux': {'doi': '10.1000/foo'},
             'roe19-baz': {'isbn': '9781499999990'},
             'smith10-bar': {'arxiv_id': '1002.1001'},
             'thompson11-quux': {'pdf_md5': '2aa5d113c95b2432dbdb7c6440115774'},
         }
+        for citekey, metadatum in metadata.items():
+            self.metadata[citekey] = metadatum
 
     def test_get_arxiv_ids(self):
         self.assertTrue(self.metadata.arxiv_id_exists('0901.0123'))
@@ -106,3 +109,224 @@ class TestMetadataGetters(ZoiaUnitTest):
             )
         )
         self.assertFalse(self.metadata.pdf_md5_hash_exists('foo'))
+
+    def test_find_citekey(self):
+        self.assertEqual(
+            self.metadata.find_citekey('doi', '10.1000/foo'), 'johnson13-qux'
+        )
+        self.assertIsNone(self.metadata.find_citekey('doi', '10.1000/bar'))
+
+    def test_indexes_loaded_from_disk(self):
+        metadata = zoia.backend.json.JSONMetadata(self.config)
+        self.assertEqual(
+            metadata.find_citekey('arxiv_id', '1002.1001'), 'smith10-bar'
+        )
+
+    def test_indexes_updated_on_set(self):
+        self.metadata['johnson13-qux'] = {'doi': '10.1000/bar'}
+        self.assertFalse(self.metadata.doi_exists('10.1000/foo'))
+        self.assertEqual(
+            self.metadata.find_citekey('doi', '10.1000/bar'), 'johnson13-qux'
+        )
+
+    def test_indexes_updated_on_in_place_modification(self):
+        metadatum = self.metadata['johnson13-qux']
+        metadatum['doi'] = '10.1000/bar'
+        self.metadata['johnson13-qux'] = metadatum
+        self.assertFalse(self.metadata.doi_exists('10.1000/foo'))
+        self.assertTrue(self.metadata.doi_exists('10.1000/bar'))
+
+    def test_indexes_updated_on_rename(self):
+        self.metadata.rename_key('roe19-baz', 'roe20-baz')
+        self.assertEqual(
+            self.metadata.find_citekey('isbn', '9781499999990'), 'roe20-baz'
+        )
+
+    def test_missing_identifier_does_not_exist(self):
+        self.assertFalse(self.metadata.doi_exists(None))
+
+
+class TestJournal(ZoiaUnitTest):
+    def setUp(self):
+        super().setUp()
+        self.config.json_journal = True
+        self.metadata = zoia.backend.json.JSONMetadata(self.config)
+        self.metadata.write()
+        self.snapshot_path = Path(self.metadata.metadata_filename)
+        self.journal_path = Path(self.metadata.journal_filename)
+
+    def test_set_appends_to_journal(self):
+        snapshot = self.snapshot_path.read_text()
+        self.metadata['doe01-foo'] = {'title': 'Foo'}
+        self.assertEqual(self.snapshot_path.read_text(), snapshot)
+        self.assertEqual(len(self.journal_path.read_text().splitlines()), 1)
+
+    def test_replay_journal(self):
+        self.metadata['doe01-foo'] = {'title': 'Foo', 'doi': '10.1000/foo'}
+        self.metadata['doe01-foo'] = {'year': 2001}
+        self.metadata.rename_key('doe01-foo', 'doe01-bar')
+
+        metadata = zoia.backend.json.JSONMetadata(self.config)
+        self.assertEqual(
+            metadata._metadata,
+            {
+                'doe01-bar': {
+                    'title': 'Foo',
+                    'doi': '10.1000/foo',
+                    'year': 2001,
+                }
+            },
+        )
+        self.assertEqual(
+            metadata.find_citekey('doi', '10.1000/foo'), 'doe01-bar'
+        )
+
+    def test_replay_truncated_journal(self):
+        self.metadata['doe01-foo'] = {'title': 'Foo'}
+        with open(self.journal_path, 'a') as fp:
+            fp.write('{"op": "set", "citekey": "roe02-')
+
+        metadata = zoia.backend.json.JSONMetadata(self.config)
+        self.assertEqual(metadata._metadata, {'doe01-foo': {'title': 'Foo'}})
+
+    def test_append_after_truncated_journal(self):
+        self.metadata['doe01-foo'] = {'title': 'Foo'}
+        with open(self.journal_path, 'a') as fp:
+            fp.write('{"op": "set", "citekey": "roe02-')
+
+        metadata = zoia.backend.json.JSONMetadata(self.config)
+        metadata['roe02-bar'] = {'title': 'Bar'}
+        metadata['poe03-baz'] = {'title': 'Baz'}
+
+        metadata = zoia.backend.json.JSONMetadata(self.config)
+        self.assertEqual(
+            metadata._metadata,
+            {
+                'doe01-foo': {'title': 'Foo'},
+                'roe02-bar': {'title': 'Bar'},
+                'poe03-baz': {'title': 'Baz'},
+            },
+        )
+
+    @unittest.mock.patch('zoia.backend.json.JOURNAL_COMPACTION_THRESHOLD', 2)
+    def test_compaction(self):
+        self.metadata['doe01-foo'] = {'title': 'Foo'}
+        self.assertTrue(self.journal_path.exists())
+        self.metadata['roe02-bar'] = {'title': 'Bar'}
+        self.assertFalse(self.journal_path.exists())
+
+        with open(self.snapshot_path) as fp:
+            self.assertEqual(
+                json.load(fp),
+                {'doe01-foo': {'title': 'Foo'}, 'roe02-bar': {'title': 'Bar'}},
+            )
+
+    def test_journal_folded_in_when_disabled(self):
+        self.metadata['doe01-foo'] = {'title': 'Foo'}
+        self.config.json_journal = False
+
+        metadata = zoia.backend.json.JSONMetadata(self.config)
+        self.assertEqual(metadata._metadata, {'doe01-foo': {'title': 'Foo'}})
+        self.assertFalse(self.journal_path.exists())
+
+
+class TestTransaction(ZoiaUnitTest):
+    def setUp(self):
+        super().setUp()
+        self.metadata['doe01-foo'] = {'title': 'Foo', 'doi': '10.1000/foo'}
+
+    def test_transaction_writes_once(self):
+        with unittest.mock.patch.object(self.metadata, 'write') as mock_write:
+            with self.metadata.transaction():
+                self.metadata['roe02-bar'] = {'title': 'Bar'}
+                self.metadata['poe03-baz'] = {'title': 'Baz'}
+                mock_write.assert_not_called()
+
+            mock_write.assert_called_once()
+
+    def test_transaction_persists(self):
+        with self.metadata.transaction():
+            self.metadata['roe02-bar'] = {'title': 'Bar'}
+
+        metadata = zoia.backend.json.JSONMetadata(self.config)
+        self.assertIn('roe02-bar', metadata)
+
+    def test_transaction_rollback(self):
+        with self.assertRaises(ValueError):
+            with self.metadata.transaction():
+                self.metadata['roe02-bar'] = {'title': 'Bar'}
+                self.metadata['doe01-foo'] = {'doi': '10.1000/bar'}
+                self.metadata.rename_key('doe01-foo', 'doe01-qux')
+                raise ValueError
+
+        self.assertEqual(
+            self.metadata._metadata,
+            {'doe01-foo': {'title': 'Foo', 'doi': '10.1000/foo'}},
+        )
+        self.assertEqual(
+            self.metadata.find_citekey('doi', '10.1000/foo'), 'doe01-foo'
+        )
+        self.assertFalse(self.metadata.doi_exists('10.1000/bar'))
+
+        metadata = zoia.backend.json.JSONMetadata(self.config)
+        self.assertNotIn('roe02-bar', metadata)
+
+    def test_nested_transaction(self):
+        with unittest.mock.patch.object(self.metadata, 'write') as mock_write:
+            with self.metadata.transaction():
+                with self.metadata.transaction():
+                    self.metadata['roe02-bar'] = {'title': 'Bar'}
+                mock_write.assert_not_called()
+
+            mock_write.assert_called_once()
+
+    def test_transaction_journal(self):
+        self.config.json_journal = True
+        with self.metadata.transaction():
+            self.metadata['roe02-bar'] = {'title': 'Bar'}
+            self.metadata['poe03-baz'] = {'title': 'Baz'}
+            self.assertFalse(Path(self.metadata.journal_filename).exists())
+
+        with open(self.metadata.journal_filename) as fp:
+            self.assertEqual(len(fp.readlines()), 2)
+
+    def test_update_many(self):
+        self.metadata.update_many(
+            {'roe02-bar': {'title': 'Bar'}, 'poe03-baz': {'title': 'Baz'}}
+        )
+
+        metadata = zoia.backend.json.JSONMetadata(self.config)
+        self.assertIn('roe02-bar', metadata)
+        self.assertIn('poe03-baz', metadata)
+
+
+class TestSearch(ZoiaUnitTest):
+    def setUp(self):
+        super().setUp()
+        self.metadata['doe01-foo'] = {
+            'title': 'Foo bar',
+            'authors': [['John', 'Doe']],
+            'tags': ['baz'],
+        }
+        self.metadata['roe02-bar'] = {
+            'title': 'Bär',
+            'authors': [['Jane', 'Roe']],
+        }
+
+    def test_search(self):
+        self.assertEqual(self.metadata.search('doe'), ['doe01-foo'])
+        self.assertEqual(self.metadata.search('foo baz'), ['doe01-foo'])
+        self.assertEqual(self.metadata.search('foo roe'), [])
+
+    def test_search_ranks_titles_first(self):
+        self.metadata['poe03-qux'] = {'title': 'Qux', 'tags': ['bar']}
+        self.assertEqual(
+            self.metadata.search('bar'),
+            ['doe01-foo', 'roe02-bar', 'poe03-qux'],
+        )
+
+    def test_search_limit(self):
+        self.assertEqual(len(self.metadata.search('bar', limit=1)), 1)
+
+    def test_search_empty_query(self):
+        self.assertEqual(self.metadata.search(' '), [])
@@ -0,0 +1,90 @@
+import os
+import time
+import unittest
+
+from ..context import zoia
+from zoia.backend.pdf_pool import PdfPool
+from zoia.backend.pdf_pool import ZoiaPdfException
+
+
+# The tasks have to be importable by the workers.
+def _square(x):
+    return x * x
+
+
+def _fail():
+    raise ValueError('Bad PDF.')
+
+
+def _sleep(seconds):
+    time.sleep(seconds)
+    return os.getpid()
+
+
+def _exit():
+    os._exit(3)
+
+
+def _allocate(n_bytes):
+    return len(bytearray(n_bytes))
+
+
+class TestPdfPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = PdfPool(workers=2, timeout=10.0, memory_limit=None)
+        self.addCleanup(self.pool.shutdown)
+
+    def test_map(self):
+        self.assertEqual(
+            list(self.pool.map(_square, range(5))), [0, 1, 4, 9, 16]
+        )
+
+    def test_exception(self):
+        with self.assertRaisesRegex(ZoiaPdfException, 'ValueError: Bad PDF'):
+            self.pool.submit(_fail).result()
+
+        # The worker survives exceptions.
+        self.assertEqual(self.pool.submit(_square, 3).result(), 9)
+
+    def test_timeout(self):
+        self.pool.timeout = 0.5
+        start = time.monotonic()
+        with self.assertRaisesRegex(ZoiaPdfException, 'Timed out'):
+            self.pool.submit(_sleep, 60).result()
+        self.assertLess(time.monotonic() - start, 30)
+
+        # A new worker replaces the killed one.
+        self.assertIsInstance(self.pool.submit(_sleep, 0).result(), int)
+
+    def test_worker_died(self):
+        with self.assertRaisesRegex(ZoiaPdfException, 'exit code 3'):
+            self.pool.submit(_exit).result()
+        self.assertEqual(self.pool.submit(_square, 2).result(), 4)
+
+    @unittest.skipIf(
+        zoia.backend.pdf_pool.resource is None, 'No resource limits.'
+    )
+    def test_memory_limit(self):
+        pool = PdfPool(workers=1, memory_limit=256)
+        self.addCleanup(pool.shutdown)
+        with self.assertRaisesRegex(ZoiaPdfException, 'MemoryError'):
+            pool.submit(_allocate, 1024 * 1024 * 1024).result()
+        self.assertEqual(pool.submit(_allocate, 1024).result(), 1024)
+
+    def test_reuses_workers(self):
+        pids = {self.pool.submit(_sleep, 0).result() for _ in range(5)}
+        self.assertEqual(len(pids), 1)
+
+    def test_shutdown_without_waiting(self):
+        pool = PdfPool(workers=1, timeout=60.0, memory_limit=None)
+        # Start the worker first so that there is a task to kill.
+        pool.submit(_square, 1).result()
+        running = pool.submit(_sleep, 60)
+        queued = pool.submit(_square, 2)
+        while not running.running():
+            time.sleep(0.01)
+
+        pool.shutdown(wait=False)
+        self.assertTrue(queued.cancelled())
+        with self.assertRaises(ZoiaPdfException):
+            running.result()
@@ -0,0 +1,57 @@
+import threading
+import unittest
+import unittest.mock
+
+from ..context import zoia
+import zoia.backend.pipeline
+
+
+class TestStageGraph(unittest.TestCase):
+    def test_run(self):
+        graph = zoia.backend.pipeline.StageGraph()
+        graph.add('a', lambda: 1)
+        graph.add('b', lambda: 2)
+        graph.add('c', lambda a, b: a + b, deps=['a', 'b'])
+        graph.add('d', lambda c, a: c * 10 + a, deps=['c', 'a'])
+
+        self.assertEqual(graph.run(), {'a': 1, 'b': 2, 'c': 3, 'd': 31})
+        self.assertEqual(set(graph.timings), {'a', 'b', 'c', 'd'})
+
+    def test_stages_start_when_ready(self):
+        # `slow` only finishes once `fast_dependent` has run, so this only
+        # finishes if `fast_dependent` doesn't wait for `slow`.
+        fast_dependent_ran = threading.Event()
+
+        def slow():
+            return fast_dependent_ran.wait(timeout=5)
+
+        graph = zoia.backend.pipeline.StageGraph()
+        graph.add('slow', slow)
+        graph.add('fast', lambda: None)
+        graph.add(
+            'fast_dependent', lambda _: fast_dependent_ran.set(), ['fast']
+        )
+
+        self.assertTrue(graph.run()['slow'])
+
+    def test_error(self):
+        cleanup = unittest.mock.MagicMock()
+        dependent = unittest.mock.MagicMock()
+
+        def fail():
+            raise RuntimeError('Failed.')
+
+        graph = zoia.backend.pipeline.StageGraph()
+        graph.add('ok', lambda: 'foo', cleanup=cleanup)
+        graph.add('fail', fail)
+        graph.add('dependent', dependent, deps=['ok', 'fail'])
+
+        with self.assertRaisesRegex(RuntimeError, 'Failed.'):
+            graph.run()
+        cleanup.assert_called_once_with('foo')
+        dependent.assert_not_called()
+
+    def test_unknown_dependency(self):
+        graph = zoia.backend.pipeline.StageGraph()
+        with self.assertRaises(ValueError):
+            graph.add('a', lambda b: b, deps=['b'])
@@ -0,0 +1,60 @@
+import errno
+import os
+import tempfile
+import unittest
+import unittest.mock
+from pathlib import Path
+
+from ..context import zoia
+import zoia.backend.placement
+from zoia.backend.config import PdfPlacement
+
+
+def _fail(source, destination):
+    Path(destination).write_bytes(b'%PD')
+    raise OSError(errno.EOPNOTSUPP, 'Not supported.')
+
+
+class TestPlaceFile(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.source = Path(self.tmpdir.name) / 'foo.pdf'
+        self.source.write_bytes(b'%PDF-1.4 foo')
+        self.destination = Path(self.tmpdir.name) / 'document.pdf'
+
+    def _place_file(self, placement):
+        zoia.backend.placement.place_file(
+            str(self.source), str(self.destination), placement
+        )
+
+    def test_copy(self):
+        self._place_file(PdfPlacement.COPY)
+        self.assertEqual(self.destination.read_bytes(), b'%PDF-1.4 foo')
+        self.assertNotEqual(
+            os.stat(self.source).st_ino, os.stat(self.destination).st_ino
+        )
+
+    def test_copy_falls_back(self):
+        with unittest.mock.patch.object(
+            zoia.backend.placement, '_CLONE_FNS', [_fail, _fail]
+        ):
+            self._place_file(PdfPlacement.COPY)
+        self.assertEqual(self.destination.read_bytes(), b'%PDF-1.4 foo')
+
+    def test_hardlink(self):
+        self._place_file(PdfPlacement.HARDLINK)
+        self.assertEqual(
+            os.stat(self.source).st_ino, os.stat(self.destination).st_ino
+        )
+
+    @unittest.mock.patch('zoia.backend.placement.os.link')
+    def test_hardlink_other_filesystem(self, mock_link):
+        mock_link.side_effect = OSError(errno.EXDEV, 'Cross-device link')
+        self._place_file(PdfPlacement.HARDLINK)
+        self.assertEqual(self.destination.read_bytes(), b'%PDF-1.4 foo')
+
+    def test_move(self):
+        self._place_file(PdfPlacement.MOVE)
+        self.assertFalse(self.source.exists())
+        self.assertEqual(self.destination.read_bytes(), b'%PDF-1.4 foo')
@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+
+from ..context import zoia
+import zoia.backend.review
+from zoia.backend.review import ReviewItem
+
+
+class TestReviewQueue(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.filename = os.path.join(self.tmpdir.name, 'review.json')
+
+    def test_empty(self):
+        review_queue = zoia.backend.review.ReviewQueue(self.filename)
+        self.assertEqual(list(review_queue), [])
+
+    def test_round_trip(self):
+        review_queue = zoia.backend.review.ReviewQueue(self.filename)
+        review_queue.add(ReviewItem('/foo.pdf', 'abc', 'No identifiers.'))
+        review_queue.add(
+            ReviewItem(
+                '/bar.pdf',
+                'def',
+                'Not found.',
+                [
+                    {
+                        'id_type': 'doi',
+                        'identifier': '10.1000/foo',
+                        'score': 3,
+                        'source': 'text',
+                    }
+                ],
+            )
+        )
+        review_queue.write()
+
+        review_queue = zoia.backend.review.ReviewQueue(self.filename)
+        self.assertEqual(len(review_queue), 2)
+        self.assertIn('def', review_queue)
+        self.assertEqual(
+            [item.path for item in review_queue], ['/foo.pdf', '/bar.pdf']
+        )
+
+    def test_add_replaces(self):
+        review_queue = zoia.backend.review.ReviewQueue(self.filename)
+        review_queue.add(ReviewItem('/foo.pdf', 'abc', 'No identifiers.'))
+        review_queue.add(ReviewItem('/bar.pdf', 'abc', 'Not found.'))
+        self.assertEqual([item.path for item in review_queue], ['/bar.pdf'])
+
+        review_queue.remove('abc')
+        review_queue.remove('abc')
+        self.assertEqual(len(review_queue), 0)
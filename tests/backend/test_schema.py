@@ -0,0 +1,83 @@
+import sqlite3
+import unittest
+import unittest.mock
+
+from ..context import zoia
+import zoia.backend.schema
+
+
+def _get_table_names(connection):
+    rows = connection.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table'"
+    )
+    return {row[0] for row in rows}
+
+
+class TestMigrate(unittest.TestCase):
+    def setUp(self):
+        self.connection = sqlite3.connect(':memory:')
+
+    def tearDown(self):
+        self.connection.close()
+
+    def test_get_schema_version_empty_database(self):
+        cursor = self.connection.cursor()
+        self.assertEqual(zoia.backend.schema.get_schema_version(cursor), 0)
+
+    def test_migrate_empty_database(self):
+        old_version = zoia.backend.schema.migrate(self.connection)
+        self.assertEqual(old_version, 0)
+        self.assertTrue(
+            {'entries', 'authors', 'tags', 'schema_version'}.issubset(
+                _get_table_names(self.connection)
+            )
+        )
+        self.assertEqual(
+            zoia.backend.schema.get_schema_version(self.connection.cursor()),
+            zoia.backend.schema.SCHEMA_VERSION,
+        )
+
+    def test_migrate_up_to_date_database(self):
+        zoia.backend.schema.migrate(self.connection)
+        # Any migration that is run would now raise an exception.
+        with unittest.mock.patch(
+            'zoia.backend.schema.MIGRATIONS',
+            new=[['NOT VALID SQL']] * zoia.backend.schema.SCHEMA_VERSION,
+        ):
+            old_version = zoia.backend.schema.migrate(self.connection)
+
+        self.assertEqual(old_version, zoia.backend.schema.SCHEMA_VERSION)
+
+    def test_migrate_applies_new_migrations(self):
+        zoia.backend.schema.migrate(self.connection)
+        version = zoia.backend.schema.SCHEMA_VERSION
+        migrations = zoia.backend.schema.MIGRATIONS + [
+            ['CREATE TABLE foo (bar INTEGER)'],
+        ]
+        with unittest.mock.patch.multiple(
+            'zoia.backend.schema',
+            MIGRATIONS=migrations,
+            SCHEMA_VERSION=version + 1,
+        ):
+            old_version = zoia.backend.schema.migrate(self.connection)
+
+        self.assertEqual(old_version, version)
+        self.assertIn('foo', _get_table_names(self.connection))
+        self.assertEqual(
+            zoia.backend.schema.get_schema_version(self.connection.cursor()),
+            version + 1,
+        )
+
+    def test_failed_migration_is_rolled_back(self):
+        migrations = zoia.backend.schema.MIGRATIONS + [
+            ['CREATE TABLE foo (bar INTEGER)', 'NOT VALID SQL'],
+        ]
+        with unittest.mock.patch.multiple(
+            'zoia.backend.schema',
+            MIGRATIONS=migrations,
+            SCHEMA_VERSION=len(migrations),
+        ):
+            with self.assertRaises(sqlite3.OperationalError):
+                zoia.backend.schema.migrate(self.connection)
+
+        self.assertEqual(_get_table_names(self.connection), set())
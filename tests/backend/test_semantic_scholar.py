@@ -0,0 +1,139 @@
+import http.server
+import json
+import tempfile
+import unittest
+import urllib.parse
+
+from ..context import zoia
+from ..fixtures.server import start_server
+import zoia.backend.cache
+import zoia.backend.http
+import zoia.backend.semantic_scholar
+
+_PAPERS = {
+    'arXiv:1601.00001': {'title': 'Foo'},
+    'arXiv:1601.00002': {'title': 'Bar'},
+    'DOI:10.1000/baz': {'title': 'Baz'},
+    # Only known to the single paper endpoint.
+    'DOI:10.1000/qux': {'title': 'Qux'},
+}
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    """A stand-in for the Semantic Scholar Graph API."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def _send_json(self, status, value):
+        body = json.dumps(value).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        paper_ids = json.loads(body)['ids']
+        self.server.requests.append(('batch', paper_ids))
+        if self.server.fail_batches:
+            self._send_json(500, {'error': 'Internal server error'})
+            return
+
+        self._send_json(
+            200,
+            [
+                _PAPERS[elem] if elem != 'DOI:10.1000/qux' else None
+                for elem in paper_ids
+            ],
+        )
+
+    def do_GET(self):
+        path = urllib.parse.urlsplit(self.path).path
+        paper_id = urllib.parse.unquote(path.split('/paper/', 1)[1])
+        self.server.requests.append(('single', paper_id))
+        if paper_id in _PAPERS:
+            self._send_json(200, _PAPERS[paper_id])
+        else:
+            self._send_json(404, {'error': 'Paper not found'})
+
+    def log_message(self, *args):
+        pass
+
+
+class TestSemanticScholarResolver(unittest.TestCase):
+    def setUp(self):
+        self.server, self.url = start_server(
+            self, _Handler, requests=[], fail_batches=False
+        )
+
+        self.session = zoia.backend.http.ZoiaSession()
+        self.addCleanup(self.session.close)
+
+    def _get_resolver(self, cache=None):
+        return zoia.backend.semantic_scholar.SemanticScholarResolver(
+            self.session,
+            cache,
+            api_url=self.url,
+        )
+
+    def test_prefetch(self):
+        resolver = self._get_resolver()
+        resolver.prefetch(
+            ['arXiv:1601.00001', 'arXiv:1601.00002', 'DOI:10.1000/baz']
+        )
+        self.assertEqual(len(self.server.requests), 1)
+
+        self.assertEqual(resolver.get('arXiv:1601.00001')['title'], 'Foo')
+        self.assertEqual(resolver.get('arXiv:1601.00002')['title'], 'Bar')
+        self.assertEqual(resolver.get('DOI:10.1000/baz')['title'], 'Baz')
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_batch_size(self):
+        resolver = self._get_resolver()
+        resolver.prefetch(
+            ['arXiv:1601.00001', 'arXiv:1601.00002', 'DOI:10.1000/baz'],
+            batch_size=2,
+        )
+        self.assertEqual(
+            self.server.requests,
+            [
+                ('batch', ['arXiv:1601.00001', 'arXiv:1601.00002']),
+                ('batch', ['DOI:10.1000/baz']),
+            ],
+        )
+
+    def test_missing_from_batch(self):
+        resolver = self._get_resolver()
+        resolver.prefetch(['DOI:10.1000/qux', 'DOI:10.1000/missing'])
+
+        self.assertEqual(resolver.get('DOI:10.1000/qux')['title'], 'Qux')
+        self.assertIsNone(resolver.get('DOI:10.1000/missing'))
+        self.assertEqual(
+            self.server.requests[1:],
+            [('single', 'DOI:10.1000/qux'), ('single', 'DOI:10.1000/missing')],
+        )
+
+    def test_failed_batch(self):
+        self.server.fail_batches = True
+        resolver = self._get_resolver()
+        resolver.prefetch(['arXiv:1601.00001', 'arXiv:1601.00002'])
+
+        self.assertEqual(resolver.get('arXiv:1601.00001')['title'], 'Foo')
+        self.assertEqual(
+            self.server.requests[1:], [('single', 'arXiv:1601.00001')]
+        )
+
+    def test_cache(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = zoia.backend.cache.ResponseCache(
+                tmpdir, ttls={'semantic_scholar': 60}, max_size=2 ** 20
+            )
+            self._get_resolver(cache).prefetch(
+                ['arXiv:1601.00001', 'DOI:10.1000/baz']
+            )
+
+            resolver = self._get_resolver(cache)
+            resolver.prefetch(['arXiv:1601.00001', 'DOI:10.1000/BAZ'])
+            self.assertEqual(resolver.get('DOI:10.1000/BAZ')['title'], 'Baz')
+            self.assertEqual(len(self.server.requests), 1)
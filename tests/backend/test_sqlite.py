@@ -1,9 +1,13 @@
+import sqlite3
 import tempfile
 import unittest
 from pathlib import Path
 
+import sqlalchemy
+
 from ..context import zoia
 import zoia.backend.config
+import zoia.backend.schema
 import zoia.backend.sqlite
 
 
@@ -187,3 +191,238 @@ class TestSqlLiteMetadata(unittest.TestCase):
         self._init_db()
         self.assertTrue(self.metadata.pdf_md5_hash_exists('foobar'))
         self.assertFalse(self.metadata.pdf_md5_hash_exists('bazqux'))
+
+    def test_find_citekey(self):
+        self._init_db()
+        self.assertEqual(
+            self.metadata.find_citekey('doi', '10.1000/foo'), 'doe+roe01-foo'
+        )
+        self.assertIsNone(self.metadata.find_citekey('doi', '10.1000/bar'))
+
+    def test_transaction_rollback(self):
+        self._init_db()
+        with self.assertRaises(ValueError):
+            with self.metadata.transaction():
+                self.metadata['roe02-bar'] = {
+                    'title': 'Bar',
+                    'authors': [['Jane', 'Roe']],
+                }
+                self.assertIn('roe02-bar', self.metadata)
+                raise ValueError
+
+        self.assertNotIn('roe02-bar', self.metadata)
+        self.assertIn('doe+roe01-foo', self.metadata)
+
+    def test_update_many(self):
+        self._init_db()
+        self.metadata.update_many(
+            [
+                ('roe02-bar', {'title': 'Bar', 'authors': [['Jane', 'Roe']]}),
+                ('poe03-baz', {'title': 'Baz', 'authors': [['Ed', 'Poe']]}),
+            ]
+        )
+
+        metadata = zoia.backend.sqlite.SQLiteMetadata(self.config)
+        self.assertIn('roe02-bar', metadata)
+        self.assertIn('poe03-baz', metadata)
+
+    def _get_index_names(self):
+        with self.metadata.engine.connect() as connection:
+            rows = connection.execute(
+                sqlalchemy.text('PRAGMA index_list(entries)')
+            )
+            return {row[1] for row in rows}
+
+    def test_identifier_indexes(self):
+        self._init_db()
+        self.assertTrue(
+            {
+                'ix_entries_arxiv_id',
+                'ix_entries_doi',
+                'ix_entries_isbn',
+                'ix_entries_pdf_md5',
+            }.issubset(self._get_index_names())
+        )
+
+    def test_migrate_unindexed_database(self):
+        db_path = (
+            Path(self.config.db_root)
+            / zoia.backend.sqlite.ZOIA_METADATA_FILENAME
+        )
+        connection = sqlite3.connect(db_path)
+        connection.execute(
+            'CREATE TABLE entries (citekey VARCHAR NOT NULL, '
+            'entry_type VARCHAR, title VARCHAR, year INTEGER, '
+            'arxiv_id VARCHAR, doi VARCHAR, isbn VARCHAR, pdf_md5 VARCHAR, '
+            'other_metadata VARCHAR, PRIMARY KEY (citekey))'
+        )
+        connection.commit()
+        connection.close()
+
+        self._init_db()
+        self.assertIn('ix_entries_doi', self._get_index_names())
+        with self.metadata.engine.connect() as connection:
+            version = connection.execute(
+                sqlalchemy.text('SELECT version FROM schema_version')
+            ).scalar()
+        self.assertEqual(version, zoia.backend.schema.SCHEMA_VERSION)
+
+    def test_pragmas(self):
+        self.config.sqlite_pragmas = zoia.backend.config.SQLitePragmas(
+            busy_timeout=1234
+        )
+        self._init_db()
+        with self.metadata.engine.connect() as connection:
+            journal_mode = connection.execute(
+                sqlalchemy.text('PRAGMA journal_mode')
+            ).scalar()
+            busy_timeout = connection.execute(
+                sqlalchemy.text('PRAGMA busy_timeout')
+            ).scalar()
+
+        self.assertEqual(journal_mode, 'wal')
+        self.assertEqual(busy_timeout, 1234)
+
+    def test___setitem___new_entry(self):
+        self._init_db()
+        self.metadata['roe02-bar'] = {
+            'entry_type': 'article',
+            'title': 'Bar',
+            'year': 2002,
+            'authors': [['Jane', 'Roe'], ['John', 'Doe']],
+            'tags': ['baz', 'qux', 'baz'],
+            'journal': 'quux',
+        }
+
+        metadata = zoia.backend.sqlite.SQLiteMetadata(self.config)
+        self.assertEqual(
+            metadata['roe02-bar'],
+            {
+                'citekey': 'roe02-bar',
+                'entry_type': 'article',
+                'title': 'Bar',
+                'year': 2002,
+                'authors': [['Jane', 'Roe'], ['John', 'Doe']],
+                'tags': ['baz', 'qux'],
+                'journal': 'quux',
+            },
+        )
+
+    def test___setitem___replaces_authors_and_tags(self):
+        self._init_db()
+        metadatum = self.metadata['doe+roe01-foo']
+        metadatum['authors'] = [['John', 'Doe']]
+        metadatum['tags'] = ['bar']
+        self.metadata['doe+roe01-foo'] = metadatum
+
+        metadatum = self.metadata['doe+roe01-foo']
+        self.assertEqual(metadatum['authors'], [['John', 'Doe']])
+        self.assertEqual(metadatum['tags'], ['bar'])
+
+    def test___setitem___shared_tags(self):
+        self._init_db()
+        for citekey in ['roe02-bar', 'poe03-baz']:
+            self.metadata[citekey] = {'title': 'Qux', 'tags': ['quux']}
+
+        self.assertEqual(self.metadata['roe02-bar']['tags'], ['quux'])
+        self.assertEqual(self.metadata['poe03-baz']['tags'], ['quux'])
+
+    def test_rename_key_moves_authors_and_tags(self):
+        self._init_db()
+        self.metadata['roe02-bar'] = {
+            'title': 'Bar',
+            'authors': [['Jane', 'Roe']],
+            'tags': ['baz'],
+        }
+        self.metadata.rename_key('roe02-bar', 'roe02-qux')
+
+        metadatum = self.metadata['roe02-qux']
+        self.assertEqual(metadatum['authors'], [['Jane', 'Roe']])
+        self.assertEqual(metadatum['tags'], ['baz'])
+
+    def test_migrate_tags_table(self):
+        db_path = (
+            Path(self.config.db_root)
+            / zoia.backend.sqlite.ZOIA_METADATA_FILENAME
+        )
+        connection = sqlite3.connect(db_path)
+        for statement in zoia.backend.schema.MIGRATIONS[0]:
+            connection.execute(statement)
+        connection.execute(
+            "INSERT INTO entries (citekey, title) VALUES ('roe02-bar', 'Bar')"
+        )
+        connection.execute(
+            "INSERT INTO tags (name, entry_id) VALUES ('baz', 'roe02-bar')"
+        )
+        connection.commit()
+        connection.close()
+
+        self._init_db()
+        self.assertEqual(self.metadata['roe02-bar']['tags'], ['baz'])
+
+    def test_search(self):
+        self._init_db()
+        self.metadata['roe02-bar'] = {
+            'title': 'Bär',
+            'authors': [['Jane', 'Roe']],
+            'tags': ['baz'],
+        }
+        self.metadata['poe03-qux'] = {'title': 'Qux', 'tags': ['bar']}
+
+        self.assertEqual(self.metadata.search('roe baz'), ['roe02-bar'])
+        self.assertEqual(
+            self.metadata.search('bar'), ['roe02-bar', 'poe03-qux']
+        )
+        self.assertEqual(self.metadata.search('bar', limit=1), ['roe02-bar'])
+        self.assertEqual(self.metadata.search('"'), [])
+        self.assertEqual(self.metadata.search(''), [])
+
+    def test_search_citekey_without_tokens(self):
+        self._init_db()
+        self.metadata['+'] = {'title': 'Quux'}
+        self.metadata['+'] = {'title': 'Quux corge'}
+        self.assertEqual(self.metadata.search('quux'), ['+'])
+
+    def test_search_after_rename(self):
+        self._init_db()
+        self.metadata['roe02-bar'] = {'title': 'Bar'}
+        self.metadata.rename_key('roe02-bar', 'roe02-qux')
+        self.assertEqual(self.metadata.search('bar'), ['roe02-qux'])
+
+    def test_search_notes(self):
+        self._init_db()
+        self.metadata['roe02-bar'] = {'title': 'Bar'}
+        notes_dir = Path(self.config.library_root) / 'roe02-bar'
+        notes_dir.mkdir()
+        (notes_dir / 'notes.md').write_text('Something about quux.')
+
+        self.assertEqual(self.metadata.search('quux'), [])
+        self.metadata.update_search_index('roe02-bar')
+        self.assertEqual(self.metadata.search('quux'), ['roe02-bar'])
+
+    def test_migrate_search_index(self):
+        db_path = (
+            Path(self.config.db_root)
+            / zoia.backend.sqlite.ZOIA_METADATA_FILENAME
+        )
+        connection = sqlite3.connect(db_path)
+        for migration in zoia.backend.schema.MIGRATIONS[:2]:
+            for statement in migration:
+                connection.execute(statement)
+        connection.execute(
+            "INSERT INTO entries (citekey, title) VALUES ('roe02-bar', 'Bar')"
+        )
+        connection.execute(
+            "INSERT INTO authors (first_name, last_name, entry_id) "
+            "VALUES ('Jane', 'Roe', 'roe02-bar')"
+        )
+        connection.commit()
+        connection.close()
+
+        notes_dir = Path(self.config.library_root) / 'roe02-bar'
+        notes_dir.mkdir()
+        (notes_dir / 'notes.md').write_text('Something about quux.')
+
+        self.metadata = zoia.backend.sqlite.SQLiteMetadata(self.config)
+        self.assertEqual(self.metadata.search('roe'), ['roe02-bar'])
+        self.assertEqual(self.metadata.search('quux'), ['roe02-bar'])
@@ -0,0 +1,181 @@
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from ..context import zoia
+import zoia.backend.config
+import zoia.backend.schema
+import zoia.backend.sqlite
+import zoia.backend.sqlite3
+
+
+class TestSQLite3Metadata(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        library_root = Path(self.tmpdir.name) / 'library'
+        db_root = Path(self.tmpdir.name) / 'data'
+
+        library_root.mkdir()
+        db_root.mkdir()
+
+        self.config = zoia.backend.config.ZoiaConfig(
+            library_root=str(library_root),
+            db_root=str(db_root),
+            backend=zoia.backend.config.ZoiaBackend.SQLITE3,
+        )
+        self.metadatum = {
+            'entry_type': 'article',
+            'title': 'Foo',
+            'year': 2001,
+            'arxiv_id': '2001.00001',
+            'isbn': '9780691159027',
+            'doi': '10.1000/foo',
+            'pdf_md5': 'foobar',
+            'authors': [['John', 'Doe'], ['Jane', 'Roe']],
+            'tags': ['bar'],
+            'journal': 'qux',
+        }
+        self.metadata = zoia.backend.sqlite3.SQLite3Metadata(self.config)
+        self.metadata['doe+roe01-foo'] = self.metadatum
+
+    def tearDown(self):
+        self.metadata.connection.close()
+        self.tmpdir.cleanup()
+
+    def test_get_metadata(self):
+        metadata = zoia.backend.metadata.get_metadata(self.config)
+        self.assertIsInstance(metadata, zoia.backend.sqlite3.SQLite3Metadata)
+
+    def test___contains__(self):
+        self.assertIn('doe+roe01-foo', self.metadata)
+        self.assertNotIn('doe+roe02-bar', self.metadata)
+
+    def test___getitem__(self):
+        expected_metadatum = dict(self.metadatum, citekey='doe+roe01-foo')
+        self.assertEqual(self.metadata['doe+roe01-foo'], expected_metadatum)
+
+    def test___getitem___missing_citekey(self):
+        with self.assertRaises(KeyError):
+            self.metadata['doe+roe02-bar']
+
+    def test___setitem___update(self):
+        self.metadata['doe+roe01-foo'] = {
+            'title': 'Foo',
+            'authors': [['John', 'Doe']],
+            'journal': 'quux',
+        }
+        metadatum = self.metadata['doe+roe01-foo']
+        self.assertEqual(metadatum['journal'], 'quux')
+        self.assertEqual(metadatum['authors'], [['John', 'Doe']])
+        self.assertEqual(metadatum['tags'], ['bar'])
+        self.assertNotIn('doi', metadatum)
+
+    def test_rename_key(self):
+        self.metadata.rename_key('doe+roe01-foo', 'doe+roe02-bar')
+        self.assertNotIn('doe+roe01-foo', self.metadata)
+        metadatum = self.metadata['doe+roe02-bar']
+        self.assertEqual(
+            metadatum['authors'], [['John', 'Doe'], ['Jane', 'Roe']]
+        )
+        self.assertEqual(metadatum['tags'], ['bar'])
+
+    def test_rename_key_existing_key(self):
+        self.metadata['roe02-bar'] = {'title': 'Bar'}
+        with self.assertRaises(KeyError):
+            self.metadata.rename_key('doe+roe01-foo', 'roe02-bar')
+
+    def test_identifier_exists(self):
+        self.assertTrue(self.metadata.arxiv_id_exists('2001.00001'))
+        self.assertFalse(self.metadata.arxiv_id_exists('2001.00002'))
+        self.assertTrue(self.metadata.isbn_exists('9780691159027'))
+        self.assertFalse(self.metadata.isbn_exists('1'))
+        self.assertTrue(self.metadata.doi_exists('10.1000/foo'))
+        self.assertFalse(self.metadata.doi_exists('10.1000/bar'))
+        self.assertTrue(self.metadata.pdf_md5_hash_exists('foobar'))
+        self.assertFalse(self.metadata.pdf_md5_hash_exists('bazqux'))
+
+    def test_find_citekey(self):
+        self.assertEqual(
+            self.metadata.find_citekey('doi', '10.1000/foo'), 'doe+roe01-foo'
+        )
+        self.assertIsNone(self.metadata.find_citekey('doi', '10.1000/bar'))
+
+    def test_transaction_rollback(self):
+        with self.assertRaises(ValueError):
+            with self.metadata.transaction():
+                self.metadata['roe02-bar'] = {'title': 'Bar'}
+                self.assertIn('roe02-bar', self.metadata)
+                raise ValueError
+
+        self.assertNotIn('roe02-bar', self.metadata)
+
+    def test_search(self):
+        self.metadata['roe02-bar'] = {'title': 'Bar', 'tags': ['baz']}
+        self.assertEqual(
+            self.metadata.search('bar'), ['roe02-bar', 'doe+roe01-foo']
+        )
+        self.assertEqual(self.metadata.search('doe'), ['doe+roe01-foo'])
+        self.assertEqual(self.metadata.search(''), [])
+
+        self.metadata.rename_key('roe02-bar', 'roe02-qux')
+        self.assertEqual(self.metadata.search('baz'), ['roe02-qux'])
+
+    def test_search_citekey_without_tokens(self):
+        self.metadata['+'] = {'title': 'Quux'}
+        self.metadata['+'] = {'title': 'Quux corge'}
+        self.assertEqual(self.metadata.search('quux'), ['+'])
+
+    def test_search_index_keyed_by_rowid(self):
+        self.metadata['roe02-bar'] = {'title': 'Bar'}
+        self.metadata['roe02-bar'] = {'title': 'Bar baz'}
+        self.metadata.rename_key('roe02-bar', 'roe02-qux')
+
+        rows = self.metadata.connection.execute(
+            'SELECT entries.rowid, entries_fts.rowid FROM entries '
+            'JOIN entries_fts USING (citekey)'
+        ).fetchall()
+        self.assertEqual(len(rows), 2)
+        self.assertTrue(all(elem[0] == elem[1] for elem in rows))
+
+        # Replacing a row of the index doesn't scan the whole index.  (FTS5
+        # reports a full scan as an index without any constraints.)
+        plan = self.metadata.connection.execute(
+            'EXPLAIN QUERY PLAN ' + zoia.backend.schema.DELETE_SEARCH_ENTRY,
+            {'citekey': 'roe02-qux'},
+        ).fetchall()
+        self.assertFalse(
+            any(elem[3].endswith('VIRTUAL TABLE INDEX 0:') for elem in plan)
+        )
+
+    def test_interchangeable_with_sqlalchemy_backend(self):
+        self.metadata.connection.close()
+        metadata = zoia.backend.sqlite.SQLiteMetadata(self.config)
+        self.assertEqual(
+            metadata['doe+roe01-foo'],
+            dict(self.metadatum, citekey='doe+roe01-foo'),
+        )
+
+        metadata['roe02-bar'] = {'title': 'Bar', 'authors': [['Jane', 'Roe']]}
+        metadata.session.close()
+        metadata.engine.dispose()
+
+        self.metadata = zoia.backend.sqlite3.SQLite3Metadata(self.config)
+        self.assertEqual(
+            self.metadata['roe02-bar']['authors'], [['Jane', 'Roe']]
+        )
+
+    def test_does_not_import_sqlalchemy(self):
+        output = subprocess.run(
+            [
+                sys.executable,
+                '-c',
+                'import sys; import zoia.backend.sqlite3; '
+                'print("sqlalchemy" in sys.modules)',
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        self.assertEqual(output.strip(), 'False')
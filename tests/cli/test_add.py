@@ -0,0 +1,92 @@
+import io
+import unittest
+import unittest.mock
+
+from click.testing import CliRunner
+
+from ..context import zoia
+from ..fixtures.metadata import ZoiaUnitTest
+import zoia.cli.add
+from zoia.backend.add import AddResult
+
+
+class TestReadIdentifiers(unittest.TestCase):
+    def test__read_identifiers(self):
+        fp = io.StringIO('1601.00001\n\n# A comment\n  10.1000/foo  \n')
+        self.assertEqual(
+            zoia.cli.add._read_identifiers(fp), ['1601.00001', '10.1000/foo']
+        )
+
+
+class TestAdd(ZoiaUnitTest):
+    @unittest.mock.patch('zoia.cli.add.zoia.backend.config.load_config')
+    @unittest.mock.patch('zoia.cli.add.zoia.backend.add.add_many')
+    def test_add_from_stdin(self, mock_add_many, mock_load_config):
+        mock_load_config.return_value = self.config
+        mock_add_many.return_value = [
+            AddResult('1601.00001', citekey='doe16-foo', metadatum='Foo'),
+            AddResult('1601.00002', error='Bad paper.'),
+        ]
+
+        runner = CliRunner()
+        result = runner.invoke(
+            zoia.cli.zoia,
+            args=['add', '1601.00001', '--file', '-', '-j', '2'],
+            input='1601.00002\n',
+        )
+
+        self.assertEqual(result.exit_code, 1)
+        mock_add_many.assert_called_once_with(
+            self.config, ['1601.00001', '1601.00002'], jobs=2, use_cache=True
+        )
+        self.assertIn('Added 1 documents, 1 failed.', result.output)
+
+    @unittest.mock.patch('zoia.cli.add.zoia.backend.config.load_config')
+    @unittest.mock.patch('zoia.cli.add.zoia.backend.add.add')
+    def test_add_no_cache(self, mock_add, mock_load_config):
+        mock_load_config.return_value = self.config
+        mock_add.return_value = ('doe16-foo', 'Foo', [])
+
+        runner = CliRunner()
+        result = runner.invoke(
+            zoia.cli.zoia, args=['add', '1601.00001', '--no-cache']
+        )
+
+        self.assertEqual(result.exit_code, 0)
+        mock_add.assert_called_once_with(
+            self.config, '1601.00001', None, use_cache=False, timings=None
+        )
+
+    @unittest.mock.patch('zoia.cli.add.zoia.backend.config.load_config')
+    @unittest.mock.patch('zoia.cli.add.zoia.backend.add.add')
+    def test_add_timings(self, mock_add, mock_load_config):
+        mock_load_config.return_value = self.config
+
+        def add(config, identifier, citekey, use_cache, timings):
+            timings.update({'arxiv_metadata': 0.5, 'pdf': 1.25})
+            return ('doe16-foo', 'Foo', [])
+
+        mock_add.side_effect = add
+
+        runner = CliRunner()
+        result = runner.invoke(
+            zoia.cli.zoia, args=['add', '1601.00001', '--timings']
+        )
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn(
+            'Timings: arxiv_metadata 0.50s, pdf 1.25s', result.output
+        )
+
+    def test_add_citekey_with_many_identifiers(self):
+        runner = CliRunner()
+        result = runner.invoke(
+            zoia.cli.zoia,
+            args=['add', '1601.00001', '1601.00002', '--citekey', 'foo'],
+        )
+        self.assertEqual(result.exit_code, 2)
+
+    def test_add_no_identifiers(self):
+        runner = CliRunner()
+        result = runner.invoke(zoia.cli.zoia, args=['add'])
+        self.assertEqual(result.exit_code, 2)
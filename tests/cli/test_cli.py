@@ -0,0 +1,95 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from textwrap import dedent
+
+from ..context import zoia
+import zoia.cli.cli
+
+HEAVY_MODULES = {
+    'bibtexparser',
+    'halo',
+    'isbnlib',
+    'pdfminer',
+    'requests',
+    'sqlalchemy',
+}
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+
+
+def _get_imported_heavy_modules(args):
+    """Invoke the CLI in a fresh interpreter and list the heavy imports."""
+    script = dedent(
+        f'''\
+        import json
+        import sys
+
+        from click.testing import CliRunner
+
+        import zoia.cli
+
+        CliRunner().invoke(zoia.cli.zoia, {args!r})
+        heavy_modules = {sorted(HEAVY_MODULES)!r}
+        print(
+            json.dumps(
+                sorted(
+                    name
+                    for name in heavy_modules
+                    if name in sys.modules
+                )
+            )
+        )
+        '''
+    )
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env = dict(os.environ)
+        env['HOME'] = tmpdir
+        env['XDG_CONFIG_HOME'] = tmpdir
+        env['PYTHONPATH'] = os.pathsep.join(
+            [REPO_ROOT, env.get('PYTHONPATH', '')]
+        )
+        output = subprocess.run(
+            [sys.executable, '-c', script],
+            check=True,
+            capture_output=True,
+            cwd=tmpdir,
+            env=env,
+            text=True,
+        ).stdout
+
+    return set(json.loads(output.splitlines()[-1]))
+
+
+class TestLazyGroup(unittest.TestCase):
+    def test_list_commands(self):
+        commands = zoia.cli.cli.zoia.list_commands(None)
+        self.assertEqual(commands, sorted(zoia.cli.cli.SUBCOMMANDS))
+
+    def test_get_command(self):
+        command = zoia.cli.cli.zoia.get_command(None, 'open')
+        self.assertEqual(command.name, 'open')
+
+    def test_get_unknown_command(self):
+        self.assertIsNone(zoia.cli.cli.zoia.get_command(None, 'foo'))
+
+
+class TestImports(unittest.TestCase):
+    def test_version_imports(self):
+        self.assertEqual(_get_imported_heavy_modules(['--version']), set())
+
+    def test_open_imports(self):
+        self.assertEqual(
+            _get_imported_heavy_modules(['open', 'doe01-foo']), set()
+        )
+
+    def test_config_imports(self):
+        self.assertEqual(_get_imported_heavy_modules(['config']), set())
+
+    def test_add_imports(self):
+        self.assertIn(
+            'requests', _get_imported_heavy_modules(['add', '1601.00001'])
+        )
@@ -0,0 +1,35 @@
+import unittest
+import unittest.mock
+
+from click.testing import CliRunner
+
+from ..context import zoia
+import zoia.cli.download
+from zoia.backend.download import ZoiaDownloadException
+
+
+class TestDownload(unittest.TestCase):
+    @unittest.mock.patch('zoia.cli.download.zoia.backend.config.load_config')
+    @unittest.mock.patch(
+        'zoia.cli.download.zoia.backend.download.download_document'
+    )
+    def test_download(self, mock_download_document, mock_load_config):
+        runner = CliRunner()
+        result = runner.invoke(
+            zoia.cli.zoia, args=['download', 'doe16-foo', '--force']
+        )
+        self.assertEqual(result.exit_code, 0)
+        mock_download_document.assert_called_once_with(
+            mock_load_config.return_value, 'doe16-foo', force=True
+        )
+
+    @unittest.mock.patch('zoia.cli.download.zoia.backend.config.load_config')
+    @unittest.mock.patch(
+        'zoia.cli.download.zoia.backend.download.download_document'
+    )
+    def test_download_error(self, mock_download_document, mock_load_config):
+        mock_download_document.side_effect = ZoiaDownloadException('Oops.')
+        runner = CliRunner()
+        result = runner.invoke(zoia.cli.zoia, args=['download', 'doe16-foo'])
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn('Oops.', result.output)
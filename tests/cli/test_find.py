@@ -0,0 +1,35 @@
+import unittest.mock
+
+from click.testing import CliRunner
+
+from ..context import zoia
+from ..fixtures.metadata import ZoiaUnitTest
+import zoia.cli.find
+
+
+class TestFind(ZoiaUnitTest):
+    def setUp(self):
+        super().setUp()
+        self.metadata['doe01-foo'] = {
+            'title': 'Foo',
+            'authors': [['John', 'Doe']],
+        }
+        self.metadata['roe02-bar'] = {
+            'title': 'Bar',
+            'authors': [['Jane', 'Roe']],
+        }
+
+    @unittest.mock.patch('zoia.cli.find.zoia.backend.config.load_config')
+    def test_find(self, mock_load_config):
+        mock_load_config.return_value = self.config
+        runner = CliRunner()
+        result = runner.invoke(zoia.cli.zoia, args=['find', 'jane', 'roe'])
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(result.output, 'roe02-bar: Bar\n')
+
+    @unittest.mock.patch('zoia.cli.find.zoia.backend.config.load_config')
+    def test_find_no_results(self, mock_load_config):
+        mock_load_config.return_value = self.config
+        runner = CliRunner()
+        result = runner.invoke(zoia.cli.zoia, args=['find', 'qux'])
+        self.assertEqual(result.exit_code, 1)
@@ -0,0 +1,62 @@
+import unittest
+import unittest.mock
+
+from click.testing import CliRunner
+
+from ..context import zoia
+from ..fixtures.metadata import ZoiaUnitTest
+import zoia.cli.import_
+from zoia.backend.add import AddResult
+
+
+class TestImport(ZoiaUnitTest):
+    @unittest.mock.patch('zoia.cli.import_.zoia.backend.config.load_config')
+    @unittest.mock.patch('zoia.cli.import_.zoia.backend.add.import_pdfs')
+    def test_import(self, mock_import_pdfs, mock_load_config):
+        mock_load_config.return_value = self.config
+        mock_import_pdfs.return_value = [
+            AddResult('a.pdf', citekey='doe16-foo', metadatum='Foo'),
+            AddResult('b.pdf', review_reason='No identifiers found.'),
+        ]
+
+        runner = CliRunner()
+        result = runner.invoke(
+            zoia.cli.zoia, args=['import', self.tmpdir.name, '-j', '2']
+        )
+
+        self.assertEqual(result.exit_code, 0)
+        mock_import_pdfs.assert_called_once_with(
+            self.config, self.tmpdir.name, jobs=2, use_cache=True
+        )
+        self.assertIn('Added doe16-foo: Foo', result.output)
+        self.assertIn(
+            'b.pdf: Queued for review: No identifiers found.', result.output
+        )
+        self.assertIn(
+            'Added 1 documents, 0 failed, 1 queued for review.', result.output
+        )
+
+    @unittest.mock.patch('zoia.cli.import_.zoia.backend.config.load_config')
+    @unittest.mock.patch('zoia.cli.import_.zoia.backend.add.review_pdfs')
+    def test_import_review(self, mock_review_pdfs, mock_load_config):
+        mock_load_config.return_value = self.config
+        mock_review_pdfs.return_value = [
+            AddResult('a.pdf', error='PDF a.pdf no longer exists.'),
+        ]
+
+        runner = CliRunner()
+        result = runner.invoke(zoia.cli.zoia, args=['import', '--review'])
+
+        self.assertEqual(result.exit_code, 1)
+        mock_review_pdfs.assert_called_once_with(self.config, use_cache=True)
+        self.assertIn('Reviewed 0 documents, 1 failed.', result.output)
+
+    def test_import_directory_and_review(self):
+        runner = CliRunner()
+        result = runner.invoke(zoia.cli.zoia, args=['import'])
+        self.assertEqual(result.exit_code, 2)
+
+        result = runner.invoke(
+            zoia.cli.zoia, args=['import', self.tmpdir.name, '--review']
+        )
+        self.assertEqual(result.exit_code, 2)
@@ -0,0 +1,21 @@
+import http.server
+import threading
+
+
+def start_server(test_case, handler, **attributes):
+    """Serve requests with `handler` on a local port until the test ends.
+
+    The `attributes` are set on the server, so that the handler can use them
+    through `self.server`.  Returns the server and its URL without a trailing
+    slash.
+
+    """
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    for name, value in attributes.items():
+        setattr(server, name, value)
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    test_case.addCleanup(server.server_close)
+    test_case.addCleanup(server.shutdown)
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
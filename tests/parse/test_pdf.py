@@ -1,6 +1,8 @@
+import io
 import os
 import tempfile
 import unittest
+import unittest.mock
 from pathlib import Path
 
 from ..context import zoia
@@ -34,19 +36,173 @@ class TestPdf(unittest.TestCase):
         )
 
 
+def _make_pdf(pages, info=None):
+    """Make a PDF with a page for each string in `pages`.
+
+    The entries of `info` go into the Info dictionary.
+
+    """
+    n_pages = len(pages)
+    kids = ' '.join(f'{4 + 2 * i} 0 R' for i in range(n_pages))
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        f'<< /Type /Pages /Kids [{kids}] /Count {n_pages} >>'.encode(),
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    for i, text in enumerate(pages):
+        stream = f'BT /F1 12 Tf 72 720 Td ({text}) Tj ET'.encode()
+        objects.append(
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+            f'/Resources << /Font << /F1 3 0 R >> >> '
+            f'/Contents {5 + 2 * i} 0 R >>'.encode()
+        )
+        objects.append(
+            f'<< /Length {len(stream)} >>\nstream\n'.encode()
+            + stream
+            + b'\nendstream'
+        )
+
+    trailer = '/Root 1 0 R'
+    if info is not None:
+        entries = ' '.join(f'/{key} ({value})' for key, value in info.items())
+        objects.append(f'<< {entries} >>'.encode())
+        trailer += f' /Info {len(objects)} 0 R'
+
+    pdf = b'%PDF-1.4\n'
+    offsets = []
+    for i, obj in enumerate(objects):
+        offsets.append(len(pdf))
+        pdf += f'{i + 1} 0 obj\n'.encode() + obj + b'\nendobj\n'
+
+    xref_offset = len(pdf)
+    pdf += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+    for offset in offsets:
+        pdf += f'{offset:010d} 00000 n \n'.encode()
+    pdf += (
+        f'trailer\n<< /Size {len(objects) + 1} {trailer} >>\n'
+        f'startxref\n{xref_offset}\n%%EOF\n'
+    ).encode()
+    return pdf
+
+
 class TestGetDoiFromPdf(unittest.TestCase):
-    @unittest.mock.patch('zoia.parse.pdf.extract_text')
-    def test_get_doi_from_pdf_valid_doi(self, mock_extract_text):
-        mock_extract_text.return_value = (
-            'foo bar doi: 10.1093/mnras/stv1552\n baz qux'
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _get_doi(self, pages, **kwargs):
+        return zoia.parse.pdf.get_doi_from_pdf(
+            io.BytesIO(_make_pdf(pages)), **kwargs
+        )
+
+    def test_get_doi_from_pdf_valid_doi(self):
+        self.assertEqual(
+            self._get_doi(['foo bar doi: 10.1093/mnras/stv1552. baz qux']),
+            '10.1093/mnras/stv1552',
+        )
+
+    def test_get_doi_from_pdf_no_doi(self):
+        self.assertIsNone(self._get_doi(['foo bar doi: baz']))
+
+    def test_get_doi_from_pdf_filename(self):
+        path = Path(self.tmpdir.name) / 'foo.pdf'
+        path.write_bytes(_make_pdf(['doi:10.1000/foo']))
+        self.assertEqual(
+            zoia.parse.pdf.get_doi_from_pdf(str(path)), '10.1000/foo'
         )
 
+    @unittest.mock.patch.object(
+        zoia.parse.pdf.PDFPageInterpreter,
+        'process_page',
+        autospec=True,
+        side_effect=zoia.parse.pdf.PDFPageInterpreter.process_page,
+    )
+    def test_get_doi_from_pdf_stops_early(self, mock_process_page):
+        pages = ['doi:10.1000/foo'] + ['doi:10.1000/bar'] * 49
+        self.assertEqual(self._get_doi(pages), '10.1000/foo')
+        self.assertEqual(mock_process_page.call_count, 1)
+
+    def test_get_doi_from_pdf_max_pages(self):
+        pages = ['foo'] * 4 + ['doi:10.1000/foo'] + ['bar'] * 5
+        self.assertIsNone(self._get_doi(pages, max_pages=4))
+        self.assertEqual(self._get_doi(pages, max_pages=5), '10.1000/foo')
+
+    def test_get_doi_from_pdf_last_page(self):
+        pages = ['foo'] * 9 + ['doi:10.1000/foo']
+        self.assertEqual(self._get_doi(pages, max_pages=2), '10.1000/foo')
+        self.assertIsNone(
+            self._get_doi(pages, max_pages=2, search_last_page=False)
+        )
+
+    def test_get_doi_from_pdf_timeout(self):
+        self.assertIsNone(self._get_doi(['doi:10.1000/foo'], timeout=-1))
+
+
+class TestFindIdentifiers(unittest.TestCase):
+    def _find(self, pages, info=None):
+        return [
+            (candidate.id_type.value, candidate.identifier, candidate.source)
+            for candidate in zoia.parse.pdf.find_identifiers(
+                io.BytesIO(_make_pdf(pages, info))
+            )
+        ]
+
+    def test_find_identifiers_arxiv(self):
+        self.assertEqual(
+            self._find(['arXiv:1601.00001v2 [astro-ph.GA] 1 Jan 2016']),
+            [('arxiv', '1601.00001', 'text')],
+        )
+
+    def test_find_identifiers_old_style_arxiv(self):
+        self.assertEqual(
+            self._find(['arXiv:hep-th/9901001']),
+            [('arxiv', 'hep-th/9901001', 'text')],
+        )
+
+    def test_find_identifiers_isbn(self):
+        self.assertEqual(
+            self._find(['ISBN 978-0-306-40615-7']),
+            [('isbn', '9780306406157', 'text')],
+        )
+
+    def test_find_identifiers_invalid_isbn(self):
+        self.assertEqual(self._find(['ISBN 978-0-306-40615-8']), [])
+
+    def test_find_identifiers_doi_url(self):
         self.assertEqual(
-            zoia.parse.pdf.get_doi_from_pdf(None), '10.1093/mnras/stv1552'
+            self._find(['See https://doi.org/10.1000/foo.']),
+            [('doi', '10.1000/foo', 'text')],
         )
 
-    @unittest.mock.patch('zoia.parse.pdf.extract_text')
-    def test_get_doi_from_pdf_no_doi(self, mock_extract_text):
-        mock_extract_text.return_value = 'foo bar doi: baz'
+    def test_find_identifiers_ignores_bare_doi_in_text(self):
+        self.assertEqual(self._find(['[1] Doe, J. 10.1000/foo']), [])
 
-        self.assertIsNone(zoia.parse.pdf.get_doi_from_pdf(None))
+    @unittest.mock.patch.object(
+        zoia.parse.pdf.PDFPageInterpreter, 'process_page'
+    )
+    def test_find_identifiers_metadata(self, mock_process_page):
+        self.assertEqual(
+            self._find(
+                ['doi:10.1000/bar'],
+                info={'Subject': 'J. Foo 1, 1 2020. 10.1000/foo'},
+            ),
+            [('doi', '10.1000/foo', 'metadata')],
+        )
+        mock_process_page.assert_not_called()
+
+    def test_find_identifiers_ranking(self):
+        self.assertEqual(
+            self._find(
+                [
+                    'ISBN 978-0-306-40615-7 arXiv:1601.00001 doi:10.1000/foo '
+                    'arXiv:1601.00001 arXiv:1601.00001'
+                ]
+            ),
+            [
+                ('arxiv', '1601.00001', 'text'),
+                ('doi', '10.1000/foo', 'text'),
+                ('isbn', '9780306406157', 'text'),
+            ],
+        )
@@ -1,14 +1,22 @@
 """Module to add an item to the library."""
 
+import functools
 import hashlib
 import json
 import os
 import shutil
-from multiprocessing.dummy import Process as ThreadProcess
-from multiprocessing.dummy import Queue as ThreadQueue
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from dataclasses import asdict
+from dataclasses import dataclass
+from dataclasses import field
 from textwrap import dedent
+from typing import Dict
+from typing import List
+from typing import Optional
 
-import bibtexparser
 import click
 import isbnlib
 import requests
@@ -17,11 +25,70 @@ import zoia.backend.config
 import zoia.backend.metadata
 import zoia.parse.citekey
 import zoia.parse.pdf
+import zoia.parse.yaml
+from zoia.backend.arxiv import ArxivResolver
+from zoia.backend.cache import ResponseCache
+from zoia.backend.config import ArxivProvider
+from zoia.backend.config import PdfPlacement
+from zoia.backend.download import Download
+from zoia.backend.download import download_pdf
+from zoia.backend.http import ZoiaSession
+from zoia.backend.metadata import IDENTIFIER_FIELDS
+from zoia.backend.pdf_pool import PdfPool
+from zoia.backend.pdf_pool import ZoiaPdfException
+from zoia.backend.pipeline import StageGraph
+from zoia.backend.placement import place_file
+from zoia.backend.resolver import BATCH_ERRORS
+from zoia.backend.review import ReviewItem
+from zoia.backend.review import ReviewQueue
+from zoia.backend.semantic_scholar import arxiv_paper_id
+from zoia.backend.semantic_scholar import doi_paper_id
+from zoia.backend.semantic_scholar import SemanticScholarResolver
 from zoia.backend.status import StatusMessage
 from zoia.parse.classification import classify_and_normalize_identifier
 from zoia.parse.classification import IdType
 from zoia.parse.classification import ZoiaUnknownIdentifierException
 from zoia.parse.normalization import split_name
+from zoia.parse.pdf import IdentifierCandidate
+
+GOOGLE_BOOKS_URL = 'https://www.googleapis.com/books/v1/volumes'
+
+# The size of the buffer that PDFs are read into to hash them.
+HASH_BUFFER_SIZE = 256 * 1024
+
+# Prefer CSL-JSON, which maps directly to our metadata, but accept BibTeX from
+# registration agencies that don't support it.
+DOI_ACCEPT = (
+    'application/vnd.citationstyles.csl+json, application/x-bibtex;q=0.5'
+)
+
+_CSL_ENTRY_TYPES = {
+    'article': 'article',
+    'article-journal': 'article',
+    'book': 'book',
+    'chapter': 'incollection',
+    'paper-conference': 'inproceedings',
+    'report': 'techreport',
+    'thesis': 'phdthesis',
+}
+
+# The CSL date fields in the order of preference for the year.
+_CSL_DATE_FIELDS = ('issued', 'published-print', 'published-online', 'created')
+
+_MONTHS = [
+    'jan',
+    'feb',
+    'mar',
+    'apr',
+    'may',
+    'jun',
+    'jul',
+    'aug',
+    'sep',
+    'oct',
+    'nov',
+    'dec',
+]
 
 
 class ZoiaAddException(Exception):
@@ -46,13 +113,128 @@ def _validate_response(response, identifier):
         )
 
 
-def _get_arxiv_metadata(identifier):
-    """Get the DOI identifier (if it exists) from the arXiv API."""
-    response = requests.get(
-        f'https://api.semanticscholar.org/v1/paper/arXiv:{identifier}'
+def _get_cached(cache, provider, identifier, fetch_fn):
+    """Return a provider's response from the cache or else fetch it.
+
+    `fetch_fn` must raise an exception instead of returning an invalid
+    response so that failures are never cached.
+
+    """
+    if cache is None:
+        return fetch_fn()
+
+    value = cache.get(provider, identifier)
+    if value is None:
+        value = fetch_fn()
+        cache.set(provider, identifier, value)
+    return value
+
+
+class _Resolvers:
+    """The resolvers of the metadata providers that work in batches.
+
+    A single set of resolvers is shared by all of the fetches of a batch.
+
+    """
+
+    def __init__(
+        self,
+        session,
+        cache=None,
+        arxiv_provider=ArxivProvider.SEMANTIC_SCHOLAR,
+    ):
+        self.semantic_scholar = SemanticScholarResolver(session, cache)
+        self.arxiv = ArxivResolver(session, cache)
+        self.arxiv_provider = arxiv_provider
+
+    @property
+    def arxiv_providers(self):
+        """The providers of arXiv metadata in the order to try them."""
+        return [self.arxiv_provider] + [
+            elem for elem in ArxivProvider if elem != self.arxiv_provider
+        ]
+
+    def prefetch(self, arxiv_ids, dois):
+        """Resolve the papers of a batch with as few requests as possible.
+
+        The arXiv IDs that the preferred provider can't resolve are prefetched
+        from the other provider instead.
+
+        """
+        doi_paper_ids = [doi_paper_id(elem) for elem in dois]
+        if self.arxiv_provider == ArxivProvider.SEMANTIC_SCHOLAR:
+            unresolved = self.semantic_scholar.prefetch(
+                [arxiv_paper_id(elem) for elem in arxiv_ids] + doi_paper_ids
+            )
+            self.arxiv.prefetch(
+                [
+                    elem
+                    for elem in arxiv_ids
+                    if arxiv_paper_id(elem) in unresolved
+                ]
+            )
+        else:
+            unresolved = self.arxiv.prefetch(arxiv_ids)
+            self.semantic_scholar.prefetch(
+                [arxiv_paper_id(elem) for elem in unresolved] + doi_paper_ids
+            )
+
+
+def _resolve(resolver, identifier):
+    try:
+        return resolver.get(identifier)
+    except requests.HTTPError as e:
+        _validate_response(e.response, identifier)
+        raise
+    except ValueError:
+        raise ZoiaAddException(
+            f'Received an invalid response for {identifier}.'
+        )
+
+
+def _get_arxiv_metadata(identifier, session, cache=None, resolvers=None):
+    """Get the metadata of an arXiv paper.
+
+    The metadata come from the preferred provider or, if that fails, from the
+    other one.
+
+    """
+    if resolvers is None:
+        resolvers = _Resolvers(session, cache)
+
+    first_error = None
+    for provider in resolvers.arxiv_providers:
+        get_metadata_fn = _ARXIV_METADATA_FNS[provider]
+        try:
+            return get_metadata_fn(identifier, resolvers)
+        except (
+            ZoiaAddException,
+            RuntimeError,
+            requests.RequestException,
+        ) as e:
+            first_error = first_error or e
+
+    raise first_error
+
+
+def _parse_year(value):
+    """Convert a year from a response to an integer."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ZoiaAddException(
+            f'Received a year "{value}" that is not an integer.'
+        )
+
+
+def _get_semantic_scholar_arxiv_metadata(identifier, resolvers):
+    parsed_response = _resolve(
+        resolvers.semantic_scholar, arxiv_paper_id(identifier)
     )
-    _validate_response(response, identifier)
-    parsed_response = json.loads(response.text)
+    if parsed_response is None:
+        raise ZoiaAddException(
+            f'Identifier {identifier} does not appear to exist.'
+        )
 
     if 'title' not in parsed_response:
         raise RuntimeError('Received response that didn\'t include a title.')
@@ -76,22 +258,155 @@ def _get_arxiv_metadata(identifier):
         'url': f'https://arxiv.org/abs/{identifier}',
     }
 
-    if parsed_response.get('doi') is not None:
-        metadata['doi'] = parsed_response['doi']
+    external_ids = parsed_response.get('externalIds') or {}
+    if external_ids.get('DOI') is not None:
+        metadata['doi'] = external_ids['DOI']
 
     return metadata
 
 
-def _get_doi_metadata(doi):
-    response = requests.get(
-        os.path.join('https://doi.org', doi),
-        headers={'Accept': 'application/x-bibtex'},
-    )
-    _validate_response(response, doi)
+def _get_arxiv_api_metadata(identifier, resolvers):
+    entry = _resolve(resolvers.arxiv, identifier)
+    if entry is None:
+        raise ZoiaAddException(
+            f'Identifier {identifier} does not appear to exist.'
+        )
+
+    for key in ['title', 'published']:
+        if entry.get(key) is None:
+            raise RuntimeError(
+                f'Received response that didn\'t include a {key}.'
+            )
+
+    metadata = {
+        'arxiv_id': identifier,
+        'entry_type': 'article',
+        'title': entry['title'],
+        'authors': [split_name(elem) for elem in entry['authors']],
+        'year': _parse_year(entry['published'][:4]),
+        'url': f'https://arxiv.org/abs/{identifier}',
+    }
+
+    if entry.get('doi') is not None:
+        metadata['doi'] = entry['doi']
+
+    return metadata
+
+
+_ARXIV_METADATA_FNS = {
+    ArxivProvider.SEMANTIC_SCHOLAR: _get_semantic_scholar_arxiv_metadata,
+    ArxivProvider.ARXIV: _get_arxiv_api_metadata,
+}
+
+
+def _get_doi_metadata(doi, session, cache=None):
+    """Get the metadata of a DOI from its registration agency.
+
+    The response is cached as a dictionary if it is CSL-JSON or else as the
+    BibTeX string.
+
+    """
+
+    def fetch():
+        response = session.get(
+            os.path.join('https://doi.org', doi),
+            headers={'Accept': DOI_ACCEPT},
+        )
+        _validate_response(response, doi)
+        if 'json' not in response.headers.get('Content-Type', ''):
+            return response.text
+
+        try:
+            value = json.loads(response.text)
+        except ValueError:
+            value = None
+        if not isinstance(value, dict):
+            raise ZoiaAddException(f'Received an invalid response for {doi}.')
+        return value
+
+    # DOIs are case-insensitive.
+    value = _get_cached(cache, 'doi', doi.lower(), fetch)
+    try:
+        if isinstance(value, dict):
+            return _parse_csl_json(value, doi)
+        return _parse_bibtex(value)
+    except (AttributeError, KeyError, TypeError, ValueError) as e:
+        # E.g., a field has the wrong type.
+        raise ZoiaAddException(
+            f'Received invalid metadata for {doi}: {e!r}'
+        ) from e
+
+
+def _get_csl_text(value):
+    # Some agencies give lists where others give strings.
+    if isinstance(value, list):
+        return value[0] if value else None
+    return value
+
+
+def _parse_csl_json(csl, doi):
+    """Convert CSL-JSON to a metadatum dictionary."""
+    title = _get_csl_text(csl.get('title'))
+    if not title:
+        raise RuntimeError('Received response that didn\'t include a title.')
+
+    authors = []
+    for author in csl.get('author', []):
+        if 'family' in author:
+            authors.append([author.get('given', ''), author['family']])
+        elif 'literal' in author:
+            authors.append(split_name(author['literal']))
+
+    entry = {
+        'entry_type': _CSL_ENTRY_TYPES.get(csl.get('type'), 'misc'),
+        'title': title,
+        'authors': authors,
+        'doi': csl.get('DOI', doi),
+    }
+
+    for date_field in _CSL_DATE_FIELDS:
+        date_parts = (csl.get(date_field) or {}).get('date-parts') or [[]]
+        if date_parts[0] and date_parts[0][0] is not None:
+            entry['year'] = _parse_year(date_parts[0][0])
+            try:
+                month = int(date_parts[0][1])
+            except (IndexError, TypeError, ValueError):
+                month = None
+            # CSL uses 21 to 24 for the seasons, which BibTeX can't represent.
+            if month is not None and 1 <= month <= 12:
+                entry['month'] = _MONTHS[month - 1]
+            break
+    else:
+        raise RuntimeError('Received response that didn\'t include a year.')
+
+    for csl_key, key in [
+        ('container-title', 'journal'),
+        ('volume', 'volume'),
+        ('issue', 'number'),
+        ('page', 'pages'),
+        ('publisher', 'publisher'),
+        ('URL', 'url'),
+    ]:
+        value = _get_csl_text(csl.get(csl_key))
+        if value:
+            entry[key] = value
+
+    return entry
+
+
+def _parse_bibtex(text):
+    """Convert a BibTeX entry to a metadatum dictionary."""
+    # Most DOIs come as CSL-JSON, so only pay for importing the BibTeX parser
+    # when it's needed.
+    import bibtexparser
+
     parser = bibtexparser.bparser.BibTexParser(
         customization=bibtexparser.customization.author
     )
-    bib_db = bibtexparser.loads(response.text, parser=parser)
+    bib_db = bibtexparser.loads(text, parser=parser)
+    if not bib_db.entries:
+        raise ZoiaAddException('Received BibTeX without any entries.')
+
     entry = bib_db.entries[-1]
     if 'ENTRYTYPE' in entry:
         entry['entry_type'] = entry.pop('ENTRYTYPE')
@@ -99,8 +414,10 @@ def _get_doi_metadata(doi):
         entry['entry_type'] = 'article'
 
     if 'year' in entry:
-        entry['year'] = int(entry['year'])
+        entry['year'] = _parse_year(entry['year'])
 
+    if 'author' not in entry:
+        raise ZoiaAddException('Received BibTeX without any authors.')
     entry['authors'] = entry.pop('author')
     entry['authors'] = [
         list(map(lambda x: x.strip(), reversed(elem.split(','))))
@@ -111,12 +428,19 @@ def _get_doi_metadata(doi):
     return entry
 
 
-def _get_isbn_metadata(isbn):
-    metadata = isbnlib.meta(isbn, service='goob')
-    if not {'Authors', 'Title', 'Year'}.issubset(set(metadata)):
-        raise ZoiaAddException(
-            f'Did not receive authors, title, or year for ISBN {isbn}.'
-        )
+def _get_isbn_metadata(isbn, session, cache=None):
+    def fetch():
+        # `isbnlib` makes its own requests, but they still count against the
+        # rate limit of Google Books.
+        session.rate_limiter.acquire(GOOGLE_BOOKS_URL)
+        metadata = isbnlib.meta(isbn, service='goob')
+        if not {'Authors', 'Title', 'Year'}.issubset(set(metadata)):
+            raise ZoiaAddException(
+                f'Did not receive authors, title, or year for ISBN {isbn}.'
+            )
+        return metadata
+
+    metadata = _get_cached(cache, 'google_books', isbn, fetch)
 
     metadata['entry_type'] = 'book'
     metadata['isbn'] = metadata.pop('ISBN-13')
@@ -137,158 +461,500 @@ def _get_isbn_metadata(isbn):
     return metadata
 
 
-def _add_arxiv_id(metadata, identifier, citekey=None):
+@dataclass
+class _Fetched:
+    """The results of the network requests for a document."""
+
+    metadatum: dict
+    download: Optional[Download] = None
+    info_messages: List[str] = field(default_factory=list)
+    # The duration of each stage of the fetch in seconds.
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class AddResult:
+    """The outcome of adding one document as part of a batch."""
+
+    identifier: str
+    citekey: Optional[str] = None
+    metadatum: Optional[zoia.backend.metadata.Metadatum] = None
+    info_messages: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+    # Why a PDF was queued for review instead of being added.
+    review_reason: Optional[str] = None
+
+
+def _update_status(message, text):
+    if message is not None:
+        message.update(text)
+
+
+def _check_not_in_library(metadata, field, identifier, description):
+    existing = metadata.find_citekey(field, identifier)
+    if existing is not None:
+        raise ZoiaAddException(f'{description} already exists as {existing}.')
+
+
+def _discard_download(download):
+    if download is not None:
+        download.discard()
+
+
+def _download_arxiv_pdf(session, arxiv_id, download_dir, info_messages):
+    """Download the PDF of an arXiv paper or return `None` if that fails.
+
+    The PDF isn't needed to add the document.  If the connection fails, the
+    partial download is kept so that `zoia download` can resume it.
+
+    """
+    try:
+        download = download_pdf(
+            session, f'https://arxiv.org/pdf/{arxiv_id}.pdf', download_dir
+        )
+    except requests.RequestException:
+        info_messages.append(
+            'PDF download interrupted; run `zoia download <citekey>` to '
+            'resume'
+        )
+        return None
+
+    if download is None:
+        info_messages.append('Was unable to fetch a PDF')
+    return download
+
+
+def _fetch_arxiv_id(
+    identifier, session, download_dir, cache=None, message=None, resolvers=None
+):
+    """Fetch the metadata and the PDF of an arXiv paper.
+
+    This only talks to the network and never touches the library, so it is
+    safe to run in a worker thread.  The PDF is downloaded to a temporary file
+    in `download_dir` while the metadata are fetched.
+
+    """
+
+    def get_doi_metadata(arxiv_metadata):
+        if 'doi' not in arxiv_metadata:
+            return {}
+        _update_status(message, 'Querying DOI information...')
+        return _get_doi_metadata(arxiv_metadata['doi'], session, cache)
+
     info_messages = []
-    with StatusMessage('Querying arXiv...') as message:
-        if metadata.arxiv_id_exists(identifier):
-            raise ZoiaAddException(f'arXiv paper {identifier} already exists.')
-
-        # Downloading the PDF can take a while, so start it early in a separate
-        # thread.
-        pdf_queue = ThreadQueue()
-        pdf_process = ThreadProcess(
-            target=lambda q, x: q.put(requests.get(x)),
-            args=(pdf_queue, f'https://arxiv.org/pdf/{identifier}.pdf'),
+    graph = StageGraph()
+    graph.add(
+        'pdf',
+        lambda: _download_arxiv_pdf(
+            session, identifier, download_dir, info_messages
+        ),
+        cleanup=_discard_download,
+    )
+    graph.add(
+        'arxiv_metadata',
+        lambda: _get_arxiv_metadata(identifier, session, cache, resolvers),
+    )
+    graph.add('doi_metadata', get_doi_metadata, deps=['arxiv_metadata'])
+    results = graph.run()
+
+    arxiv_metadata = results['arxiv_metadata']
+    arxiv_metadata.update(results['doi_metadata'])
+
+    return _Fetched(
+        arxiv_metadata, results['pdf'], info_messages, graph.timings
+    )
+
+
+def _fetch_isbn(
+    identifier, session, download_dir, cache=None, message=None, resolvers=None
+):
+    """Fetch the metadata of a book."""
+    graph = StageGraph()
+    graph.add(
+        'isbn_metadata', lambda: _get_isbn_metadata(identifier, session, cache)
+    )
+    results = graph.run()
+    return _Fetched(results['isbn_metadata'], timings=graph.timings)
+
+
+def _fetch_doi(
+    identifier, session, download_dir, cache=None, message=None, resolvers=None
+):
+    """Fetch the metadata of a DOI and the PDF from arXiv if there is one.
+
+    Semantic Scholar is asked for the arXiv ID while the metadata are fetched,
+    and the PDF is downloaded as soon as the arXiv ID is known.
+
+    """
+    info_messages = []
+    if resolvers is None:
+        resolvers = _Resolvers(session, cache)
+
+    def get_arxiv_id():
+        try:
+            paper = resolvers.semantic_scholar.get(doi_paper_id(identifier))
+        except BATCH_ERRORS:
+            # The arXiv ID is only needed to find a PDF, so this isn't fatal.
+            info_messages.append('Was unable to query Semantic Scholar')
+            return None
+        return ((paper or {}).get('externalIds') or {}).get('ArXiv')
+
+    def get_pdf(arxiv_id):
+        if arxiv_id is None:
+            return None
+        return _download_arxiv_pdf(
+            session, arxiv_id, download_dir, info_messages
         )
-        pdf_process.start()
 
-        arxiv_metadata = _get_arxiv_metadata(identifier)
+    graph = StageGraph()
+    graph.add(
+        'doi_metadata', lambda: _get_doi_metadata(identifier, session, cache)
+    )
+    graph.add('arxiv_id', get_arxiv_id)
+    graph.add('pdf', get_pdf, deps=['arxiv_id'], cleanup=_discard_download)
+    results = graph.run()
+
+    doi_metadata = results['doi_metadata']
+    if results['arxiv_id'] is not None:
+        doi_metadata['arxiv_id'] = results['arxiv_id']
+
+    return _Fetched(doi_metadata, results['pdf'], info_messages, graph.timings)
+
+
+def _to_metadatum(metadatum_dict, description):
+    """Check that fetched metadata are complete enough to be stored."""
+    try:
+        return zoia.backend.metadata.Metadatum.from_dict(metadatum_dict)
+    except KeyError as e:
+        raise ZoiaAddException(
+            f'The metadata of {description} have no {e.args[0]}.'
+        ) from e
+    except (TypeError, ValueError) as e:
+        raise ZoiaAddException(
+            f'The metadata of {description} are invalid: {e}'
+        ) from e
+
+
+def _undo_all(undo_fns):
+    for undo_fn in reversed(undo_fns):
+        undo_fn()
+
+
+def _store(metadata, description, fetched, citekey=None, undo_fns=None):
+    """Write a fetched document to the library.
+
+    The fetched metadata are checked against the library again since another
+    document with the same identifiers may have been added in the meantime.
+    (E.g., a batch may contain both the arXiv ID and the DOI of a paper.)
+    Nothing is created in the library unless the document is new and its
+    metadata are complete.
+
+    The directory of the document can't be rolled back along with a
+    transaction that the document is stored in, so if `undo_fns` is given a
+    function that removes the directory again is appended to it.
+
+    """
+    try:
+        for identifier_field in IDENTIFIER_FIELDS:
+            value = fetched.metadatum.get(identifier_field)
+            if value is not None:
+                _check_not_in_library(
+                    metadata, identifier_field, value, description
+                )
 
-        if 'doi' in arxiv_metadata:
-            message.update('Querying DOI information...')
-            arxiv_metadata.update(_get_doi_metadata(arxiv_metadata['doi']))
+        if fetched.download is not None:
+            md5_hash = fetched.download.md5
+            _check_not_in_library(metadata, 'pdf_md5', md5_hash, description)
+            fetched.metadatum['pdf_md5'] = md5_hash
 
+        metadatum = _to_metadatum(fetched.metadatum, description)
         if citekey is None:
-            metadatum = zoia.backend.metadata.Metadatum.from_dict(
-                arxiv_metadata
-            )
             citekey = zoia.parse.citekey.create_citekey(metadata, metadatum)
+
         paper_dir = os.path.join(metadata.config.library_root, citekey)
         os.mkdir(paper_dir)
+        undo_fn = functools.partial(
+            shutil.rmtree, paper_dir, ignore_errors=True
+        )
+        try:
+            if fetched.download is not None:
+                fetched.download.move(os.path.join(paper_dir, 'document.pdf'))
 
-        message.update(text='Downloading PDF...')
-        pdf = pdf_queue.get()
-        pdf_process.join()
+            metadata[citekey] = fetched.metadatum
+        except BaseException:
+            undo_fn()
+            raise
 
-        if pdf.status_code == 200:
-            with open(os.path.join(paper_dir, 'document.pdf'), 'wb') as fp:
-                fp.write(pdf.content)
-            md5_hash = hashlib.md5(pdf.content).hexdigest()
-            arxiv_metadata['pdf_md5'] = md5_hash
-            if metadata.pdf_md5_hash_exists(md5_hash):
-                raise ZoiaAddException(
-                    f'arXiv paper {identifier} already exists.'
-                )
-        else:
-            info_messages.append('Was unable to fetch a PDF')
+        if undo_fns is not None:
+            undo_fns.append(undo_fn)
+    finally:
+        _discard(fetched)
 
-        metadata[citekey] = arxiv_metadata
+    return citekey, metadatum, fetched.info_messages
 
-    return citekey, metadatum, info_messages
 
+def _discard(fetched):
+    """Remove the downloaded PDF unless it was moved into the library."""
+    _discard_download(fetched.download)
 
-def _add_isbn(metadata, identifier, citekey):
-    """Add an entry from an ISBN."""
-    info_messages = []
-    with StatusMessage('Querying ISBN metadata...'):
-        if metadata.isbn_exists(identifier):
-            raise ZoiaAddException(f'ISBN {identifier} already exists.')
 
-        isbn_metadata = _get_isbn_metadata(identifier)
+def _discard_future(future):
+    """Remove the PDF of a fetch whose results won't be stored."""
+    if not future.cancelled() and future.exception() is None:
+        _discard(future.result())
 
-        if citekey is None:
-            metadatum = zoia.backend.metadata.Metadatum.from_dict(
-                isbn_metadata
-            )
-            citekey = zoia.parse.citekey.create_citekey(metadata, metadatum)
 
-        metadata[citekey] = isbn_metadata
+def _record_timings(timings, fetched):
+    if timings is not None:
+        timings.update(fetched.timings)
 
-        book_dir = os.path.join(metadata.config.library_root, citekey)
-        os.mkdir(book_dir)
 
-    return citekey, metadatum, info_messages
+def _add_arxiv_id(
+    metadata, identifier, citekey, session, cache=None, timings=None
+):
+    """Add an entry from an arXiv ID."""
+    description = f'arXiv paper {identifier}'
+    with StatusMessage('Querying arXiv...') as message:
+        _check_not_in_library(metadata, 'arxiv_id', identifier, description)
+        fetched = _fetch_arxiv_id(
+            identifier,
+            session,
+            metadata.config.library_root,
+            cache,
+            message,
+            _Resolvers(session, cache, metadata.config.arxiv_provider),
+        )
+        _record_timings(timings, fetched)
+        return _store(metadata, description, fetched, citekey)
+
+
+def _add_isbn(
+    metadata, identifier, citekey, session, cache=None, timings=None
+):
+    """Add an entry from an ISBN."""
+    description = f'ISBN {identifier}'
+    with StatusMessage('Querying ISBN metadata...') as message:
+        _check_not_in_library(metadata, 'isbn', identifier, description)
+        fetched = _fetch_isbn(
+            identifier, session, metadata.config.library_root, cache, message
+        )
+        _record_timings(timings, fetched)
+        return _store(metadata, description, fetched, citekey)
 
 
-def _add_doi(metadata, identifier, citekey):
+def _add_doi(metadata, identifier, citekey, session, cache=None, timings=None):
     """Add an entry from a DOI."""
-    info_messages = []
+    description = f'DOI {identifier}'
     with StatusMessage('Querying DOI metadata...') as message:
-        if metadata.doi_exists(identifier):
-            raise ZoiaAddException(f'DOI {identifier} already exists.')
-
-        # Query Semantic Scholar to get the corresponding arxiv ID (if there is
-        # one) in a separate thread.
-        arxiv_queue = ThreadQueue()
-        arxiv_process = ThreadProcess(
-            target=lambda q, x: q.put(requests.get(x)),
-            args=(
-                arxiv_queue,
-                f'https://api.semanticscholar.org/v1/paper/{identifier}',
-            ),
+        _check_not_in_library(metadata, 'doi', identifier, description)
+        fetched = _fetch_doi(
+            identifier, session, metadata.config.library_root, cache, message
+        )
+        _record_timings(timings, fetched)
+        return _store(metadata, description, fetched, citekey)
+
+
+# The functions that get the metadata of the identifiers found in a PDF.
+_METADATA_FNS = {
+    IdType.ARXIV: _get_arxiv_metadata,
+    IdType.ISBN: _get_isbn_metadata,
+    IdType.DOI: _get_doi_metadata,
+}
+
+
+def _get_pdf_md5(path):
+    """Hash a PDF without reading all of it into memory."""
+    md5 = hashlib.md5()
+    buffer = bytearray(HASH_BUFFER_SIZE)
+    view = memoryview(buffer)
+    with open(path, 'rb', buffering=0) as fp:
+        while n_bytes := fp.readinto(buffer):
+            md5.update(view[:n_bytes])
+    return md5.hexdigest()
+
+
+def _get_candidate_metadata(candidate, session, cache, resolvers=None):
+    """Get the metadata of an identifier found in a PDF."""
+    get_metadata_fn = _METADATA_FNS[candidate.id_type]
+    if candidate.id_type == IdType.ARXIV:
+        metadatum_dict = get_metadata_fn(
+            candidate.identifier, session, cache, resolvers=resolvers
         )
-        arxiv_process.start()
+    else:
+        metadatum_dict = get_metadata_fn(candidate.identifier, session, cache)
 
-        doi_metadata = _get_doi_metadata(identifier)
+    field_name = _FETCHERS[candidate.id_type][0]
+    metadatum_dict.setdefault(field_name, candidate.identifier)
+    return metadatum_dict
 
-        metadatum = zoia.backend.metadata.Metadatum.from_dict(doi_metadata)
 
-        if citekey is None:
-            citekey = zoia.parse.citekey.create_citekey(metadata, metadatum)
+def _search_pdf(pool, config, identifier):
+    """Start searching a PDF for identifiers in a worker process.
 
-        paper_dir = os.path.join(metadata.config.library_root, citekey)
-        os.mkdir(paper_dir)
+    Returns a future for the `IdentifierCandidate`s.
 
-        message.update(
-            'Querying Semantic Scholar for corresponding arXiv ID...'
-        )
-        arxiv_metadata_response = arxiv_queue.get()
-        arxiv_process.join()
+    """
+    return pool.submit(
+        zoia.parse.pdf.find_identifiers,
+        identifier,
+        max_pages=config.pdf.max_pages,
+        timeout=config.pdf.timeout,
+        search_last_page=config.pdf.search_last_page,
+    )
 
-        arxiv_metadata = json.loads(arxiv_metadata_response.text)
 
-        if (arxiv_id := arxiv_metadata.get('arxivId')) is not None:
-            doi_metadata['arxiv_id'] = arxiv_id
-            message.update('Downloading PDF from arXiv...')
-            pdf_response = requests.get(
-                f'https://arxiv.org/pdf/{arxiv_id}.pdf'
+def _get_pdf_metadatum(
+    metadata, identifier, candidates, session, cache, message, info_messages
+):
+    """Get the metadata of the best identifier found in a PDF.
+
+    The identifiers are tried from the most to the least likely until the
+    metadata of one of them can be fetched, but only up to the first one that
+    is in the library (see `_get_new_candidates`).  The errors of the
+    identifiers that couldn't be fetched are added to `info_messages`.
+    Returns `None` if there are no identifiers or none of them could be
+    fetched.
+
+    """
+    for candidate in _get_new_candidates(metadata, identifier, candidates):
+        description = _FETCHERS[candidate.id_type][1]
+        message.update(text=f'Found {description}, querying metadata...')
+        try:
+            metadatum_dict = _get_candidate_metadata(candidate, session, cache)
+        except _FETCH_ERRORS as e:
+            info_messages.append(
+                f'Could not fetch the metadata of {description} '
+                f'{candidate.identifier}: {e}'
+            )
+            continue
+
+        return description, candidate.identifier, metadatum_dict
+
+    return None
+
+
+def _unplace_pdf(path, paper_dir, placement):
+    """Remove a PDF from the library again, moving it back if it was moved."""
+    if placement == PdfPlacement.MOVE:
+        try:
+            shutil.move(os.path.join(paper_dir, 'document.pdf'), path)
+        except OSError:
+            # Leave the PDF where it is rather than lose the only copy.
+            return
+    shutil.rmtree(paper_dir, ignore_errors=True)
+
+
+def _store_pdf(
+    metadata,
+    path,
+    md5_hash,
+    metadatum,
+    metadatum_dict,
+    citekey=None,
+    placement=None,
+    undo_fns=None,
+):
+    """Write a PDF and its metadata to the library and return the citekey.
+
+    The identifiers in the metadata are checked against the library first.  The
+    PDF is placed in the library as configured by `PdfConfig.placement` unless
+    `placement` is given.  As in `_store`, a function that takes the PDF out of
+    the library again is appended to `undo_fns` if it is given.
+
+    """
+    for identifier_field in IDENTIFIER_FIELDS:
+        value = metadatum_dict.get(identifier_field)
+        if value is not None:
+            _check_not_in_library(
+                metadata, identifier_field, value, f'PDF {path}'
             )
 
-            if pdf_response.status_code == 200:
-                with open(os.path.join(paper_dir, 'document.pdf'), 'wb') as fp:
-                    fp.write(pdf_response.content)
-                doi_metadata['pdf_md5'] = hashlib.md5(
-                    pdf_response.content
-                ).hexdigest()
-            else:
-                info_messages.append('Was unable to fetch a PDF')
+    if citekey is None:
+        citekey = zoia.parse.citekey.create_citekey(metadata, metadatum)
 
-        metadata[citekey] = doi_metadata
-
-    return citekey, metadatum, info_messages
+    if placement is None:
+        placement = metadata.config.pdf.placement
 
+    paper_dir = os.path.join(metadata.config.library_root, citekey)
+    os.mkdir(paper_dir)
+    undo_fn = functools.partial(_unplace_pdf, path, paper_dir, placement)
+    try:
+        place_file(path, os.path.join(paper_dir, 'document.pdf'), placement)
 
-def _add_pdf(metadata, identifier, citekey, move_paper=False):
-    """Add a PDF file."""
+        # Keep the identifiers and any other fields besides those of the
+        # `Metadatum`.
+        metadatum_dict = {**metadatum.to_dict(), **metadatum_dict}
+        metadatum_dict['pdf_md5'] = md5_hash
+        metadata[citekey] = metadatum_dict
+    except BaseException:
+        undo_fn()
+        raise
+
+    if undo_fns is not None:
+        undo_fns.append(undo_fn)
+    return citekey
+
+
+def _add_pdf(
+    metadata,
+    identifier,
+    citekey,
+    session,
+    cache=None,
+    placement=None,
+    search=None,
+):
+    """Add a PDF file.
+
+    The document is looked up by the DOI, arXiv ID, or ISBN found in the PDF.
+    If there is none or the user rejects the metadata found for it, the user
+    has to enter the metadata instead.
+
+    The PDF is searched in a worker process so that a malformed PDF can't hang
+    or crash `zoia`.  `search` is the future returned by `_search_pdf` if the
+    search has already been started.
+
+    """
     info_messages = []
     with StatusMessage('Adding PDF...') as message:
-        with open(identifier, 'rb') as fp:
-            pdf = fp.read()
-        md5_hash = hashlib.md5(pdf).hexdigest()
-        if metadata.pdf_md5_hash_exists(md5_hash):
-            raise ZoiaAddException(f'PDF{identifier} already exists.')
-
-        doi = zoia.parse.pdf.get_doi_from_pdf(identifier)
-        if doi is not None:
-            if metadata.doi_exists(doi):
-                raise ZoiaAddException(
-                    f'DOI corresponding to {identifier} already exists.'
-                )
-            message.update(text='Found DOI, querying metadata...')
-            doi_metadata = _get_doi_metadata(doi)
+        md5_hash = _get_pdf_md5(identifier)
+        existing = metadata.find_citekey('pdf_md5', md5_hash)
+        if existing is not None:
+            raise ZoiaAddException(
+                f'PDF {identifier} already exists as {existing}.'
+            )
 
-            metadatum = zoia.backend.metadata.Metadatum.from_dict(doi_metadata)
-            click.secho(f'Found DOI {doi} for {str(metadatum)}')
+        if search is None:
+            with PdfPool.from_config(metadata.config, workers=1) as pool:
+                search = _search_pdf(pool, metadata.config, identifier)
+
+        try:
+            candidates = search.result()
+        except ZoiaPdfException as e:
+            candidates = []
+            info_messages.append(
+                f'Could not search {identifier} for identifiers: {e}'
+            )
+
+        found = _get_pdf_metadatum(
+            metadata,
+            identifier,
+            candidates,
+            session,
+            cache,
+            message,
+            info_messages,
+        )
+        if found is not None:
+            description, found_identifier, metadatum_dict = found
+            metadatum = _to_metadatum(
+                metadatum_dict, f'{description} {found_identifier}'
+            )
+            click.secho(
+                f'Found {description} {found_identifier} for '
+                f'{str(metadatum)}'
+            )
             if not click.confirm('Does this look correct?'):
                 text = dedent(
                     '''\
@@ -301,8 +967,8 @@ def _add_pdf(metadata, identifier, citekey, move_paper=False):
                     year:
                     '''
                 )
-                metadatum_dict = zoia.yaml.edit_until_valid(
-                    text, validator_fn=zoia.yaml.metadata_validator
+                metadatum_dict = zoia.parse.yaml.edit_until_valid(
+                    text, validation_fn=zoia.parse.yaml.metadata_validator
                 )
                 if metadatum_dict is None:
                     raise ZoiaAddException(
@@ -315,9 +981,9 @@ def _add_pdf(metadata, identifier, citekey, move_paper=False):
         else:
             text = dedent(
                 '''\
-                # No DOI was found for the PDF.  Please fill out the document's
-                # metadata in YAML format.  You can add additional fields, but
-                # the fields in the template must be filled out.
+                # No identifier was found for the PDF.  Please fill out the
+                # document's metadata in YAML format.  You can add additional
+                # fields, but the fields in the template must be filled out.
                 title:
                 authors:
                     -
@@ -325,8 +991,8 @@ def _add_pdf(metadata, identifier, citekey, move_paper=False):
                 '''
             )
 
-            metadatum_dict = zoia.yaml.edit_until_valid(
-                text, validator_fn=zoia.yaml.metadata_validator
+            metadatum_dict = zoia.parse.yaml.edit_until_valid(
+                text, validation_fn=zoia.parse.yaml.metadata_validator
             )
 
             if metadatum_dict is None:
@@ -338,47 +1004,546 @@ def _add_pdf(metadata, identifier, citekey, move_paper=False):
                 metadatum_dict
             )
 
-        if citekey is None:
-            citekey = zoia.parse.citekey.create_citekey(metadata, metadatum)
-
-        paper_dir = os.path.join(metadata.config.library_root, citekey)
-        os.mkdir(paper_dir)
-        if move_paper:
-            shutil.move(identifier, os.path.join(paper_dir, 'document.pdf'))
-        else:
-            shutil.copyfile(
-                identifier, os.path.join(paper_dir, 'document.pdf')
-            )
-
-        metadatum_dict = metadatum.to_dict()
-        metadatum_dict['pdf_md5'] = md5_hash
-        metadata[citekey] = metadatum_dict
+        citekey = _store_pdf(
+            metadata,
+            identifier,
+            md5_hash,
+            metadatum,
+            metadatum_dict,
+            citekey,
+            placement,
+        )
 
     return citekey, metadatum, info_messages
 
 
-def add(config, identifier, citekey=None):
-    """Add a new document to the library."""
+# Identifier types that can be fetched without user interaction, together with
+# the field to check for duplicates, a description for messages, and the
+# function to fetch them.
+_FETCHERS = {
+    IdType.ARXIV: ('arxiv_id', 'arXiv paper', _fetch_arxiv_id),
+    IdType.ISBN: ('isbn', 'ISBN', _fetch_isbn),
+    IdType.DOI: ('doi', 'DOI', _fetch_doi),
+}
 
-    metadata = zoia.backend.metadata.get_metadata(config)
-    if citekey and citekey in metadata:
-        raise ZoiaAddException(f'Citekey {citekey} already exists.')
+# The errors that cause a single document of a batch to fail rather than the
+# whole batch.  (`OSError` includes the errors raised by `requests`.)
+_FETCH_ERRORS = (
+    ZoiaAddException,
+    RuntimeError,
+    OSError,
+    isbnlib.ISBNLibException,
+)
 
+
+def _classify(identifier):
     try:
-        id_type, normalized_identifier = classify_and_normalize_identifier(
-            identifier
-        )
+        return classify_and_normalize_identifier(identifier)
     except ZoiaUnknownIdentifierException:
         raise ZoiaAddException(
             f'Cannot determine what kind of identifier {identifier} is.',
         )
 
+
+def _open_cache(config, use_cache):
+    if use_cache and config.cache.enabled:
+        return ResponseCache.from_config(config)
+    return None
+
+
+def add(config, identifier, citekey=None, use_cache=True, timings=None):
+    """Add a new document to the library.
+
+    Unless `use_cache` is false, the responses of the metadata providers are
+    cached on disk and reused.  If `timings` is a dictionary, it is filled in
+    with the duration in seconds of each stage of fetching the document.
+
+    """
+
+    metadata = zoia.backend.metadata.get_metadata(config)
+    if citekey and citekey in metadata:
+        raise ZoiaAddException(f'Citekey {citekey} already exists.')
+
+    id_type, normalized_identifier = _classify(identifier)
+
     if id_type == IdType.ARXIV:
         add_fn = _add_arxiv_id
     elif id_type == IdType.ISBN:
         add_fn = _add_isbn
     elif id_type == IdType.DOI:
         add_fn = _add_doi
-    elif id_type == IdType.PDF:
-        add_fn = _add_pdf
-    return add_fn(metadata, normalized_identifier, citekey)
+
+    with ZoiaSession(config.http) as session:
+        cache = _open_cache(config, use_cache)
+        if id_type == IdType.PDF:
+            return _add_pdf(
+                metadata, normalized_identifier, citekey, session, cache
+            )
+
+        return add_fn(
+            metadata, normalized_identifier, citekey, session, cache, timings
+        )
+
+
+def add_many(config, identifiers, jobs=8, use_cache=True):
+    """Add several documents to the library.
+
+    The metadata and PDFs are fetched by a pool of `jobs` worker threads that
+    share a single HTTP session, so adding many documents takes roughly as long
+    as the slowest requests rather than the sum of all of them.  Only the
+    calling thread touches the library: it writes each document as soon as it
+    has been fetched, and the documents that finish fetching together are
+    written in a single transaction.  PDFs may require the user to enter the
+    metadata, so they are added one at a time after everything else, but they
+    are searched for identifiers by a `PdfPool` on all cores in the meantime.
+    The responses are cached as in `add`.
+
+    Before anything is fetched, all of the arXiv IDs and DOIs are looked up
+    with a handful of batch requests to Semantic Scholar and the arXiv API
+    instead of one request per document.
+
+    This is a generator that yields an `AddResult` for each document as soon
+    as it has been added (or has failed).  A failure only affects its own
+    document.
+
+    """
+    metadata = zoia.backend.metadata.get_metadata(config)
+    cache = _open_cache(config, use_cache)
+
+    # Drop duplicates, but only after normalizing so that different spellings
+    # of the same identifier are caught.
+    pending = {}
+    pdfs = []
+    for identifier in identifiers:
+        try:
+            id_type, normalized_identifier = _classify(identifier)
+        except ZoiaAddException as e:
+            yield AddResult(identifier, error=str(e))
+            continue
+
+        if id_type == IdType.PDF:
+            pdfs.append(normalized_identifier)
+        else:
+            pending.setdefault(normalized_identifier, id_type)
+
+    to_fetch = []
+    for identifier, id_type in pending.items():
+        field_name, description, fetch_fn = _FETCHERS[id_type]
+        description = f'{description} {identifier}'
+        try:
+            _check_not_in_library(
+                metadata, field_name, identifier, description
+            )
+        except ZoiaAddException as e:
+            yield AddResult(identifier, error=str(e))
+            continue
+        to_fetch.append((identifier, id_type, description, fetch_fn))
+
+    # Each fetch may make two requests at the same time, so make sure there are
+    # enough connections to go around.
+    session = ZoiaSession(
+        config.http, pool_maxsize=max(config.http.pool_maxsize, 2 * jobs)
+    )
+    with session, PdfPool.from_config(config) as pool:
+        # Search the PDFs on all cores while the other documents are fetched.
+        searches = [
+            (identifier, _search_pdf(pool, config, identifier))
+            for identifier in pdfs
+        ]
+
+        resolvers = _Resolvers(session, cache, config.arxiv_provider)
+        resolvers.prefetch(
+            arxiv_ids=[
+                identifier
+                for identifier, id_type, _, _ in to_fetch
+                if id_type == IdType.ARXIV
+            ],
+            dois=[
+                identifier
+                for identifier, id_type, _, _ in to_fetch
+                if id_type == IdType.DOI
+            ],
+        )
+
+        executor = ThreadPoolExecutor(max_workers=jobs)
+        futures = {}
+        try:
+            for identifier, _, description, fetch_fn in to_fetch:
+                future = executor.submit(
+                    fetch_fn,
+                    identifier,
+                    session,
+                    config.library_root,
+                    cache,
+                    resolvers=resolvers,
+                )
+                futures[future] = (identifier, description)
+
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                results = []
+                undo_fns = []
+                try:
+                    with metadata.transaction():
+                        for future in done:
+                            identifier, description = futures.pop(future)
+                            result = AddResult(identifier)
+                            try:
+                                fetched = future.result()
+                                result.timings = fetched.timings
+                                (
+                                    result.citekey,
+                                    result.metadatum,
+                                    result.info_messages,
+                                ) = _store(
+                                    metadata,
+                                    description,
+                                    fetched,
+                                    undo_fns=undo_fns,
+                                )
+                            except _FETCH_ERRORS as e:
+                                result.error = str(e)
+                            results.append(result)
+                except BaseException:
+                    # The metadata of the batch were rolled back, so don't
+                    # leave their directories behind.
+                    _undo_all(undo_fns)
+                    raise
+
+                yield from results
+        finally:
+            # Cancel the fetches that haven't started by hand since
+            # `cancel_futures` needs Python 3.9.
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+            # Clean up after the fetches that are still running if we were
+            # interrupted.
+            for future in futures:
+                future.add_done_callback(_discard_future)
+
+        for identifier, search in searches:
+            result = AddResult(identifier)
+            try:
+                (
+                    result.citekey,
+                    result.metadatum,
+                    result.info_messages,
+                ) = _add_pdf(
+                    metadata, identifier, None, session, cache, search=search
+                )
+            except _FETCH_ERRORS as e:
+                result.error = str(e)
+            yield result
+
+
+def find_pdfs(directory):
+    """Yield the paths of the PDFs in a directory tree.
+
+    Files are recognized as PDFs by their first bytes rather than their names.
+    Hidden files and directories are skipped.
+
+    """
+    for root, dirnames, filenames in os.walk(directory):
+        dirnames[:] = sorted(
+            dirname for dirname in dirnames if not dirname.startswith('.')
+        )
+        for filename in sorted(filenames):
+            path = os.path.join(root, filename)
+            if not filename.startswith('.') and zoia.parse.pdf.is_pdf(path):
+                yield path
+
+
+def _get_new_candidates(metadata, path, candidates):
+    """Return the candidates to try before one that is in the library.
+
+    Raises a `ZoiaAddException` if the best candidate is in the library.
+
+    """
+    new_candidates = []
+    for candidate in candidates:
+        field_name, description, _ = _FETCHERS[candidate.id_type]
+        existing = metadata.find_citekey(field_name, candidate.identifier)
+        if existing is not None:
+            if not new_candidates:
+                raise ZoiaAddException(
+                    f'{description} {candidate.identifier} corresponding to '
+                    f'{path} already exists as {existing}.'
+                )
+            break
+        new_candidates.append(candidate)
+    return new_candidates
+
+
+def _fetch_pdf_metadatum(candidates, session, cache, resolvers):
+    """Get the metadata of the first candidate that can be fetched."""
+    errors = []
+    for candidate in candidates:
+        try:
+            return _get_candidate_metadata(
+                candidate, session, cache, resolvers
+            )
+        except _FETCH_ERRORS as e:
+            description = _FETCHERS[candidate.id_type][1]
+            errors.append(f'{description} {candidate.identifier}: {e}')
+
+    raise ZoiaAddException(
+        'Could not fetch the metadata of any identifier ('
+        + '; '.join(errors)
+        + ').'
+    )
+
+
+def _candidate_from_dict(candidate):
+    return IdentifierCandidate(
+        **{**candidate, 'id_type': IdType(candidate['id_type'])}
+    )
+
+
+def _queue_for_review(review_queue, path, md5_hash, reason, candidates=()):
+    review_queue.add(
+        ReviewItem(
+            path=os.path.abspath(path),
+            md5=md5_hash,
+            reason=reason,
+            candidates=[
+                {**asdict(candidate), 'id_type': candidate.id_type.value}
+                for candidate in candidates
+            ],
+        )
+    )
+    return AddResult(path, review_reason=reason)
+
+
+def import_pdfs(config, directory, jobs=8, use_cache=True):
+    """Add all of the PDFs in a directory tree to the library.
+
+    Unlike `add`, this never asks the user anything, so that directories with
+    thousands of PDFs can be imported in one go:
+
+    1. The PDFs are found by `find_pdfs` and the ones that are already in the
+       library (or appear twice) are skipped based on their MD5 hashes.
+    2. All of the PDFs are searched for identifiers by a `PdfPool` on all
+       cores.
+    3. The arXiv IDs are resolved in batches as in `add_many`, and the metadata
+       of the best identifier of each PDF are fetched by `jobs` worker threads.
+       The other identifiers are tried if that fails.
+
+    The PDFs for which no metadata were found are put in the review queue (see
+    `zoia.backend.review`) instead of being added.  They can be added with the
+    user's help by `review_pdfs` later.  The PDFs are put into the library as
+    configured by `PdfConfig.placement`.
+
+    This is a generator that yields an `AddResult` for each PDF.
+
+    """
+    metadata = zoia.backend.metadata.get_metadata(config)
+    cache = _open_cache(config, use_cache)
+    review_queue = ReviewQueue.from_config(config)
+
+    paths = list(find_pdfs(directory))
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        md5_hashes = list(executor.map(_get_pdf_md5, paths))
+
+    pdfs = {}
+    for path, md5_hash in zip(paths, md5_hashes):
+        existing = metadata.find_citekey('pdf_md5', md5_hash)
+        if existing is not None:
+            yield AddResult(
+                path, error=f'PDF {path} already exists as {existing}.'
+            )
+        elif md5_hash in pdfs:
+            yield AddResult(
+                path, error=f'PDF {path} is a copy of {pdfs[md5_hash]}.'
+            )
+        else:
+            pdfs[md5_hash] = path
+
+    session = ZoiaSession(
+        config.http, pool_maxsize=max(config.http.pool_maxsize, jobs)
+    )
+    try:
+        with session, PdfPool.from_config(config) as pool:
+            searches = {
+                md5_hash: _search_pdf(pool, config, path)
+                for md5_hash, path in pdfs.items()
+            }
+
+            to_fetch = []
+            for md5_hash, path in pdfs.items():
+                try:
+                    candidates = searches[md5_hash].result()
+                except ZoiaPdfException as e:
+                    yield _queue_for_review(
+                        review_queue,
+                        path,
+                        md5_hash,
+                        f'Could not search the PDF for identifiers: {e}',
+                    )
+                    continue
+
+                try:
+                    candidates = _get_new_candidates(
+                        metadata, path, candidates
+                    )
+                except ZoiaAddException as e:
+                    yield AddResult(path, error=str(e))
+                    continue
+
+                if not candidates:
+                    yield _queue_for_review(
+                        review_queue, path, md5_hash, 'No identifiers found.'
+                    )
+                    continue
+
+                to_fetch.append((path, md5_hash, candidates))
+
+            resolvers = _Resolvers(session, cache, config.arxiv_provider)
+            resolvers.prefetch(
+                arxiv_ids=[
+                    candidate.identifier
+                    for _, _, candidates in to_fetch
+                    for candidate in candidates
+                    if candidate.id_type == IdType.ARXIV
+                ],
+                dois=[],
+            )
+
+            yield from _fetch_and_store_pdfs(
+                metadata,
+                review_queue,
+                to_fetch,
+                session,
+                cache,
+                resolvers,
+                jobs,
+            )
+    finally:
+        review_queue.write()
+
+
+def _fetch_and_store_pdfs(
+    metadata, review_queue, to_fetch, session, cache, resolvers, jobs
+):
+    executor = ThreadPoolExecutor(max_workers=jobs)
+    futures = {}
+    try:
+        for path, md5_hash, candidates in to_fetch:
+            future = executor.submit(
+                _fetch_pdf_metadatum, candidates, session, cache, resolvers
+            )
+            futures[future] = (path, md5_hash, candidates)
+
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            results = []
+            added = []
+            undo_fns = []
+            try:
+                with metadata.transaction():
+                    for future in done:
+                        path, md5_hash, candidates = futures.pop(future)
+                        try:
+                            metadatum_dict = future.result()
+                            metadatum = _to_metadatum(
+                                metadatum_dict, f'PDF {path}'
+                            )
+                        except _FETCH_ERRORS as e:
+                            result = _queue_for_review(
+                                review_queue,
+                                path,
+                                md5_hash,
+                                str(e),
+                                candidates,
+                            )
+                            results.append(result)
+                            continue
+
+                        result = AddResult(path, metadatum=metadatum)
+                        try:
+                            result.citekey = _store_pdf(
+                                metadata,
+                                path,
+                                md5_hash,
+                                metadatum,
+                                metadatum_dict,
+                                undo_fns=undo_fns,
+                            )
+                        except _FETCH_ERRORS as e:
+                            result.error = str(e)
+                        else:
+                            added.append(md5_hash)
+                        results.append(result)
+            except BaseException:
+                # The metadata of the batch were rolled back, so take its PDFs
+                # out of the library again.
+                _undo_all(undo_fns)
+                raise
+
+            for md5_hash in added:
+                review_queue.remove(md5_hash)
+            yield from results
+    finally:
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def review_pdfs(config, use_cache=True):
+    """Add the PDFs in the review queue with the user's help.
+
+    Each PDF is added like a PDF given to `add`: the user confirms the metadata
+    of the identifiers found in it or enters the metadata by hand.  The PDFs
+    that were added, that are already in the library, or that no longer exist
+    are removed from the queue.  The others stay in the queue for next time.
+
+    This is a generator that yields an `AddResult` for each PDF.
+
+    """
+    metadata = zoia.backend.metadata.get_metadata(config)
+    cache = _open_cache(config, use_cache)
+    review_queue = ReviewQueue.from_config(config)
+
+    try:
+        with ZoiaSession(config.http) as session:
+            for item in review_queue:
+                result = AddResult(item.path)
+                existing = metadata.find_citekey('pdf_md5', item.md5)
+                if existing is not None:
+                    review_queue.remove(item.md5)
+                    result.error = (
+                        f'PDF {item.path} already exists as {existing}.'
+                    )
+                    yield result
+                    continue
+                if not os.path.isfile(item.path):
+                    review_queue.remove(item.md5)
+                    result.error = f'PDF {item.path} no longer exists.'
+                    yield result
+                    continue
+
+                click.secho(f'Reviewing {item.path} ({item.reason})')
+                search = Future()
+                search.set_result(
+                    [_candidate_from_dict(elem) for elem in item.candidates]
+                )
+                try:
+                    (
+                        result.citekey,
+                        result.metadatum,
+                        result.info_messages,
+                    ) = _add_pdf(
+                        metadata,
+                        item.path,
+                        None,
+                        session,
+                        cache,
+                        search=search,
+                    )
+                except _FETCH_ERRORS as e:
+                    result.error = str(e)
+                else:
+                    review_queue.remove(item.md5)
+                yield result
+    finally:
+        review_queue.write()
@@ -0,0 +1,120 @@
+"""Look up papers with the arXiv API, many at a time.
+
+The arXiv API returns the metadata of many papers in one request when they are
+listed in its `id_list` parameter.  The response is an Atom feed, which is
+parsed as it streams in so that large feeds never have to be held in memory.
+The `ArxivResolver` uses this to resolve all of the papers of a batch up front
+(see `zoia.backend.resolver`).
+
+See https://info.arxiv.org/help/api/user-manual.html for the API.
+
+"""
+
+import re
+import xml.etree.ElementTree as ET
+
+from zoia.backend.resolver import BatchResolver
+
+API_URL = 'https://export.arxiv.org/api/query'
+
+# The number of IDs per request.  The API accepts more, but the responses get
+# slow.
+BATCH_SIZE = 100
+
+_ATOM = '{http://www.w3.org/2005/Atom}'
+_ARXIV = '{http://arxiv.org/schemas/atom}'
+
+_ERROR_ID_PREFIX = 'http://arxiv.org/api/errors'
+
+_VERSION_REGEX = re.compile(r'v\d+$')
+
+
+def _get_text(element, tag):
+    child = element.find(tag)
+    if child is None or child.text is None:
+        return None
+    return ' '.join(child.text.split())
+
+
+def _parse_entry(element):
+    """Convert an Atom entry to a dictionary.
+
+    Raises a `ValueError` if the entry describes an error.
+
+    """
+    entry_id = _get_text(element, f'{_ATOM}id') or ''
+    if entry_id.startswith(_ERROR_ID_PREFIX):
+        raise ValueError(
+            f'arXiv API error: {_get_text(element, f"{_ATOM}summary")}'
+        )
+
+    return {
+        'id': entry_id.rpartition('/abs/')[2],
+        'title': _get_text(element, f'{_ATOM}title'),
+        'authors': [
+            _get_text(author, f'{_ATOM}name')
+            for author in element.iterfind(f'{_ATOM}author')
+        ],
+        'published': _get_text(element, f'{_ATOM}published'),
+        'doi': _get_text(element, f'{_ARXIV}doi'),
+    }
+
+
+def parse_feed(fp):
+    """Yield the entries of an Atom feed from the arXiv API.
+
+    Raises a `ValueError` if the feed is malformed or reports an error.
+
+    """
+    try:
+        for _, element in ET.iterparse(fp):
+            if element.tag == f'{_ATOM}entry':
+                yield _parse_entry(element)
+                element.clear()
+    except ET.ParseError as e:
+        raise ValueError(f'Received a malformed feed: {e}') from e
+
+
+class ArxivResolver(BatchResolver):
+    """Resolve arXiv IDs with as few requests as possible.
+
+    The papers are dictionaries with the `id` (including the version),
+    `title`, `authors`, `published` date, and `doi` (or `None`).  They are
+    cached under the `arxiv` provider.
+
+    """
+
+    provider = 'arxiv'
+    batch_size = BATCH_SIZE
+
+    def __init__(self, session, cache=None, api_url=API_URL):
+        super().__init__(session, cache, api_url)
+
+    def _get_batch(self, arxiv_ids):
+        response = self.session.get(
+            self.api_url,
+            params={
+                'id_list': ','.join(arxiv_ids),
+                'max_results': len(arxiv_ids),
+            },
+            stream=True,
+        )
+        try:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            entries = {}
+            for entry in parse_feed(response.raw):
+                # The requested IDs may or may not include the version.
+                entries[entry['id']] = entry
+                entries.setdefault(_VERSION_REGEX.sub('', entry['id']), entry)
+        finally:
+            response.close()
+
+        return {
+            arxiv_id: entries[arxiv_id]
+            for arxiv_id in arxiv_ids
+            if arxiv_id in entries
+        }
+
+    def _get_single(self, arxiv_id):
+        return self._get_batch([arxiv_id]).get(arxiv_id)
@@ -0,0 +1,150 @@
+"""An on-disk cache for the responses of metadata providers.
+
+Each response is stored in its own file whose name is the SHA-256 hash of the
+provider and the (normalized) identifier, so looking up an entry never requires
+reading an index.  Entries expire after a time-to-live that depends on the
+provider.  The cache is bounded in size: when it grows too large the least
+recently used entries are evicted, where the modification time of each file
+records when it was last used.
+
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+from zoia.backend.files import open_atomically
+
+ZOIA_CACHE_DIRNAME = 'cache'
+
+# Evict entries until the cache is at most this fraction of its maximum size so
+# that eviction doesn't happen again on the very next write.
+_EVICTION_TARGET = 0.8
+
+
+class ResponseCache:
+    """A cache of provider responses under a directory."""
+
+    def __init__(self, root, ttls, max_size):
+        """Open the cache, creating the directory if necessary.
+
+        Args:
+            root: str
+                The directory with the cache.
+            ttls: dict
+                The time-to-live in seconds of the entries of each provider.
+                Providers that aren't listed are never cached.
+            max_size: int
+                The maximum total size of the cache in bytes.
+
+        """
+        self.root = root
+        self.ttls = ttls
+        self.max_size = max_size
+
+        self._lock = threading.Lock()
+        self._size = None
+
+        os.makedirs(self.root, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, config):
+        """Open the cache described by the configuration."""
+        return cls(
+            os.path.join(config.db_root, ZOIA_CACHE_DIRNAME),
+            ttls={
+                provider: days * 24 * 60 * 60
+                for provider, days in config.cache.ttl_days.items()
+            },
+            max_size=config.cache.max_size,
+        )
+
+    def _get_path(self, provider, identifier):
+        key = hashlib.sha256(f'{provider}\0{identifier}'.encode()).hexdigest()
+        return os.path.join(self.root, key[:2], key + '.json')
+
+    def get(self, provider, identifier):
+        """Return the cached value or `None` if it is missing or expired."""
+        if provider not in self.ttls:
+            return None
+
+        path = self._get_path(provider, identifier)
+        try:
+            with open(path) as fp:
+                entry = json.load(fp)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - entry['time'] > self.ttls[provider]:
+            self._remove(path)
+            return None
+
+        # Mark the entry as recently used.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return entry['value']
+
+    def set(self, provider, identifier, value):
+        """Store a JSON-serializable value in the cache."""
+        if provider not in self.ttls:
+            return
+
+        path = self._get_path(provider, identifier)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = json.dumps(
+            {
+                'provider': provider,
+                'identifier': identifier,
+                'time': time.time(),
+                'value': value,
+            }
+        )
+
+        with open_atomically(path) as fp:
+            fp.write(data)
+
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, _, size in self._list_entries())
+            else:
+                self._size += len(data)
+
+            if self._size > self.max_size:
+                self._evict()
+
+    def _list_entries(self):
+        """Yield the path, last use, and size of every entry."""
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if not filename.endswith('.json'):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield path, stat.st_mtime, stat.st_size
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Remove the least recently used entries until the cache is small."""
+        entries = sorted(self._list_entries(), key=lambda elem: elem[1])
+        size = sum(elem[2] for elem in entries)
+        target = _EVICTION_TARGET * self.max_size
+        for path, _, entry_size in entries:
+            if size <= target:
+                break
+            self._remove(path)
+            size -= entry_size
+
+        self._size = size
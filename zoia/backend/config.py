@@ -6,8 +6,10 @@ configuration directory of `$HOME/.config/zoia/`.
 
 """
 
+import dataclasses
 import os
 from dataclasses import dataclass
+from dataclasses import field
 from enum import Enum
 
 import yaml
@@ -18,6 +20,230 @@ ZOIA_METADATA_FILENAME = 'metadata.json'
 class ZoiaBackend(Enum):
     JSON = 'json'
     SQLITE = 'sqlite'
+    SQLITE3 = 'sqlite3'
+
+
+class ArxivProvider(Enum):
+    """The preferred source of the metadata of arXiv papers.
+
+    The other provider is used if the preferred one fails.
+
+    """
+
+    SEMANTIC_SCHOLAR = 'semantic_scholar'
+    ARXIV = 'arxiv'
+
+
+class PdfPlacement(Enum):
+    """How a PDF from the user's files is put into the library.
+
+    See `zoia.backend.placement`.
+
+    """
+
+    COPY = 'copy'
+    HARDLINK = 'hardlink'
+    MOVE = 'move'
+
+
+SQLITE_JOURNAL_MODES = {
+    'delete',
+    'truncate',
+    'persist',
+    'memory',
+    'wal',
+    'off',
+}
+SQLITE_SYNCHRONOUS_MODES = {'off', 'normal', 'full', 'extra'}
+
+
+@dataclass
+class SQLitePragmas:
+    """Settings applied to every connection to the SQLite database.
+
+    The defaults use write-ahead logging so that readers don't block writers
+    (and vice versa), which makes `synchronous=normal` safe.  See
+    https://www.sqlite.org/pragma.html for the meaning of each setting.
+
+    """
+
+    journal_mode: str = 'wal'
+    synchronous: str = 'normal'
+    # The maximum number of bytes of the database to memory-map.
+    mmap_size: int = 256 * 1024 * 1024
+    # Positive values are in pages, negative values are in KiB.
+    cache_size: int = -64 * 1024
+    # How long to wait for a lock in milliseconds before raising an error.
+    busy_timeout: int = 5000
+
+    def __post_init__(self):
+        self.journal_mode = self.journal_mode.lower()
+        if self.journal_mode not in SQLITE_JOURNAL_MODES:
+            raise ValueError(
+                f'journal_mode must be one of {sorted(SQLITE_JOURNAL_MODES)} '
+                f'but got {self.journal_mode}.'
+            )
+
+        self.synchronous = self.synchronous.lower()
+        if self.synchronous not in SQLITE_SYNCHRONOUS_MODES:
+            raise ValueError(
+                f'synchronous must be one of '
+                f'{sorted(SQLITE_SYNCHRONOUS_MODES)} but got '
+                f'{self.synchronous}.'
+            )
+
+        for name in ['mmap_size', 'cache_size', 'busy_timeout']:
+            setattr(self, name, int(getattr(self, name)))
+
+    def to_statements(self):
+        """Return the `PRAGMA` statements to apply the settings."""
+        return [
+            f'PRAGMA {name} = {getattr(self, name)}'
+            for name in self.__dataclass_fields__.keys()
+        ]
+
+
+def _default_rate_limits():
+    # Requests per second and the number of requests that may be made at once
+    # after being idle.  These stay below the published limits of each
+    # provider.
+    return {
+        'api.semanticscholar.org': {'rate': 1.0, 'burst': 3},
+        'doi.org': {'rate': 10.0, 'burst': 10},
+        'arxiv.org': {'rate': 1.0, 'burst': 4},
+        # The arXiv API asks for no more than one request every three seconds.
+        'export.arxiv.org': {'rate': 1 / 3, 'burst': 1},
+        'www.googleapis.com': {'rate': 2.0, 'burst': 5},
+    }
+
+
+@dataclass
+class HttpConfig:
+    """Settings for the HTTP connections used to fetch metadata and PDFs."""
+
+    # Timeouts in seconds to establish a connection and to wait for data.
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    # The number of hosts to keep connection pools for.
+    pool_connections: int = 10
+    # The number of connections to keep open to each host.
+    pool_maxsize: int = 16
+    # How often to retry a request that was rejected with HTTP 429 or 503, and
+    # the range of the randomized exponential backoff between retries in
+    # seconds.  A `Retry-After` header from the server takes precedence, but
+    # a request that is asked to wait for longer than `backoff_max` fails.
+    max_retries: int = 5
+    backoff_base: float = 1.0
+    backoff_max: float = 60.0
+    # The rate limits of each host.  Hosts that aren't listed aren't limited.
+    rate_limits: dict = field(default_factory=_default_rate_limits)
+
+    def __post_init__(self):
+        for name in [
+            'connect_timeout',
+            'read_timeout',
+            'pool_connections',
+            'pool_maxsize',
+            'backoff_base',
+            'backoff_max',
+        ]:
+            value = getattr(self, name)
+            if value <= 0:
+                raise ValueError(f'{name} must be positive but got {value}.')
+
+        self.pool_connections = int(self.pool_connections)
+        self.pool_maxsize = int(self.pool_maxsize)
+
+        self.max_retries = int(self.max_retries)
+        if self.max_retries < 0:
+            raise ValueError(
+                f'max_retries must not be negative but got '
+                f'{self.max_retries}.'
+            )
+
+        self.rate_limits = {**_default_rate_limits(), **self.rate_limits}
+        for host, limit in self.rate_limits.items():
+            if set(limit) != {'rate', 'burst'}:
+                raise ValueError(
+                    f'The rate limit of {host} must have a rate and a burst.'
+                )
+            if limit['rate'] <= 0 or limit['burst'] < 1:
+                raise ValueError(
+                    f'The rate limit of {host} must have a positive rate and '
+                    f'a burst of at least 1.'
+                )
+
+
+CACHE_PROVIDERS = {'semantic_scholar', 'arxiv', 'doi', 'google_books'}
+
+
+def _default_cache_ttl_days():
+    # Semantic Scholar learns about the DOIs of arXiv papers after they are
+    # published, so its responses go stale sooner.
+    return {'semantic_scholar': 7, 'arxiv': 30, 'doi': 90, 'google_books': 90}
+
+
+@dataclass
+class CacheConfig:
+    """Settings for the cache of responses from metadata providers."""
+
+    enabled: bool = True
+    # The maximum total size of the cache in bytes.
+    max_size: int = 64 * 1024 * 1024
+    # How many days the responses of each provider are kept.
+    ttl_days: dict = field(default_factory=_default_cache_ttl_days)
+
+    def __post_init__(self):
+        self.max_size = int(self.max_size)
+        if self.max_size <= 0:
+            raise ValueError(
+                f'max_size must be positive but got {self.max_size}.'
+            )
+
+        unknown_providers = set(self.ttl_days) - CACHE_PROVIDERS
+        if unknown_providers:
+            raise ValueError(
+                f'Unknown providers {sorted(unknown_providers)}.  Must be one '
+                f'of {sorted(CACHE_PROVIDERS)}.'
+            )
+        self.ttl_days = {**_default_cache_ttl_days(), **self.ttl_days}
+
+
+@dataclass
+class PdfConfig:
+    """Settings for reading the PDFs that are added to the library."""
+
+    # How many pages from the front of a PDF to search for its identifiers and
+    # whether to also search the last page.
+    max_pages: int = 5
+    search_last_page: bool = True
+    # How many seconds to spend searching a PDF for its identifiers.
+    timeout: float = 10.0
+    # PDFs are read in worker processes.  A worker is killed if it takes more
+    # than `worker_timeout` seconds for a PDF or uses more than `memory_limit`
+    # MiB of memory (`None` for no limit).  `workers` defaults to the number
+    # of cores.
+    worker_timeout: float = 60.0
+    memory_limit: int = 1024
+    workers: int = None
+    # How PDFs that are added from files get into the library.
+    placement: PdfPlacement = PdfPlacement.COPY
+
+    def __post_init__(self):
+        if isinstance(self.placement, str):
+            self.placement = PdfPlacement(self.placement)
+
+        self.max_pages = int(self.max_pages)
+        for name in ['max_pages', 'timeout', 'worker_timeout']:
+            value = getattr(self, name)
+            if value <= 0:
+                raise ValueError(f'{name} must be positive but got {value}.')
+        for name in ['memory_limit', 'workers']:
+            value = getattr(self, name)
+            if value is not None and value <= 0:
+                raise ValueError(
+                    f'{name} must be positive or null but got {value}.'
+                )
 
 
 @dataclass
@@ -25,6 +251,12 @@ class ZoiaConfig:
     library_root: str
     db_root: str = None
     backend: ZoiaBackend = ZoiaBackend.SQLITE
+    json_journal: bool = False
+    sqlite_pragmas: SQLitePragmas = None
+    http: HttpConfig = None
+    cache: CacheConfig = None
+    arxiv_provider: ArxivProvider = ArxivProvider.SEMANTIC_SCHOLAR
+    pdf: PdfConfig = None
 
     def __post_init__(self):
         if self.db_root is None:
@@ -33,6 +265,29 @@ class ZoiaConfig:
         if isinstance(self.backend, str):
             self.backend = ZoiaBackend(self.backend)
 
+        if isinstance(self.arxiv_provider, str):
+            self.arxiv_provider = ArxivProvider(self.arxiv_provider)
+
+        if self.sqlite_pragmas is None:
+            self.sqlite_pragmas = SQLitePragmas()
+        elif isinstance(self.sqlite_pragmas, dict):
+            self.sqlite_pragmas = SQLitePragmas(**self.sqlite_pragmas)
+
+        if self.http is None:
+            self.http = HttpConfig()
+        elif isinstance(self.http, dict):
+            self.http = HttpConfig(**self.http)
+
+        if self.cache is None:
+            self.cache = CacheConfig()
+        elif isinstance(self.cache, dict):
+            self.cache = CacheConfig(**self.cache)
+
+        if self.pdf is None:
+            self.pdf = PdfConfig()
+        elif isinstance(self.pdf, dict):
+            self.pdf = PdfConfig(**self.pdf)
+
     def to_dict(self):
         d = {
             elem: getattr(self, elem)
@@ -40,6 +295,12 @@ class ZoiaConfig:
         }
 
         d['backend'] = d['backend'].value
+        d['sqlite_pragmas'] = dataclasses.asdict(d['sqlite_pragmas'])
+        d['http'] = dataclasses.asdict(d['http'])
+        d['cache'] = dataclasses.asdict(d['cache'])
+        d['arxiv_provider'] = d['arxiv_provider'].value
+        d['pdf'] = dataclasses.asdict(d['pdf'])
+        d['pdf']['placement'] = d['pdf']['placement'].value
 
         return d
 
@@ -82,6 +343,12 @@ def load_config(config_filepath=None):
         library_root=config['library_root'],
         db_root=_get_db_root(),
         backend=ZoiaBackend(config.get('backend', 'json')),
+        json_journal=config.get('json_journal', False),
+        sqlite_pragmas=config.get('sqlite_pragmas'),
+        http=config.get('http'),
+        cache=config.get('cache'),
+        arxiv_provider=config.get('arxiv_provider', 'semantic_scholar'),
+        pdf=config.get('pdf'),
     )
 
 
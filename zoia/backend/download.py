@@ -0,0 +1,274 @@
+"""Download PDFs into the library.
+
+PDFs are streamed to disk in chunks and hashed as they arrive, so the memory
+used doesn't depend on the size of the PDF.  Downloads are resumable: the
+partial PDF is kept in `.downloads` in the library as `<key>.pdf.part` together
+with a small JSON file with the state needed to resume it, where the key is
+the hash of the URL.  The next attempt to download the same URL (whether it is
+a retry or a later `zoia download`) asks the server for the rest of the PDF
+with a `Range` request.  The `If-Range` header makes sure that the server only
+sends the rest if the PDF hasn't changed in the meantime.
+
+Finished downloads are moved out of `.downloads` to a temporary file in the
+library, which is on the same filesystem as their final location, so they can
+be moved into place atomically once the document has been accepted.
+
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from dataclasses import dataclass
+
+import requests
+
+import zoia.backend.metadata
+from zoia.backend.files import remove_if_exists
+from zoia.backend.http import ZoiaSession
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# The number of times to try a download that was interrupted by a network
+# error.  Each attempt continues where the last one stopped.
+DOWNLOAD_ATTEMPTS = 3
+
+PARTIAL_DOWNLOADS_DIRNAME = '.downloads'
+
+_RETRIABLE_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+# Downloads of the same URL by different threads must not share a partial
+# download, so each partial download is locked while it is being written.
+_partial_locks = {}
+_partial_locks_lock = threading.Lock()
+
+
+class ZoiaDownloadException(Exception):
+    """An error downloading the document for an entry."""
+
+
+@dataclass
+class Download:
+    """A downloaded PDF that hasn't been moved into place yet."""
+
+    path: str
+    md5: str
+    size: int
+
+    def move(self, destination):
+        """Move the PDF to its final location."""
+        os.replace(self.path, destination)
+
+    def discard(self):
+        """Remove the PDF unless it was already moved."""
+        remove_if_exists(self.path)
+
+
+def _get_partial_paths(url, directory):
+    """Return the paths of the partial download of a URL and its state."""
+    key = hashlib.sha256(url.encode()).hexdigest()
+    partial_dir = os.path.join(directory, PARTIAL_DOWNLOADS_DIRNAME)
+    return (
+        os.path.join(partial_dir, key + '.pdf.part'),
+        os.path.join(partial_dir, key + '.json'),
+    )
+
+
+def _get_partial_lock(part_path):
+    with _partial_locks_lock:
+        return _partial_locks.setdefault(part_path, threading.Lock())
+
+
+def _load_state(state_path, url):
+    try:
+        with open(state_path) as fp:
+            state = json.load(fp)
+    except (OSError, ValueError):
+        return None
+
+    if state.get('url') != url:
+        return None
+    return state
+
+
+def _get_validator(response):
+    """Return the header value that identifies this version of the PDF."""
+    etag = response.headers.get('ETag')
+    # Weak validators can't be used with `If-Range`.
+    if etag is not None and not etag.startswith('W/'):
+        return etag
+    return response.headers.get('Last-Modified')
+
+
+def _get_range_start(response):
+    content_range = response.headers.get('Content-Range', '')
+    match = re.match(r'bytes (\d+)-', content_range)
+    return int(match.group(1)) if match is not None else None
+
+
+def _hash_file(path):
+    md5 = hashlib.md5()
+    with open(path, 'rb') as fp:
+        while chunk := fp.read(DOWNLOAD_CHUNK_SIZE):
+            md5.update(chunk)
+    return md5
+
+
+def _download_once(session, url, directory, part_path, state_path):
+    offset = 0
+    headers = {}
+    state = _load_state(state_path, url)
+    if state is not None and os.path.exists(part_path):
+        offset = os.path.getsize(part_path)
+        if offset > 0:
+            headers['Range'] = f'bytes={offset}-'
+            headers['If-Range'] = state['validator']
+
+    response = session.get(url, stream=True, headers=headers)
+    try:
+        if (
+            response.status_code == 206
+            and offset > 0
+            and _get_range_start(response) == offset
+        ):
+            mode = 'ab'
+            md5 = _hash_file(part_path)
+        elif response.status_code == 200:
+            # Either there was nothing to resume or the PDF has changed.
+            offset = 0
+            mode = 'wb'
+            md5 = hashlib.md5()
+        elif response.status_code == 416 and offset > 0:
+            # The partial download doesn't match the PDF on the server, so
+            # start from scratch.
+            remove_if_exists(part_path)
+            remove_if_exists(state_path)
+            return _download_once(
+                session, url, directory, part_path, state_path
+            )
+        else:
+            return None
+
+        os.makedirs(os.path.dirname(part_path), exist_ok=True)
+        validator = _get_validator(response)
+        if validator is not None:
+            with open(state_path, 'w') as fp:
+                json.dump({'url': url, 'validator': validator}, fp)
+        else:
+            remove_if_exists(state_path)
+
+        size = offset
+        try:
+            with open(part_path, mode) as fp:
+                for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    fp.write(chunk)
+                    md5.update(chunk)
+                    size += len(chunk)
+        except BaseException:
+            # Without a validator there is no safe way to resume.
+            if validator is None:
+                remove_if_exists(part_path)
+            raise
+    finally:
+        response.close()
+
+    fd, path = tempfile.mkstemp(
+        dir=directory, prefix='.zoia-', suffix='.pdf.part'
+    )
+    os.close(fd)
+    os.replace(part_path, path)
+    remove_if_exists(state_path)
+
+    return Download(path, md5.hexdigest(), size)
+
+
+def download_pdf(session, url, directory, attempts=DOWNLOAD_ATTEMPTS):
+    """Download a PDF, resuming an earlier partial download if possible.
+
+    Args:
+        session: requests.Session
+        url: str
+        directory: str
+            Where to put the PDF.  This should be on the same filesystem as
+            the final location of the PDF.
+        attempts: int
+            How many times to try the download if the connection fails.
+
+    Returns:
+        The `Download`, or `None` if the server didn't return the PDF.
+
+    """
+    part_path, state_path = _get_partial_paths(url, directory)
+    with _get_partial_lock(part_path):
+        for attempt in range(attempts):
+            try:
+                return _download_once(
+                    session, url, directory, part_path, state_path
+                )
+            except _RETRIABLE_ERRORS:
+                if attempt == attempts - 1:
+                    raise
+
+
+def get_pdf_url(metadatum):
+    """Return the URL to download the PDF of an entry from, if known."""
+    if metadatum.get('arxiv_id') is not None:
+        return f'https://arxiv.org/pdf/{metadatum["arxiv_id"]}.pdf'
+    return None
+
+
+def download_document(config, citekey, force=False):
+    """Download the PDF of an existing entry.
+
+    A partial download left behind by an earlier attempt is resumed.
+
+    Args:
+        config: ZoiaConfig
+        citekey: str
+        force: bool
+            Replace an existing PDF.
+
+    """
+    metadata = zoia.backend.metadata.get_metadata(config)
+    if citekey not in metadata:
+        raise ZoiaDownloadException(
+            f'Citekey {citekey} does not exist in the library.'
+        )
+
+    paper_dir = os.path.join(config.library_root, citekey)
+    document_path = os.path.join(paper_dir, 'document.pdf')
+    if os.path.exists(document_path) and not force:
+        raise ZoiaDownloadException(f'{citekey} already has a PDF.')
+
+    metadatum = metadata[citekey]
+    url = get_pdf_url(metadatum)
+    if url is None:
+        raise ZoiaDownloadException(f'Do not know where to find {citekey}.')
+
+    with ZoiaSession(config.http) as session:
+        download = download_pdf(session, url, config.library_root)
+    if download is None:
+        raise ZoiaDownloadException(
+            f'Was unable to fetch a PDF for {citekey}.'
+        )
+
+    try:
+        existing = metadata.find_citekey('pdf_md5', download.md5)
+        if existing is not None and existing != citekey:
+            raise ZoiaDownloadException(
+                f'The PDF of {citekey} already exists as {existing}.'
+            )
+
+        os.makedirs(paper_dir, exist_ok=True)
+        download.move(document_path)
+    finally:
+        download.discard()
+
+    metadatum['pdf_md5'] = download.md5
+    metadata[citekey] = metadatum
@@ -0,0 +1,35 @@
+"""Helpers for writing and removing files safely."""
+
+import os
+import threading
+from contextlib import contextmanager
+
+
+@contextmanager
+def open_atomically(path, mode='w'):
+    """Open a file that replaces `path` only once it's completely written.
+
+    The file is written next to `path` and then renamed over it, so that
+    neither an interrupted write nor a concurrent reader ever sees a partially
+    written file.  If the body of the `with` statement raises, `path` is left
+    untouched.
+
+    """
+    # The name is unique per thread so that concurrent writers of the same
+    # path don't write to the same temporary file.
+    tmp_path = f'{path}.{os.getpid()}-{threading.get_ident()}.tmp'
+    try:
+        with open(tmp_path, mode) as fp:
+            yield fp
+        os.replace(tmp_path, path)
+    except BaseException:
+        remove_if_exists(tmp_path)
+        raise
+
+
+def remove_if_exists(path):
+    """Remove a file unless it was already removed."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
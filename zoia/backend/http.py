@@ -0,0 +1,240 @@
+"""A shared HTTP session to fetch metadata and PDFs.
+
+Opening a new connection (and negotiating TLS) for every request often takes
+longer than the request itself.  A `ZoiaSession` keeps connections to each host
+alive so that they can be reused by later requests, including requests made
+from several threads at once.
+
+The session also keeps the requests to each host within the limits of the
+provider with a token bucket per host.  Requests that are rejected anyway (with
+HTTP 429 or 503) are retried after the delay that the server asks for in its
+`Retry-After` header or else after a randomized exponential backoff.  Either
+way, the whole host is paused, not just the rejected request.  A request that
+is asked to wait for longer than the maximum backoff fails instead.
+
+"""
+
+import email.utils
+import random
+import threading
+import time
+import urllib.parse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import zoia
+import zoia.backend.config
+
+RETRY_STATUS_CODES = {429, 503}
+
+
+class TokenBucket:
+    """A thread-safe token bucket.
+
+    Each request takes a token.  Tokens are replenished at `rate` per second
+    up to `burst` tokens.  When there are no tokens left, requests reserve
+    future tokens and wait until they are due, so waiting requests are served
+    in order.
+
+    """
+
+    def __init__(self, rate, burst, clock=time.monotonic, sleep=time.sleep):
+        """Create a bucket.
+
+        Args:
+            rate: float or None
+                Tokens per second, or `None` to not limit the rate.  (The
+                bucket can still be paused.)
+            burst: int
+                The maximum number of tokens.
+
+        """
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._sleep = sleep
+
+        self._lock = threading.Lock()
+        self._tokens = burst
+        self._updated = clock()
+        self._paused_until = self._updated
+
+    def _refill(self, now):
+        if now > self._updated:
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+
+    def acquire(self):
+        """Wait until a request may be made."""
+        with self._lock:
+            now = self._clock()
+            ready = now
+            if self.rate is not None:
+                self._refill(now)
+                self._tokens -= 1
+                if self._tokens < 0:
+                    ready = max(now, self._updated) - self._tokens / self.rate
+            ready = max(ready, self._paused_until)
+
+        if ready > now:
+            self._sleep(ready - now)
+
+    def pause(self, seconds):
+        """Hold back all requests for a while."""
+        with self._lock:
+            now = self._clock()
+            self._paused_until = max(self._paused_until, now + seconds)
+            if self.rate is not None:
+                # Don't let tokens build up during the pause, so that the
+                # requests afterwards are spread out rather than made at once.
+                self._refill(now)
+                self._tokens = min(self._tokens, 0)
+                self._updated = max(self._updated, self._paused_until)
+
+
+class RateLimiter:
+    """Token buckets for each host.
+
+    A limit for a domain also applies to its subdomains, and they share the
+    same bucket.
+
+    """
+
+    def __init__(self, rate_limits, clock=time.monotonic, sleep=time.sleep):
+        """Create the rate limiter.
+
+        Args:
+            rate_limits: dict
+                Maps hosts to dictionaries with the `rate` and `burst` of the
+                host.  Other hosts aren't limited.
+
+        """
+        self.rate_limits = rate_limits
+        self._clock = clock
+        self._sleep = sleep
+
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def _get_bucket(self, url):
+        host = urllib.parse.urlsplit(url).hostname or ''
+        parts = host.split('.')
+        for i in range(len(parts)):
+            if (domain := '.'.join(parts[i:])) in self.rate_limits:
+                limit = self.rate_limits[domain]
+                break
+        else:
+            domain = host
+            limit = {'rate': None, 'burst': 1}
+
+        with self._lock:
+            if domain not in self._buckets:
+                self._buckets[domain] = TokenBucket(
+                    limit['rate'],
+                    limit['burst'],
+                    clock=self._clock,
+                    sleep=self._sleep,
+                )
+            return self._buckets[domain]
+
+    def acquire(self, url):
+        """Wait until a request to the host of the URL may be made."""
+        self._get_bucket(url).acquire()
+
+    def pause(self, url, seconds):
+        """Hold back all requests to the host of the URL for a while."""
+        self._get_bucket(url).pause(seconds)
+
+
+def _get_retry_after(response):
+    """Return the delay in seconds requested by the server, if any."""
+    value = response.headers.get('Retry-After')
+    if value is None:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class ZoiaSession(requests.Session):
+    """A `requests` session with connection pooling and rate limiting."""
+
+    def __init__(self, http_config=None, pool_maxsize=None, rate_limiter=None):
+        """Create a session.
+
+        Args:
+            http_config: HttpConfig
+                The connection settings.  Uses the defaults if not given.
+            pool_maxsize: int
+                Overrides the number of connections to keep open to each host.
+                This should be at least the number of threads sharing the
+                session.
+            rate_limiter: RateLimiter
+                Overrides the rate limiter made from the configuration.
+
+        """
+        super().__init__()
+        if http_config is None:
+            http_config = zoia.backend.config.HttpConfig()
+
+        self.timeout = (http_config.connect_timeout, http_config.read_timeout)
+        self.max_retries = http_config.max_retries
+        self.backoff_base = http_config.backoff_base
+        self.backoff_max = http_config.backoff_max
+
+        if rate_limiter is None:
+            rate_limiter = RateLimiter(http_config.rate_limits)
+        self.rate_limiter = rate_limiter
+
+        adapter = HTTPAdapter(
+            pool_connections=http_config.pool_connections,
+            pool_maxsize=pool_maxsize or http_config.pool_maxsize,
+        )
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+        self.headers['User-Agent'] = f'zoia/{zoia.__version__}'
+
+    def _get_backoff(self, attempt):
+        # "Full jitter" keeps threads that were rejected at the same time from
+        # retrying at the same time.
+        return random.uniform(
+            0, min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        )
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire(url)
+            response = super().request(method, url, **kwargs)
+            if (
+                response.status_code not in RETRY_STATUS_CODES
+                or attempt == self.max_retries
+            ):
+                return response
+
+            delay = _get_retry_after(response)
+            response.close()
+            if delay is None:
+                delay = self._get_backoff(attempt)
+            elif delay > self.backoff_max:
+                # Pausing the host for as long as the server likes could stall
+                # the whole batch for hours.
+                raise requests.HTTPError(
+                    f'{url} asked to retry after {delay:.0f} seconds, which '
+                    f'is longer than backoff_max ({self.backoff_max:g} '
+                    f'seconds).',
+                    response=response,
+                )
+            self.rate_limiter.pause(url, delay)
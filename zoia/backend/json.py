@@ -1,9 +1,30 @@
-"""Tools to interact with a simple JSON backend."""
+"""Tools to interact with a simple JSON backend.
 
+The metadata are stored as a single JSON snapshot.  Rewriting the snapshot
+after every change is expensive for large libraries, so the backend can
+optionally be run in journaled mode.  In that mode changes are appended to a
+journal next to the snapshot and the journal is folded back into the snapshot
+once it has accumulated `JOURNAL_COMPACTION_THRESHOLD` records.
+
+"""
+
+import copy
+import heapq
 import json
 import os
+import re
 
 import zoia.backend.metadata
+from zoia.backend.files import open_atomically
+from zoia.backend.metadata import IDENTIFIER_FIELDS
+from zoia.parse.normalization import normalize_name
+
+ZOIA_JOURNAL_FILENAME = 'metadata.journal'
+
+JOURNAL_COMPACTION_THRESHOLD = 1000
+
+# Marks citekeys that did not exist when a transaction began.
+_MISSING = object()
 
 
 class JSONMetadata(zoia.backend.metadata.Metadata):
@@ -15,11 +36,150 @@ class JSONMetadata(zoia.backend.metadata.Metadata):
         self.config = config
         self._metadata = {}
         self.metadata_filename = os.path.join(config.db_root, 'metadata.json')
+        self.journal_filename = os.path.join(
+            config.db_root, ZOIA_JOURNAL_FILENAME
+        )
+        self._n_journal_records = 0
 
         if os.path.exists(self.metadata_filename):
             with open(self.metadata_filename) as fp:
                 self._metadata = json.load(fp)
 
+        # Always replay an existing journal, even if journaling has since been
+        # turned off, so that no changes are lost.
+        if os.path.exists(self.journal_filename):
+            self._replay_journal()
+            if not self.config.json_journal:
+                self.write()
+
+        self._build_indexes()
+
+    def _replay_journal(self):
+        """Apply the records in the journal to the in-memory metadata.
+
+        A partially written record can only occur at the end of the journal
+        if `zoia` was interrupted while writing it.  It is cut off, since the
+        records appended later would otherwise be glued onto it.
+
+        """
+        n_good_bytes = 0
+        with open(self.journal_filename, 'rb') as fp:
+            for line in fp:
+                # A record is only complete once its newline is written.
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+
+                if record['op'] == 'set':
+                    self._metadata[record['citekey']] = record['metadatum']
+                elif record['op'] == 'rename':
+                    # The rename may already be part of the snapshot if we
+                    # were interrupted during compaction.
+                    old_key = record['old_key']
+                    new_key = record['new_key']
+                    if old_key in self._metadata:
+                        self._metadata[new_key] = self._metadata.pop(old_key)
+
+                self._n_journal_records += 1
+                n_good_bytes += len(line)
+
+        if n_good_bytes < os.path.getsize(self.journal_filename):
+            with open(self.journal_filename, 'r+b') as fp:
+                fp.truncate(n_good_bytes)
+
+    def _append_to_journal(self, records):
+        """Append records to the journal, compacting it if it is too long."""
+        with open(self.journal_filename, 'a') as fp:
+            for record in records:
+                fp.write(json.dumps(record, sort_keys=True) + '\n')
+
+        self._n_journal_records += len(records)
+        if self._n_journal_records >= JOURNAL_COMPACTION_THRESHOLD:
+            self.write()
+
+    def _persist(self, record):
+        """Persist a single change to disk unless in a transaction."""
+        if self.in_transaction:
+            self._pending_records.append(record)
+        elif self.config.json_journal:
+            self._append_to_journal([record])
+        else:
+            self.write()
+
+    def _save_for_rollback(self, citekey):
+        """Remember the state of a citekey before it is first changed."""
+        if self.in_transaction and citekey not in self._rollback_metadata:
+            metadatum = self._metadata.get(citekey, _MISSING)
+            if metadatum is not _MISSING:
+                metadatum = copy.deepcopy(metadatum)
+            self._rollback_metadata[citekey] = metadatum
+
+    def _begin_transaction(self):
+        self._pending_records = []
+        self._rollback_metadata = {}
+
+    def _commit_transaction(self):
+        if self._pending_records:
+            if self.config.json_journal:
+                self._append_to_journal(self._pending_records)
+            else:
+                self.write()
+
+        self._pending_records = []
+        self._rollback_metadata = {}
+
+    def _rollback_transaction(self):
+        for citekey, metadatum in self._rollback_metadata.items():
+            self._unindex(citekey)
+            if metadatum is _MISSING:
+                self._metadata.pop(citekey, None)
+            else:
+                self._metadata[citekey] = metadatum
+                self._index(citekey)
+
+        self._pending_records = []
+        self._rollback_metadata = {}
+
+    def _build_indexes(self):
+        """Build the reverse indexes from identifiers to citekeys.
+
+        `_indexes` maps each identifier field to a dictionary from identifier
+        values to the citekeys with that value.  `_indexed_values` records
+        which values were indexed for each citekey so that they can be removed
+        again even if the metadatum was modified in place.
+
+        """
+        self._indexes = {field: {} for field in IDENTIFIER_FIELDS}
+        self._indexed_values = {}
+        for citekey in self._metadata:
+            self._index(citekey)
+
+    def _index(self, citekey):
+        """Add the identifiers of a citekey to the indexes."""
+        metadatum = self._metadata[citekey]
+        if not isinstance(metadatum, dict):
+            return
+
+        indexed_values = {}
+        for field in IDENTIFIER_FIELDS:
+            value = metadatum.get(field)
+            if value is not None:
+                self._indexes[field].setdefault(value, set()).add(citekey)
+                indexed_values[field] = value
+        self._indexed_values[citekey] = indexed_values
+
+    def _unindex(self, citekey):
+        """Remove the identifiers of a citekey from the indexes."""
+        indexed_values = self._indexed_values.pop(citekey, {})
+        for field, value in indexed_values.items():
+            citekeys = self._indexes[field][value]
+            citekeys.discard(citekey)
+            if not citekeys:
+                del self._indexes[field][value]
+
     def __contains__(self, citekey):
         """Determine whether the citekey exists in the library."""
 
@@ -33,48 +193,126 @@ class JSONMetadata(zoia.backend.metadata.Metadata):
     def __setitem__(self, citekey, metadatum):
         """Set the metadata for a citekey."""
 
+        self._save_for_rollback(citekey)
+        self._unindex(citekey)
         if citekey in self:
             self._metadata[citekey].update(metadatum)
         else:
             self._metadata[citekey] = metadatum
-        self.write()
+        self._index(citekey)
+        self._persist(
+            {
+                'op': 'set',
+                'citekey': citekey,
+                'metadatum': self._metadata[citekey],
+            }
+        )
 
     def write(self):
         """Write the metadata for the library to disk.
 
-        Note that this will overwrite any existing metadata.
+        Note that this will overwrite any existing metadata.  Any journal is
+        folded into the new snapshot and removed.
 
         """
         if self.config.db_root is None:
             raise RuntimeError('No library root set.  Cannot write metadata!')
 
-        with open(self.metadata_filename, 'w') as fp:
+        with open_atomically(self.metadata_filename) as fp:
             json.dump(self._metadata, fp, indent=4, sort_keys=True)
 
+        if os.path.exists(self.journal_filename):
+            os.remove(self.journal_filename)
+        self._n_journal_records = 0
+
     def rename_key(self, old_key, new_key):
         """Rename a citekey in the metadata."""
         if new_key in self._metadata:
             raise KeyError(f'Key {new_key} is already present.')
 
+        self._save_for_rollback(old_key)
+        self._save_for_rollback(new_key)
+        self._unindex(old_key)
         self._metadata[new_key] = self._metadata.pop(old_key)
-        self.write()
+        self._index(new_key)
+        self._persist({'op': 'rename', 'old_key': old_key, 'new_key': new_key})
+
+    def search(self, query, limit=20):
+        """Search the titles, authors, and tags of the library.
+
+        The JSON backend has no search index, so this scans every entry.  The
+        notes aren't searched since that would mean reading every note.
+
+        """
+        terms = [normalize_name(term) for term in query.split()]
+        if not terms:
+            return []
+
+        scores = []
+        for citekey, metadatum in self._metadata.items():
+            if not isinstance(metadatum, dict):
+                continue
+
+            score = _score(metadatum, terms)
+            if score > 0:
+                scores.append((-score, citekey))
+
+        return [citekey for _, citekey in heapq.nsmallest(limit, scores)]
+
+    def find_citekey(self, field, value):
+        """Return the citekey of the entry with the given identifier."""
+        citekeys = self._indexes[field].get(value)
+        if not citekeys:
+            return None
+
+        # Duplicates can only appear if the metadata were edited by hand.
+        # Return the same citekey every time in that case.
+        return min(citekeys)
 
     def arxiv_id_exists(self, arxiv_id):
-        """Return a set of all existing arXiv identifiers."""
-        arxiv_ids = {elem.get('arxiv_id') for elem in self._metadata.values()}
-        return arxiv_id in arxiv_ids
+        """Determine whether the arXiv identifier exists in the library."""
+        return arxiv_id in self._indexes['arxiv_id']
 
     def isbn_exists(self, isbn):
-        """Return a set of all existing ISBNs."""
-        isbns = {elem.get('isbn') for elem in self._metadata.values()}
-        return isbn in isbns
+        """Determine whether the ISBN exists in the library."""
+        return isbn in self._indexes['isbn']
 
     def doi_exists(self, doi):
-        """Return a set of all existing DOIs."""
-        dois = {elem.get('doi') for elem in self._metadata.values()}
-        return doi in dois
+        """Determine whether the DOI exists in the library."""
+        return doi in self._indexes['doi']
 
     def pdf_md5_hash_exists(self, pdf_md5):
-        """Return a set of all the MD5 hashes of existing PDFs."""
-        pdf_md5s = {elem.get('pdf_md5') for elem in self._metadata.values()}
-        return pdf_md5 in pdf_md5s
+        """Determine whether a PDF with the MD5 hash exists in the library."""
+        return pdf_md5 in self._indexes['pdf_md5']
+
+
+def _get_words(text):
+    """Split normalized text into a set of words."""
+    return set(re.findall(r'\w+', normalize_name(text)))
+
+
+def _score(metadatum, terms):
+    """Score how well a metadatum matches the terms of a search query.
+
+    Each term must match a word in the title, authors, or tags.  Matches in
+    the title count more.  Returns 0 if any term doesn't match.
+
+    """
+    authors = [
+        author if isinstance(author, str) else ' '.join(filter(None, author))
+        for author in metadatum.get('authors') or []
+    ]
+    fields = [
+        (10, _get_words(metadatum.get('title') or '')),
+        (5, _get_words(' '.join(authors))),
+        (5, _get_words(' '.join(metadatum.get('tags') or []))),
+    ]
+
+    score = 0
+    for term in terms:
+        term_score = sum(weight for weight, words in fields if term in words)
+        if term_score == 0:
+            return 0
+        score += term_score
+
+    return score
@@ -2,13 +2,19 @@
 
 from abc import ABC
 from abc import abstractmethod
+from collections.abc import Mapping
+from contextlib import contextmanager
 from dataclasses import dataclass
 from typing import List
 
+import zoia.backend.config
 from zoia.parse.normalization import split_name
 
 MAX_CITEKEY_STR_LEN = 65
 
+# Fields which identify a document and are used to detect duplicate entries.
+IDENTIFIER_FIELDS = ('arxiv_id', 'doi', 'isbn', 'pdf_md5')
+
 
 @dataclass
 class Metadatum:
@@ -72,10 +78,72 @@ class Metadatum:
 class Metadata(ABC):
     """An abstract class with the API to interact with metadata."""
 
+    _transaction_depth = 0
+
     @abstractmethod
     def __init__(self, config):
         """Initialize the metadata database."""
 
+    @property
+    def in_transaction(self):
+        """Whether changes are currently being deferred by a transaction."""
+        return self._transaction_depth > 0
+
+    @contextmanager
+    def transaction(self):
+        """Defer writing changes to disk until the end of the block.
+
+        All changes made inside the block are persisted at once when the block
+        exits.  If an exception is raised inside the block the changes are
+        rolled back instead.  Transactions may be nested, in which case only
+        the outermost one has any effect.
+
+        """
+        if self.in_transaction:
+            self._transaction_depth += 1
+            try:
+                yield self
+            finally:
+                self._transaction_depth -= 1
+            return
+
+        self._begin_transaction()
+        self._transaction_depth = 1
+        try:
+            yield self
+        except BaseException:
+            self._transaction_depth = 0
+            self._rollback_transaction()
+            raise
+        self._transaction_depth = 0
+        self._commit_transaction()
+
+    def update_many(self, items):
+        """Set the metadata for many citekeys, writing to disk only once.
+
+        `items` is either a dictionary or an iterable of `(citekey, metadatum)`
+        pairs.
+
+        """
+        if isinstance(items, Mapping):
+            items = items.items()
+
+        with self.transaction():
+            for citekey, metadatum in items:
+                self[citekey] = metadatum
+
+    @abstractmethod
+    def _begin_transaction(self):
+        """Start deferring changes."""
+
+    @abstractmethod
+    def _commit_transaction(self):
+        """Persist all the changes deferred since the transaction began."""
+
+    @abstractmethod
+    def _rollback_transaction(self):
+        """Discard all the changes made since the transaction began."""
+
     @abstractmethod
     def __contains__(self, citekey):
         """Determine whether the citekey exists in the library."""
@@ -101,32 +169,65 @@ class Metadata(ABC):
         """Rename a citekey in the metadata."""
 
     @abstractmethod
-    def arxiv_id_exists(self):
-        """Return a set of all existing arXiv identifiers."""
+    def search(self, query, limit=20):
+        """Search the titles, authors, tags, and notes of the library.
+
+        Every word in the query must match.  The citekeys of the matching
+        entries are returned with the best match first.
+
+        """
+
+    def update_search_index(self, citekey):
+        """Update the search index after a citekey's notes changed.
+
+        Changes to the metadata themselves are indexed automatically.  Backends
+        without a persistent search index don't need to do anything here.
+
+        """
+
+    @abstractmethod
+    def find_citekey(self, field, value):
+        """Return the citekey of the entry with the given identifier.
+
+        `field` must be one of `IDENTIFIER_FIELDS`.  If no entry has the
+        identifier `None` is returned.
+
+        """
+
+    @abstractmethod
+    def arxiv_id_exists(self, arxiv_id):
+        """Determine whether the arXiv identifier exists in the library."""
 
     @abstractmethod
-    def isbn_exists(self):
-        """Return a set of all existing ISBNs."""
+    def isbn_exists(self, isbn):
+        """Determine whether the ISBN exists in the library."""
 
     @abstractmethod
-    def doi_exists(self):
-        """Return a set of all existing DOIs."""
+    def doi_exists(self, doi):
+        """Determine whether the DOI exists in the library."""
 
     @abstractmethod
-    def pdf_md5_hash_exists(self):
-        """Return a set of all the MD5 hashes of existing PDFs."""
+    def pdf_md5_hash_exists(self, pdf_md5):
+        """Determine whether a PDF with the MD5 hash exists in the library."""
 
 
 def get_metadata(config):
     """Get the appropriate metadata class from the config dataclass."""
 
-    import zoia.backend.json
-    import zoia.backend.sqlite
-
+    # Only import the backend that is actually used since the `sqlalchemy`
+    # SQLite backend is slow to import.
     if config.backend == zoia.backend.config.ZoiaBackend.JSON:
-        return zoia.backend.json.JSONMetadata(config)
+        from zoia.backend.json import JSONMetadata
+
+        return JSONMetadata(config)
     if config.backend == zoia.backend.config.ZoiaBackend.SQLITE:
-        return zoia.backend.sqlite.SQLiteMetadata(config)
+        from zoia.backend.sqlite import SQLiteMetadata
+
+        return SQLiteMetadata(config)
+    if config.backend == zoia.backend.config.ZoiaBackend.SQLITE3:
+        from zoia.backend.sqlite3 import SQLite3Metadata
+
+        return SQLite3Metadata(config)
     else:
         raise NotImplementedError(
             f'Backend {config.backend.value} not implemented yet.'
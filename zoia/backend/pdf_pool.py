@@ -0,0 +1,242 @@
+"""Analyze PDFs in worker processes.
+
+pdfminer is pure Python, so analyzing a PDF takes a core for as long as it
+runs, and a malformed PDF can make it run forever or use all of the memory.  A
+`PdfPool` runs the analysis in separate processes instead: each task gets a
+hard time limit, each worker gets a memory limit, and a worker that runs out of
+either is killed and replaced without affecting the other tasks.  Since the
+workers are processes, analyzing many PDFs uses all of the cores.
+
+The tasks are functions (like `zoia.parse.pdf.find_identifiers`) that are
+called in a worker with the given arguments, so the functions, arguments, and
+results have to be picklable.
+
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    # Windows doesn't have resource limits.
+    resource = None
+
+
+class ZoiaPdfException(Exception):
+    pass
+
+
+def _set_memory_limit(memory_limit):
+    if resource is None or not memory_limit:
+        return
+
+    limit = memory_limit * 1024 * 1024
+    _, hard_limit = resource.getrlimit(resource.RLIMIT_AS)
+    if hard_limit != resource.RLIM_INFINITY:
+        limit = min(limit, hard_limit)
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard_limit))
+    except (ValueError, OSError):
+        # E.g., macOS doesn't support limiting the address space.
+        pass
+
+
+def _worker_main(conn, memory_limit):
+    """Run tasks from the pool until it sends `None`."""
+    _set_memory_limit(memory_limit)
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+
+        fn, args, kwargs = task
+        try:
+            result = (True, fn(*args, **kwargs))
+        except Exception as e:
+            # Send the error as a string since not all exceptions can be
+            # pickled.
+            result = (False, f'{type(e).__name__}: {e}')
+        conn.send(result)
+
+
+class _Worker:
+    """A process that runs one task at a time."""
+
+    def __init__(self, context, memory_limit):
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(
+            target=_worker_main, args=(child_conn, memory_limit), daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+
+    def run(self, fn, args, kwargs, timeout):
+        """Run a task and return its result.
+
+        Raises a `ZoiaPdfException` if the task fails.  If the worker had to
+        be killed, `self.alive` is false afterwards.
+
+        """
+        try:
+            self._conn.send((fn, args, kwargs))
+            if not self._conn.poll(timeout):
+                self.kill()
+                raise ZoiaPdfException(f'Timed out after {timeout} seconds.')
+            ok, value = self._conn.recv()
+        except (EOFError, OSError):
+            self.kill()
+            raise ZoiaPdfException(
+                f'The worker died with exit code {self._process.exitcode}.'
+            )
+
+        if not ok:
+            raise ZoiaPdfException(value)
+        return value
+
+    @property
+    def alive(self):
+        return self._process.is_alive()
+
+    def stop(self):
+        try:
+            self._conn.send(None)
+        except OSError:
+            pass
+        self._process.join(timeout=1)
+        self.kill()
+        self._conn.close()
+
+    def kill(self):
+        if self._process.is_alive():
+            self._process.kill()
+        self._process.join()
+
+
+class PdfPool:
+    """A pool of processes that analyze PDFs.
+
+    The workers are started as tasks come in and are reused for later tasks.
+
+    """
+
+    def __init__(self, workers=None, timeout=60.0, memory_limit=1024):
+        """Create a pool.
+
+        Args:
+            workers: int
+                The maximum number of worker processes.  Defaults to the number
+                of cores.
+            timeout: float
+                The number of seconds after which a task is killed.
+            memory_limit: int
+                The maximum size of the address space of each worker in MiB, or
+                `None` for no limit.
+
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+
+        # Forking a process with running threads isn't safe.
+        self._context = multiprocessing.get_context('spawn')
+        self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        self._idle = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._all_workers = []
+        # The futures of the tasks that haven't finished, so that they can be
+        # cancelled.
+        self._futures = set()
+
+    def _get_worker(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            worker = _Worker(self._context, self.memory_limit)
+            with self._lock:
+                self._all_workers.append(worker)
+            return worker
+
+    def _run(self, fn, args, kwargs):
+        worker = self._get_worker()
+        try:
+            return worker.run(fn, args, kwargs, self.timeout)
+        finally:
+            if worker.alive:
+                self._idle.put(worker)
+            else:
+                worker.stop()
+                with self._lock:
+                    # The pool may have been shut down in the meantime.
+                    if worker in self._all_workers:
+                        self._all_workers.remove(worker)
+
+    def submit(self, fn, *args, **kwargs):
+        """Run `fn(*args, **kwargs)` in a worker.
+
+        Returns a `concurrent.futures.Future` for the result.  The future
+        raises a `ZoiaPdfException` if the task raises an exception, takes
+        longer than the timeout, or kills its worker (e.g., by running out of
+        memory).
+
+        """
+        future = self._executor.submit(self._run, fn, args, kwargs)
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._forget)
+        return future
+
+    def _forget(self, future):
+        with self._lock:
+            self._futures.discard(future)
+
+    def map(self, fn, *iterables):
+        """Like `concurrent.futures.Executor.map` but in the workers."""
+        futures = [self.submit(fn, *args) for args in zip(*iterables)]
+        return (future.result() for future in futures)
+
+    def shutdown(self, wait=True):
+        """Stop the workers.
+
+        Unless `wait` is true, the tasks that haven't started are cancelled
+        and the running tasks are killed.
+
+        """
+        if not wait:
+            # Cancel the tasks by hand since `cancel_futures` needs Python
+            # 3.9.
+            with self._lock:
+                futures = list(self._futures)
+            for future in futures:
+                future.cancel()
+            self._executor.shutdown(wait=False)
+            with self._lock:
+                for worker in self._all_workers:
+                    worker.kill()
+        self._executor.shutdown(wait=wait)
+
+        with self._lock:
+            for worker in self._all_workers:
+                worker.stop()
+            self._all_workers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown(wait=exc_type is None)
+
+    @classmethod
+    def from_config(cls, config, workers=None):
+        """Create a pool with the settings of `config.pdf`."""
+        return cls(
+            workers=workers or config.pdf.workers,
+            timeout=config.pdf.worker_timeout,
+            memory_limit=config.pdf.memory_limit,
+        )
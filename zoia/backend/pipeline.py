@@ -0,0 +1,119 @@
+"""Run the stages of fetching a document concurrently.
+
+Adding a document takes several requests, some of which need the results of
+others (e.g., the PDF of a DOI can only be downloaded once Semantic Scholar has
+told us the arXiv ID).  A `StageGraph` describes these requests as stages with
+dependencies and starts each stage as soon as the stages it depends on have
+finished, so the time it takes is that of the longest chain of dependent
+requests rather than the sum of all of them.
+
+"""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+
+
+class StageGraph:
+    """A set of stages that depend on each other's results.
+
+    Stages have to be added after the stages they depend on, so the graph can
+    never have cycles.
+
+    """
+
+    def __init__(self):
+        self._stages = {}
+        self._lock = threading.Lock()
+        # The duration of each stage in seconds.
+        self.timings = {}
+
+    def add(self, name, fn, deps=(), cleanup=None):
+        """Add a stage.
+
+        Args:
+            name: str
+            fn: callable
+                Called with the results of the stages in `deps` (in that order)
+                and returns the result of the stage.
+            deps: list
+                The names of the stages that this stage depends on.
+            cleanup: callable
+                Called with the result of the stage if another stage fails, so
+                that the results don't leak, e.g., downloaded files.
+
+        """
+        if name in self._stages:
+            raise ValueError(f'Stage {name} already exists.')
+        for dep in deps:
+            if dep not in self._stages:
+                raise ValueError(
+                    f'Stage {name} depends on unknown stage {dep}.'
+                )
+
+        self._stages[name] = (fn, tuple(deps), cleanup)
+
+    def _run_stage(self, name, fn, args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.timings[name] = time.perf_counter() - start
+
+    def _submit_ready(self, executor, pending, results, futures):
+        """Start the pending stages whose dependencies have finished."""
+        for name, (fn, deps, _) in list(pending.items()):
+            if all(dep in results for dep in deps):
+                del pending[name]
+                args = [results[dep] for dep in deps]
+                future = executor.submit(self._run_stage, name, fn, args)
+                futures[future] = name
+
+    def run(self):
+        """Run all of the stages and return their results by name.
+
+        If a stage raises an exception, no more stages are started.  Once the
+        running stages have finished, the results of the successful stages are
+        cleaned up and the exception is raised again.
+
+        """
+        pending = dict(self._stages)
+        results = {}
+        futures = {}
+        error = None
+        with ThreadPoolExecutor(max_workers=len(pending) or 1) as executor:
+            try:
+                while True:
+                    if error is None:
+                        self._submit_ready(executor, pending, results, futures)
+                    if not futures:
+                        break
+
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        name = futures.pop(future)
+                        try:
+                            results[name] = future.result()
+                        except BaseException as e:
+                            if error is None:
+                                error = e
+            except BaseException as e:
+                # E.g., the user interrupted us while we were waiting.
+                error = e
+
+        # Leaving the executor waited for the stages that were still running.
+        for future, name in futures.items():
+            if future.exception() is None:
+                results[name] = future.result()
+
+        if error is not None:
+            for name, result in results.items():
+                cleanup = self._stages[name][2]
+                if cleanup is not None:
+                    cleanup(result)
+            raise error
+
+        return results
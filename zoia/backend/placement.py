@@ -0,0 +1,86 @@
+"""Put PDFs from the user's files into the library.
+
+Copying a PDF byte by byte doubles the I/O of adding it, which adds up when
+importing thousands of PDFs.  Depending on `PdfConfig.placement`, a PDF is
+instead
+
+- copied by cloning it (a reflink on filesystems with copy-on-write like Btrfs
+  and XFS) or by letting the kernel copy it with `copy_file_range`, either of
+  which can avoid reading and writing the data in `zoia`,
+- hard linked, so that the library shares the file with the original (which
+  means that changes to one are changes to the other), or
+- moved.
+
+Every option falls back to the next cheapest one that works, so e.g. a hard
+link to another filesystem becomes a copy.
+
+"""
+
+import errno
+import os
+import shutil
+import sys
+
+from zoia.backend.config import PdfPlacement
+from zoia.backend.files import remove_if_exists
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+# The `ioctl` that clones a file on Linux.  See ioctl_ficlone(2).
+_FICLONE = 0x40049409
+
+
+def _reflink(source, destination):
+    with open(source, 'rb') as src, open(destination, 'wb') as dst:
+        fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+
+
+def _copy_file_range(source, destination):
+    with open(source, 'rb') as src, open(destination, 'wb') as dst:
+        remaining = os.fstat(src.fileno()).st_size
+        while remaining > 0:
+            n_bytes = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+            if n_bytes == 0:
+                raise OSError(errno.EIO, 'copy_file_range stopped early.')
+            remaining -= n_bytes
+
+
+# The ways to copy a file without reading it, best first.  Each raises an
+# `OSError` if it isn't supported for the file.
+_CLONE_FNS = []
+if fcntl is not None and sys.platform.startswith('linux'):
+    _CLONE_FNS.append(_reflink)
+if hasattr(os, 'copy_file_range'):
+    _CLONE_FNS.append(_copy_file_range)
+
+
+def _copy(source, destination):
+    for clone_fn in _CLONE_FNS:
+        try:
+            clone_fn(source, destination)
+            return
+        except OSError:
+            remove_if_exists(destination)
+
+    shutil.copyfile(source, destination)
+
+
+def _hardlink(source, destination):
+    try:
+        os.link(source, destination)
+    except OSError:
+        # E.g., the library is on another filesystem.
+        _copy(source, destination)
+
+
+def place_file(source, destination, placement=PdfPlacement.COPY):
+    """Put a file at `destination`, which must not exist yet."""
+    if placement == PdfPlacement.MOVE:
+        shutil.move(source, destination)
+    elif placement == PdfPlacement.HARDLINK:
+        _hardlink(source, destination)
+    else:
+        _copy(source, destination)
@@ -0,0 +1,131 @@
+"""Resolve papers with as few requests as possible.
+
+Making one request per paper is slow when adding many papers at once, so the
+resolvers of the providers whose APIs accept many IDs per request (see
+`zoia.backend.semantic_scholar` and `zoia.backend.arxiv`) first resolve all of
+the papers of a batch with `BatchResolver.prefetch`.  Papers that the batch
+requests didn't resolve (because a request failed or because the provider
+didn't know the ID) are looked up one at a time when they are asked for.
+
+"""
+
+import threading
+from abc import ABC
+from abc import abstractmethod
+
+import requests
+
+# The errors for which a batch request falls back to single requests.
+BATCH_ERRORS = (requests.RequestException, ValueError)
+
+
+class BatchResolver(ABC):
+    """The base class of the resolvers of batch APIs.
+
+    Subclasses set `provider` and `batch_size` and implement `_get_batch` and
+    `_get_single`.  The resolver remembers the papers it resolved and caches
+    them, so that each paper is requested at most once.
+
+    The resolver is thread-safe, so the papers can be prefetched once and then
+    looked up from several worker threads.
+
+    """
+
+    # The name of the provider in the `ResponseCache`.
+    provider = None
+
+    # The default number of IDs per batch request.
+    batch_size = None
+
+    def __init__(self, session, cache=None, api_url=None):
+        """Create a resolver.
+
+        Args:
+            session: ZoiaSession
+                The session to make requests with.
+            cache: ResponseCache
+                Caches the papers under the resolver's provider.
+            api_url: str
+                The URL of the provider's API.
+
+        """
+        self.session = session
+        self.cache = cache
+        self.api_url = api_url
+
+        self._lock = threading.Lock()
+        self._papers = {}
+
+    def _get_cache_key(self, paper_id):
+        return paper_id
+
+    def _get_known(self, paper_id):
+        with self._lock:
+            paper = self._papers.get(paper_id)
+        if paper is None and self.cache is not None:
+            paper = self.cache.get(
+                self.provider, self._get_cache_key(paper_id)
+            )
+        return paper
+
+    def _remember(self, paper_id, paper):
+        with self._lock:
+            self._papers[paper_id] = paper
+        if self.cache is not None:
+            self.cache.set(self.provider, self._get_cache_key(paper_id), paper)
+
+    @abstractmethod
+    def _get_batch(self, paper_ids):
+        """Request many papers at once.
+
+        Returns a dictionary with the papers that were found, keyed by their
+        IDs.  Raises one of `BATCH_ERRORS` if the request fails.
+
+        """
+
+    @abstractmethod
+    def _get_single(self, paper_id):
+        """Request a single paper and return it or `None` if it's unknown."""
+
+    def prefetch(self, paper_ids, batch_size=None):
+        """Resolve papers in batches so that they can be looked up later.
+
+        Failures are ignored: the papers that couldn't be resolved are
+        requested individually by `get` instead.  Returns the IDs that
+        couldn't be resolved.
+
+        """
+        batch_size = batch_size or self.batch_size
+        paper_ids = [
+            paper_id
+            for paper_id in dict.fromkeys(paper_ids)
+            if self._get_known(paper_id) is None
+        ]
+        for i in range(0, len(paper_ids), batch_size):
+            try:
+                papers = self._get_batch(paper_ids[i : i + batch_size])
+            except BATCH_ERRORS:
+                continue
+
+            for paper_id, paper in papers.items():
+                self._remember(paper_id, paper)
+
+        return [
+            paper_id
+            for paper_id in paper_ids
+            if self._get_known(paper_id) is None
+        ]
+
+    def get(self, paper_id):
+        """Return a paper or `None` if the provider doesn't know it.
+
+        Raises `requests.HTTPError` if the request fails for another reason or
+        a `ValueError` if the response is invalid.
+
+        """
+        paper = self._get_known(paper_id)
+        if paper is None:
+            paper = self._get_single(paper_id)
+            if paper is not None:
+                self._remember(paper_id, paper)
+        return paper
@@ -0,0 +1,79 @@
+"""The queue of imported PDFs that need the user's attention.
+
+`zoia import` adds PDFs without asking the user anything.  The PDFs that it
+can't add on its own (because they don't contain an identifier or because the
+metadata of their identifiers couldn't be fetched) are put in a queue in
+`review.json` in the database directory instead, so that the user can go
+through them later with `zoia import --review`.
+
+"""
+
+import json
+import os
+from dataclasses import asdict
+from dataclasses import dataclass
+from dataclasses import field
+from typing import List
+
+from zoia.backend.files import open_atomically
+
+REVIEW_FILENAME = 'review.json'
+
+
+@dataclass
+class ReviewItem:
+    """A PDF waiting for review."""
+
+    path: str
+    md5: str
+    reason: str
+    # The identifiers found in the PDF, best first, as dictionaries with the
+    # fields of `zoia.parse.pdf.IdentifierCandidate`.
+    candidates: List[dict] = field(default_factory=list)
+
+
+class ReviewQueue:
+    """The PDFs waiting for review, keyed by their MD5 hash.
+
+    Changes are only saved by `write`.
+
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        try:
+            with open(filename) as fp:
+                items = json.load(fp)
+        except FileNotFoundError:
+            items = []
+
+        self._items = {}
+        for item in items:
+            item = ReviewItem(**item)
+            self._items[item.md5] = item
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(os.path.join(config.db_root, REVIEW_FILENAME))
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(list(self._items.values()))
+
+    def __contains__(self, md5):
+        return md5 in self._items
+
+    def add(self, item):
+        """Add a PDF, replacing any earlier item for the same PDF."""
+        self._items[item.md5] = item
+
+    def remove(self, md5):
+        self._items.pop(md5, None)
+
+    def write(self):
+        with open_atomically(self.filename) as fp:
+            json.dump(
+                [asdict(item) for item in self._items.values()], fp, indent=4
+            )
@@ -0,0 +1,347 @@
+"""The schema of the SQLite database and the migrations between versions.
+
+The schema version is stored in the `schema_version` table.  Each element of
+`MIGRATIONS` brings the database from one version to the next, so a database at
+version `n` is brought up to date by applying `MIGRATIONS[n:]` in order.  A
+database without a `schema_version` table is at version 0.  (This includes
+databases created before the schema was versioned, so the first migration must
+tolerate tables that already exist.)
+
+This module only depends on the DB-API so that the schema can be checked
+without importing `sqlalchemy`.
+
+"""
+
+import json
+import os
+import sqlite3
+
+ZOIA_METADATA_FILENAME = 'metadata.db'
+
+# The metadata with their own columns in the `entries` table.  The authors and
+# tags are stored in their own tables and all other metadata are serialized as
+# JSON in the `other_metadata` column.
+ENTRY_COLUMNS = (
+    'entry_type',
+    'title',
+    'year',
+    'arxiv_id',
+    'doi',
+    'isbn',
+    'pdf_md5',
+)
+
+# Version 1: The initial schema, with indexes on the identifier columns.
+_CREATE_TABLES = [
+    '''
+    CREATE TABLE IF NOT EXISTS entries (
+        citekey VARCHAR NOT NULL,
+        entry_type VARCHAR,
+        title VARCHAR,
+        year INTEGER,
+        arxiv_id VARCHAR,
+        doi VARCHAR,
+        isbn VARCHAR,
+        pdf_md5 VARCHAR,
+        other_metadata VARCHAR,
+        PRIMARY KEY (citekey)
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS ix_entries_arxiv_id ON entries (arxiv_id)',
+    'CREATE INDEX IF NOT EXISTS ix_entries_doi ON entries (doi)',
+    'CREATE INDEX IF NOT EXISTS ix_entries_isbn ON entries (isbn)',
+    'CREATE INDEX IF NOT EXISTS ix_entries_pdf_md5 ON entries (pdf_md5)',
+    '''
+    CREATE TABLE IF NOT EXISTS authors (
+        id INTEGER NOT NULL,
+        first_name VARCHAR,
+        last_name VARCHAR,
+        entry_id INTEGER,
+        PRIMARY KEY (id),
+        FOREIGN KEY(entry_id) REFERENCES entries (citekey)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS tags (
+        name VARCHAR NOT NULL,
+        entry_id INTEGER,
+        PRIMARY KEY (name),
+        FOREIGN KEY(entry_id) REFERENCES entries (citekey)
+    )
+    ''',
+]
+
+# Version 2: Allow the same tag on several entries and index the foreign keys.
+_FIX_TAGS = [
+    '''
+    CREATE TABLE tags_new (
+        entry_id VARCHAR NOT NULL,
+        name VARCHAR NOT NULL,
+        PRIMARY KEY (entry_id, name),
+        FOREIGN KEY(entry_id) REFERENCES entries (citekey)
+    )
+    ''',
+    '''
+    INSERT OR IGNORE INTO tags_new (entry_id, name)
+    SELECT entry_id, name FROM tags WHERE entry_id IS NOT NULL
+    ''',
+    'DROP TABLE tags',
+    'ALTER TABLE tags_new RENAME TO tags',
+    'CREATE INDEX IF NOT EXISTS ix_authors_entry_id ON authors (entry_id)',
+]
+
+# Version 3: A full-text search index over the titles, authors, tags and notes.
+# The notes aren't in the database, so they are indexed by the backends after
+# migrating.  Each row of the index has the rowid of its entry, so that it can
+# be replaced without scanning the whole index.  (The rowids of the entries
+# don't change since entries are updated and renamed in place.)  The citekey
+# is stored in the index so that search results can be mapped back to the
+# entries.
+_CREATE_SEARCH_INDEX = [
+    '''
+    CREATE VIRTUAL TABLE entries_fts USING fts5(
+        citekey,
+        title,
+        authors,
+        tags,
+        notes,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    ''',
+    '''
+    INSERT INTO entries_fts (entries_fts, rank)
+    VALUES ('rank', 'bm25(2.0, 10.0, 5.0, 5.0, 1.0)')
+    ''',
+    '''
+    INSERT INTO entries_fts (rowid, citekey, title, authors, tags, notes)
+    SELECT
+        rowid,
+        citekey,
+        title,
+        (
+            SELECT group_concat(
+                coalesce(first_name, '') || ' ' || coalesce(last_name, ''),
+                ' '
+            )
+            FROM authors
+            WHERE entry_id = entries.citekey
+        ),
+        (
+            SELECT group_concat(name, ' ')
+            FROM tags
+            WHERE entry_id = entries.citekey
+        ),
+        ''
+    FROM entries
+    ''',
+]
+
+MIGRATIONS = [
+    _CREATE_TABLES,
+    _FIX_TAGS,
+    _CREATE_SEARCH_INDEX,
+]
+
+# The version from which on the search index exists.
+SEARCH_INDEX_VERSION = MIGRATIONS.index(_CREATE_SEARCH_INDEX) + 1
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_schema_version(cursor):
+    """Return the schema version of the database."""
+    try:
+        cursor.execute('SELECT MAX(version) FROM schema_version')
+        row = cursor.fetchone()
+    except sqlite3.OperationalError:
+        # The table doesn't exist yet.
+        return 0
+
+    return row[0] or 0
+
+
+def migrate(connection):
+    """Bring the database up to date, returning the original version.
+
+    This only reads the schema version unless the database is out of date, so
+    it is cheap to call every time the database is opened.
+
+    Args:
+        connection: A DB-API connection to an SQLite database.
+
+    Returns:
+        version: int
+            The schema version of the database before migrating.
+
+    """
+    cursor = connection.cursor()
+    version = get_schema_version(cursor)
+    if version >= SCHEMA_VERSION:
+        return version
+
+    # Take the write lock before checking the version again so that two
+    # processes don't migrate the same database at the same time.
+    cursor.execute('BEGIN IMMEDIATE')
+    try:
+        version = get_schema_version(cursor)
+        for migration in MIGRATIONS[version:]:
+            for statement in migration:
+                cursor.execute(statement)
+
+        cursor.execute(
+            'CREATE TABLE IF NOT EXISTS schema_version '
+            '(version INTEGER NOT NULL)'
+        )
+        cursor.execute('DELETE FROM schema_version')
+        cursor.execute(
+            'INSERT INTO schema_version (version) VALUES (?)',
+            (SCHEMA_VERSION,),
+        )
+    except BaseException:
+        connection.rollback()
+        raise
+    connection.commit()
+
+    return version
+
+
+def split_metadatum(citekey, metadatum):
+    """Split a metadatum into the rows to write to each table.
+
+    Returns:
+        entry: dict
+            The values of the columns of the `entries` table.
+        authors: list or None
+            The `[first_name, last_name]` pairs of the authors, or `None` if
+            the metadatum doesn't specify the authors.
+        tags: list or None
+            The tags, or `None` if the metadatum doesn't specify the tags.
+
+    """
+    entry = {'citekey': citekey}
+    other_metadata = {}
+    for key, value in metadatum.items():
+        if key in ENTRY_COLUMNS:
+            entry[key] = value
+        elif key not in {'citekey', 'authors', 'tags'}:
+            other_metadata[key] = value
+
+    for key in ENTRY_COLUMNS:
+        entry.setdefault(key, None)
+    entry['other_metadata'] = json.dumps(other_metadata)
+
+    authors = None
+    if metadatum.get('authors') is not None:
+        authors = [[elem[0], elem[1]] for elem in metadatum['authors']]
+
+    tags = None
+    if metadatum.get('tags') is not None:
+        # Remove duplicates but keep the order.
+        tags = list(dict.fromkeys(metadatum['tags']))
+
+    return entry, authors, tags
+
+
+def join_metadatum(entry, authors, tags):
+    """Combine the rows of each table into a metadatum.
+
+    This is the inverse of `split_metadatum`.
+
+    Args:
+        entry: dict
+            The values of the columns of the `entries` table.
+        authors: list
+            The `[first_name, last_name]` pairs of the authors.
+        tags: list
+            The tags.
+
+    """
+    metadatum = {
+        'citekey': entry['citekey'],
+        'entry_type': entry['entry_type'],
+        'title': entry['title'],
+        'authors': [list(elem) for elem in authors],
+        'year': entry['year'],
+        'tags': list(tags),
+    }
+    for key in ['arxiv_id', 'doi', 'isbn', 'pdf_md5']:
+        if entry[key] is not None:
+            metadatum[key] = entry[key]
+
+    if entry['other_metadata'] is not None:
+        metadatum.update(**json.loads(entry['other_metadata']))
+    return metadatum
+
+
+# These statements take named parameters so that they can be executed both
+# through `sqlite3` and through `sqlalchemy`.
+DELETE_SEARCH_ENTRY = '''
+    DELETE FROM entries_fts
+    WHERE rowid = (SELECT rowid FROM entries WHERE citekey = :citekey)
+'''
+
+INSERT_SEARCH_ENTRY = '''
+    INSERT INTO entries_fts (rowid, citekey, title, authors, tags, notes)
+    SELECT
+        rowid,
+        citekey,
+        title,
+        (
+            SELECT group_concat(
+                coalesce(first_name, '') || ' ' || coalesce(last_name, ''),
+                ' '
+            )
+            FROM authors
+            WHERE entry_id = :citekey
+        ),
+        (SELECT group_concat(name, ' ') FROM tags WHERE entry_id = :citekey),
+        :notes
+    FROM entries
+    WHERE citekey = :citekey
+'''
+
+SEARCH = '''
+    SELECT citekey FROM entries_fts
+    WHERE entries_fts MATCH :match
+    ORDER BY rank
+    LIMIT :limit
+'''
+
+
+def _quote(term):
+    """Quote a term so that FTS5 treats it as a plain string."""
+    return '"' + term.replace('"', '""') + '"'
+
+
+def search_entry_params(citekey, library_root):
+    """Return the parameters to update the search index for a citekey."""
+    notes = ''
+    notes_path = os.path.join(library_root, citekey, 'notes.md')
+    if os.path.isfile(notes_path):
+        with open(notes_path) as fp:
+            notes = fp.read()
+
+    return {'citekey': citekey, 'notes': notes}
+
+
+def search_params(query, limit):
+    """Return the parameters to search the index.
+
+    Every word in the query must appear in the entry.  The words are quoted so
+    that characters with a special meaning in FTS5 queries are ignored.
+
+    """
+    match = ' '.join(_quote(term) for term in query.split())
+    return {'match': match, 'limit': limit}
+
+
+def find_citekeys_with_notes(library_root):
+    """Yield the citekeys of all the entries with notes."""
+    if not os.path.isdir(library_root):
+        return
+
+    for elem in os.scandir(library_root):
+        if elem.is_dir() and os.path.isfile(
+            os.path.join(elem.path, 'notes.md')
+        ):
+            yield elem.name
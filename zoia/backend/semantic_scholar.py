@@ -0,0 +1,80 @@
+"""Look up papers on Semantic Scholar, many at a time.
+
+Semantic Scholar is queried for the metadata of arXiv papers and for the arXiv
+IDs of DOIs.  Making one request per paper is slow when adding many papers at
+once, especially under Semantic Scholar's rate limit, so the
+`SemanticScholarResolver` first resolves all of the papers with the batch
+endpoint, which accepts up to `BATCH_SIZE` paper IDs per request (see
+`zoia.backend.resolver`).
+
+Paper IDs take the form that Semantic Scholar uses, e.g., `arXiv:1601.00001`
+or `DOI:10.1063/1.4944470`.
+
+"""
+
+import json
+
+from zoia.backend.resolver import BatchResolver
+
+API_URL = 'https://api.semanticscholar.org/graph/v1'
+
+PAPER_FIELDS = 'title,authors,year,externalIds'
+
+# The maximum number of IDs accepted by the batch endpoint.
+BATCH_SIZE = 500
+
+
+def arxiv_paper_id(arxiv_id):
+    return f'arXiv:{arxiv_id}'
+
+
+def doi_paper_id(doi):
+    return f'DOI:{doi}'
+
+
+class SemanticScholarResolver(BatchResolver):
+    """Resolve Semantic Scholar paper IDs with as few requests as possible.
+
+    The papers are cached under the `semantic_scholar` provider.
+
+    """
+
+    provider = 'semantic_scholar'
+    batch_size = BATCH_SIZE
+
+    def __init__(self, session, cache=None, api_url=API_URL):
+        super().__init__(session, cache, api_url)
+
+    def _get_cache_key(self, paper_id):
+        # DOIs are case-insensitive.
+        if paper_id.startswith('DOI:'):
+            return paper_id.lower()
+        return paper_id
+
+    def _get_batch(self, paper_ids):
+        response = self.session.post(
+            f'{self.api_url}/paper/batch',
+            params={'fields': PAPER_FIELDS},
+            json={'ids': paper_ids},
+        )
+        response.raise_for_status()
+        papers = json.loads(response.text)
+        if not isinstance(papers, list) or len(papers) != len(paper_ids):
+            raise ValueError('Received a malformed batch response.')
+
+        # Unknown IDs are `null`.
+        return {
+            paper_id: paper
+            for paper_id, paper in zip(paper_ids, papers)
+            if isinstance(paper, dict)
+        }
+
+    def _get_single(self, paper_id):
+        response = self.session.get(
+            f'{self.api_url}/paper/{paper_id}',
+            params={'fields': PAPER_FIELDS},
+        )
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return json.loads(response.text)
@@ -1,17 +1,19 @@
 """Interface with the SQLite backend."""
 
-import json
 import os
 
 import sqlalchemy
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.declarative import declarative_base
 
 import zoia.backend.metadata
+import zoia.backend.schema
+from zoia.backend.schema import ZOIA_METADATA_FILENAME
 
+# The tables are created and migrated by `zoia.backend.schema`.  The models
+# below must be kept in sync with the latest version of the schema.
 Base = declarative_base()
 
-ZOIA_METADATA_FILENAME = 'metadata.db'
-
 
 class Author(Base):
     """An author for an entry."""
@@ -23,9 +25,13 @@ class Author(Base):
     last_name = sqlalchemy.Column(sqlalchemy.String)
 
     entry_id = sqlalchemy.Column(
-        sqlalchemy.Integer, sqlalchemy.ForeignKey('entries.citekey')
+        sqlalchemy.Integer,
+        sqlalchemy.ForeignKey('entries.citekey'),
+        index=True,
+    )
+    entry = sqlalchemy.orm.relationship(
+        'Entry', backref=sqlalchemy.orm.backref('authors', order_by=id)
     )
-    entry = sqlalchemy.orm.relationship('Entry', backref='authors')
 
 
 class Tag(Base):
@@ -33,11 +39,13 @@ class Tag(Base):
 
     __tablename__ = 'tags'
 
-    name = sqlalchemy.Column(sqlalchemy.String, primary_key=True)
-
     entry_id = sqlalchemy.Column(
-        sqlalchemy.Integer, sqlalchemy.ForeignKey('entries.citekey')
+        sqlalchemy.String,
+        sqlalchemy.ForeignKey('entries.citekey'),
+        primary_key=True,
     )
+    name = sqlalchemy.Column(sqlalchemy.String, primary_key=True)
+
     entry = sqlalchemy.orm.relationship('Entry', backref='tags')
 
 
@@ -50,76 +58,41 @@ class Entry(Base):
     entry_type = sqlalchemy.Column(sqlalchemy.String)
     title = sqlalchemy.Column(sqlalchemy.String)
     year = sqlalchemy.Column(sqlalchemy.Integer)
-    arxiv_id = sqlalchemy.Column(sqlalchemy.String)
-    doi = sqlalchemy.Column(sqlalchemy.String)
-    isbn = sqlalchemy.Column(sqlalchemy.String)
-    pdf_md5 = sqlalchemy.Column(sqlalchemy.String)
+    # The identifiers are looked up every time a document is added to check for
+    # duplicates, so they are indexed.  The indexes are deliberately not unique
+    # since hand-edited libraries may already contain duplicates.
+    arxiv_id = sqlalchemy.Column(sqlalchemy.String, index=True)
+    doi = sqlalchemy.Column(sqlalchemy.String, index=True)
+    isbn = sqlalchemy.Column(sqlalchemy.String, index=True)
+    pdf_md5 = sqlalchemy.Column(sqlalchemy.String, index=True)
 
     # This contains a JSON-serialized dictionary of other data not included
     # above.
     other_metadata = sqlalchemy.Column(sqlalchemy.String)
 
     def to_dict(self):
+        entry = {
+            column.name: getattr(self, column.name)
+            for column in self.__table__.columns
+        }
         authors = [
             [author.first_name, author.last_name] for author in self.authors
         ]
-        tags = [elem.id for elem in self.tags]
-
-        dictionary = {
-            'citekey': self.citekey,
-            'entry_type': self.entry_type,
-            'title': self.title,
-            'authors': authors,
-            'year': self.year,
-            'tags': tags,
-        }
-        for key in ['arxiv_id', 'doi', 'isbn', 'pdf_md5']:
-            if getattr(self, key) is not None:
-                dictionary[key] = getattr(self, key)
-
-        if self.other_metadata is not None:
-            dictionary.update(**json.loads(self.other_metadata))
-        return dictionary
+        tags = [elem.name for elem in self.tags]
+        return zoia.backend.schema.join_metadatum(entry, authors, tags)
 
     @classmethod
     def from_dict(cls, citekey, dictionary):
-        keys = {
-            'entry_type',
-            'title',
-            'year',
-            'arxiv_id',
-            'doi',
-            'isbn',
-            'pdf_md5',
-        }
-        other_metadata_dict = {
-            key: val for key, val in dictionary.items() if key not in keys
-        }
-        other_metadata = json.dumps(other_metadata_dict)
-        if 'authors' in dictionary:
-            authors = [
-                Author(first_name=elem[0], last_name=elem[1])
-                for elem in dictionary['authors']
-            ]
-        else:
-            authors = None
-
-        tags = []
-        if 'tags' in dictionary:
-            tags = tags.extend([Tag(name=elem) for elem in dictionary['tags']])
-
+        entry, authors, tags = zoia.backend.schema.split_metadatum(
+            citekey, dictionary
+        )
         return cls(
-            citekey=citekey,
-            entry_type=dictionary.get('entry_type'),
-            title=dictionary.get('title'),
-            year=dictionary.get('year'),
-            arxiv_id=dictionary.get('arxiv_id'),
-            doi=dictionary.get('doi'),
-            isbn=dictionary.get('isbn'),
-            pdf_md5=dictionary.get('pdf_md5'),
-            authors=authors,
-            tags=tags,
-            other_metadata=other_metadata,
+            authors=[
+                Author(first_name=first_name, last_name=last_name)
+                for first_name, last_name in authors or []
+            ],
+            tags=[Tag(name=elem) for elem in tags or []],
+            **entry,
         )
 
 
@@ -136,9 +109,31 @@ class SQLiteMetadata(zoia.backend.metadata.Metadata):
         self.engine = sqlalchemy.create_engine(
             'sqlite:///' + self.metadata_filename
         )
-        Base.metadata.create_all(self.engine)
+        sqlalchemy.event.listen(self.engine, 'connect', self._apply_pragmas)
+        old_version = self._migrate()
 
         self.session = sqlalchemy.orm.sessionmaker(bind=self.engine)()
+        if old_version < zoia.backend.schema.SEARCH_INDEX_VERSION:
+            self._index_notes()
+
+    def _apply_pragmas(self, dbapi_connection, connection_record):
+        """Tune each new connection according to the configuration."""
+        cursor = dbapi_connection.cursor()
+        for statement in self.config.sqlite_pragmas.to_statements():
+            cursor.execute(statement)
+        cursor.close()
+
+    def _migrate(self):
+        """Create the tables or bring an existing schema up to date.
+
+        Returns the version of the schema before migrating.
+
+        """
+        connection = self.engine.raw_connection()
+        try:
+            return zoia.backend.schema.migrate(connection)
+        finally:
+            connection.close()
 
     def __contains__(self, citekey):
         """Determine whether the citekey exists in the library."""
@@ -151,27 +146,140 @@ class SQLiteMetadata(zoia.backend.metadata.Metadata):
         return entry.to_dict()
 
     def __setitem__(self, citekey, metadatum):
-        """Set the metadata for a citekey."""
-        new_entry = Entry.from_dict(citekey, metadatum)
-        if citekey in self:
-            query = self.session.query(Entry).filter_by(citekey=citekey)
-            entry = query.first()
-            columns = entry.__table__.columns.keys()
-            update_dict = {
-                column: getattr(new_entry, column) for column in columns
-            }
-            query.update(update_dict)
-        else:
-            self.session.add(new_entry)
+        """Set the metadata for a citekey.
+
+        The entry is written with a single `INSERT ... ON CONFLICT DO UPDATE`
+        rather than by loading the existing entry first.  If the metadatum
+        specifies the authors or the tags they replace the existing ones.
+
+        """
+        entry, authors, tags = zoia.backend.schema.split_metadatum(
+            citekey, metadatum
+        )
+
+        statement = sqlite_insert(Entry.__table__).values(**entry)
+        statement = statement.on_conflict_do_update(
+            index_elements=['citekey'],
+            set_={
+                key: statement.excluded[key]
+                for key in entry
+                if key != 'citekey'
+            },
+        )
+        self.session.execute(statement)
+
+        if authors is not None:
+            self.session.execute(
+                sqlalchemy.delete(Author.__table__).where(
+                    Author.entry_id == citekey
+                )
+            )
+            if authors:
+                self.session.execute(
+                    sqlalchemy.insert(Author.__table__),
+                    [
+                        {
+                            'first_name': first_name,
+                            'last_name': last_name,
+                            'entry_id': citekey,
+                        }
+                        for first_name, last_name in authors
+                    ],
+                )
+
+        if tags is not None:
+            self.session.execute(
+                sqlalchemy.delete(Tag.__table__).where(Tag.entry_id == citekey)
+            )
+            if tags:
+                self.session.execute(
+                    sqlalchemy.insert(Tag.__table__),
+                    [{'name': tag, 'entry_id': citekey} for tag in tags],
+                )
+
+        self._update_search_index(citekey)
+
+        # Entries that were already loaded by the session are now stale.
+        self.session.expire_all()
+        self._commit()
+
+    def _update_search_index(self, citekey):
+        """Replace the row of the search index for a citekey."""
+        params = zoia.backend.schema.search_entry_params(
+            citekey, self.config.library_root
+        )
+        self.session.execute(
+            sqlalchemy.text(zoia.backend.schema.DELETE_SEARCH_ENTRY), params
+        )
+        self.session.execute(
+            sqlalchemy.text(zoia.backend.schema.INSERT_SEARCH_ENTRY), params
+        )
+
+    def update_search_index(self, citekey):
+        self._update_search_index(citekey)
+        self._commit()
+
+    def _index_notes(self):
+        """Add the notes of existing entries to a new search index."""
+        for citekey in zoia.backend.schema.find_citekeys_with_notes(
+            self.config.library_root
+        ):
+            if citekey in self:
+                self._update_search_index(citekey)
+        self.session.commit()
+
+    def search(self, query, limit=20):
+        params = zoia.backend.schema.search_params(query, limit)
+        if not params['match']:
+            return []
+
+        rows = self.session.execute(
+            sqlalchemy.text(zoia.backend.schema.SEARCH), params
+        )
+        return [row.citekey for row in rows]
+
+    def _commit(self):
+        """Commit the session unless the changes are being deferred."""
+        if not self.in_transaction:
+            self.session.commit()
+
+    def _begin_transaction(self):
+        # The session implicitly begins a new database transaction, so there
+        # is nothing to do here.
+        pass
+
+    def _commit_transaction(self):
         self.session.commit()
 
+    def _rollback_transaction(self):
+        self.session.rollback()
+
     def write(self):
         self.session.commit()
 
     def rename_key(self, old_key, new_key):
         query = self.session.query(Entry).filter_by(citekey=old_key)
         query.update({'citekey': new_key})
-        self.session.commit()
+        for table in [Author.__table__, Tag.__table__]:
+            self.session.execute(
+                sqlalchemy.update(table)
+                .where(table.c.entry_id == old_key)
+                .values(entry_id=new_key)
+            )
+        # The row of the search index is found by the entry's rowid, which
+        # doesn't change.
+        self._update_search_index(new_key)
+        self.session.expire_all()
+        self._commit()
+
+    def find_citekey(self, field, value):
+        row = (
+            self.session.query(Entry.citekey)
+            .filter_by(**{field: value})
+            .order_by(Entry.citekey)
+            .first()
+        )
+        return row.citekey if row is not None else None
 
     def arxiv_id_exists(self, arxiv_id):
         row = self.session.query(Entry).filter_by(arxiv_id=arxiv_id).first()
@@ -0,0 +1,207 @@
+"""Interface with the SQLite backend using only the standard library.
+
+This backend reads and writes the same database as `zoia.backend.sqlite`, so
+the two are interchangeable, but it talks to SQLite directly through the
+`sqlite3` module instead of going through `sqlalchemy`.  This avoids the cost
+of importing and setting up the ORM, which dominates the runtime of most `zoia`
+commands.  The SQL statements are module-level constants so that `sqlite3`'s
+statement cache only has to prepare each of them once per connection.
+
+"""
+
+import os
+import sqlite3
+
+import zoia.backend.metadata
+import zoia.backend.schema
+from zoia.backend.metadata import IDENTIFIER_FIELDS
+from zoia.backend.schema import ENTRY_COLUMNS
+from zoia.backend.schema import ZOIA_METADATA_FILENAME
+
+_ENTRY_COLUMNS = ('citekey',) + ENTRY_COLUMNS + ('other_metadata',)
+
+_SELECT_ENTRY = (
+    f'SELECT {", ".join(_ENTRY_COLUMNS)} FROM entries WHERE citekey = ?'
+)
+_SELECT_AUTHORS = (
+    'SELECT first_name, last_name FROM authors WHERE entry_id = ? ORDER BY id'
+)
+_SELECT_TAGS = 'SELECT name FROM tags WHERE entry_id = ? ORDER BY rowid'
+_CONTAINS_ENTRY = 'SELECT 1 FROM entries WHERE citekey = ?'
+
+_UPSERT_ENTRY = (
+    f'INSERT INTO entries ({", ".join(_ENTRY_COLUMNS)}) '
+    f'VALUES ({", ".join(":" + column for column in _ENTRY_COLUMNS)}) '
+    f'ON CONFLICT(citekey) DO UPDATE SET '
+    + ', '.join(
+        f'{column} = excluded.{column}' for column in _ENTRY_COLUMNS[1:]
+    )
+)
+_DELETE_AUTHORS = 'DELETE FROM authors WHERE entry_id = ?'
+_INSERT_AUTHOR = (
+    'INSERT INTO authors (first_name, last_name, entry_id) VALUES (?, ?, ?)'
+)
+_DELETE_TAGS = 'DELETE FROM tags WHERE entry_id = ?'
+_INSERT_TAG = 'INSERT INTO tags (name, entry_id) VALUES (?, ?)'
+
+_RENAME_ENTRY = 'UPDATE entries SET citekey = ? WHERE citekey = ?'
+_RENAME_AUTHORS = 'UPDATE authors SET entry_id = ? WHERE entry_id = ?'
+_RENAME_TAGS = 'UPDATE tags SET entry_id = ? WHERE entry_id = ?'
+
+_FIND_CITEKEY = {
+    field: (
+        f'SELECT citekey FROM entries WHERE {field} = ? '
+        f'ORDER BY citekey LIMIT 1'
+    )
+    for field in IDENTIFIER_FIELDS
+}
+
+
+class SQLite3Metadata(zoia.backend.metadata.Metadata):
+    """A class to interact with the SQLite backend without an ORM."""
+
+    def __init__(self, config):
+        """Open the library metadata database."""
+
+        self.config = config
+        self.metadata_filename = os.path.join(
+            config.db_root, ZOIA_METADATA_FILENAME
+        )
+
+        # Transactions are managed explicitly rather than by `sqlite3`.
+        self.connection = sqlite3.connect(
+            self.metadata_filename, isolation_level=None
+        )
+        for statement in config.sqlite_pragmas.to_statements():
+            self.connection.execute(statement)
+
+        old_version = zoia.backend.schema.migrate(self.connection)
+        if old_version < zoia.backend.schema.SEARCH_INDEX_VERSION:
+            self._index_notes()
+
+    def __contains__(self, citekey):
+        """Determine whether the citekey exists in the library."""
+        row = self.connection.execute(_CONTAINS_ENTRY, (citekey,)).fetchone()
+        return row is not None
+
+    def __getitem__(self, citekey):
+        """Load the metadata for a citekey."""
+        row = self.connection.execute(_SELECT_ENTRY, (citekey,)).fetchone()
+        if row is None:
+            raise KeyError(citekey)
+
+        entry = dict(zip(_ENTRY_COLUMNS, row))
+        authors = self.connection.execute(_SELECT_AUTHORS, (citekey,))
+        tags = self.connection.execute(_SELECT_TAGS, (citekey,))
+        return zoia.backend.schema.join_metadatum(
+            entry, authors.fetchall(), [elem[0] for elem in tags]
+        )
+
+    def __setitem__(self, citekey, metadatum):
+        """Set the metadata for a citekey.
+
+        If the metadatum specifies the authors or the tags they replace the
+        existing ones.
+
+        """
+        entry, authors, tags = zoia.backend.schema.split_metadatum(
+            citekey, metadatum
+        )
+        with self.transaction():
+            self.connection.execute(_UPSERT_ENTRY, entry)
+            if authors is not None:
+                self.connection.execute(_DELETE_AUTHORS, (citekey,))
+                self.connection.executemany(
+                    _INSERT_AUTHOR,
+                    [
+                        (first_name, last_name, citekey)
+                        for first_name, last_name in authors
+                    ],
+                )
+            if tags is not None:
+                self.connection.execute(_DELETE_TAGS, (citekey,))
+                self.connection.executemany(
+                    _INSERT_TAG, [(tag, citekey) for tag in tags]
+                )
+            self.update_search_index(citekey)
+
+    def update_search_index(self, citekey):
+        params = zoia.backend.schema.search_entry_params(
+            citekey, self.config.library_root
+        )
+        with self.transaction():
+            self.connection.execute(
+                zoia.backend.schema.DELETE_SEARCH_ENTRY, params
+            )
+            self.connection.execute(
+                zoia.backend.schema.INSERT_SEARCH_ENTRY, params
+            )
+
+    def _index_notes(self):
+        """Add the notes of existing entries to a new search index."""
+        with self.transaction():
+            for citekey in zoia.backend.schema.find_citekeys_with_notes(
+                self.config.library_root
+            ):
+                if citekey in self:
+                    self.update_search_index(citekey)
+
+    def search(self, query, limit=20):
+        params = zoia.backend.schema.search_params(query, limit)
+        if not params['match']:
+            return []
+
+        rows = self.connection.execute(zoia.backend.schema.SEARCH, params)
+        return [row[0] for row in rows]
+
+    def _begin_transaction(self):
+        self.connection.execute('BEGIN IMMEDIATE')
+
+    def _commit_transaction(self):
+        self.connection.commit()
+
+    def _rollback_transaction(self):
+        self.connection.rollback()
+
+    def write(self):
+        """Write the metadata for the library to disk.
+
+        Every change is committed as soon as it is made (or at the end of a
+        transaction), so there is nothing left to write.
+
+        """
+
+    def rename_key(self, old_key, new_key):
+        """Rename a citekey in the metadata."""
+        if new_key in self:
+            raise KeyError(f'Key {new_key} is already present.')
+
+        with self.transaction():
+            for statement in [_RENAME_ENTRY, _RENAME_AUTHORS, _RENAME_TAGS]:
+                self.connection.execute(statement, (new_key, old_key))
+            # The row of the search index is found by the entry's rowid, which
+            # doesn't change.
+            self.update_search_index(new_key)
+
+    def find_citekey(self, field, value):
+        """Return the citekey of the entry with the given identifier."""
+        row = self.connection.execute(
+            _FIND_CITEKEY[field], (value,)
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    def arxiv_id_exists(self, arxiv_id):
+        """Determine whether the arXiv identifier exists in the library."""
+        return self.find_citekey('arxiv_id', arxiv_id) is not None
+
+    def isbn_exists(self, isbn):
+        """Determine whether the ISBN exists in the library."""
+        return self.find_citekey('isbn', isbn) is not None
+
+    def doi_exists(self, doi):
+        """Determine whether the DOI exists in the library."""
+        return self.find_citekey('doi', doi) is not None
+
+    def pdf_md5_hash_exists(self, pdf_md5):
+        """Determine whether a PDF with the MD5 hash exists in the library."""
+        return self.find_citekey('pdf_md5', pdf_md5) is not None
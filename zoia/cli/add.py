@@ -5,23 +5,35 @@ import sys
 import click
 
 import zoia.backend.add
+import zoia.backend.config
 from zoia.backend.add import ZoiaAddException
 
 
-@click.command()
-@click.argument('identifier', required=True)
-@click.option(
-    '--citekey',
-    type=str,
-    default=None,
-    help='Specify the BibTex citation key.',
-)
-def add(identifier, citekey):
-    config = zoia.backend.config.load_config()
+def _read_identifiers(fp):
+    """Read identifiers from a file with one identifier per line.
+
+    Blank lines and lines starting with `#` are ignored.
+
+    """
+    identifiers = []
+    for line in fp:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            identifiers.append(line)
+    return identifiers
+
 
+def _format_timings(timings):
+    return ', '.join(
+        f'{stage} {seconds:.2f}s' for stage, seconds in timings.items()
+    )
+
+
+def _add_one(config, identifier, citekey, use_cache, show_timings):
+    timings = {} if show_timings else None
     try:
         citekey, metadatum, info_messages = zoia.backend.add.add(
-            config, identifier, citekey
+            config, identifier, citekey, use_cache=use_cache, timings=timings
         )
         for message in info_messages:
             click.secho(message)
@@ -31,3 +43,89 @@ def add(identifier, citekey):
 
     click.secho(f'Success! Added {citekey}:', fg='blue')
     click.secho(f'    {str(metadatum)}', fg='blue')
+    if timings:
+        click.secho(f'Timings: {_format_timings(timings)}')
+
+
+def _add_many(config, identifiers, jobs, use_cache, show_timings):
+    n_added = 0
+    n_failed = 0
+    results = zoia.backend.add.add_many(
+        config, identifiers, jobs=jobs, use_cache=use_cache
+    )
+    for result in results:
+        if result.error is not None:
+            n_failed += 1
+            click.secho(f'{result.identifier}: {result.error}', fg='red')
+            continue
+
+        n_added += 1
+        for message in result.info_messages:
+            click.secho(f'{result.identifier}: {message}')
+        click.secho(
+            f'Added {result.citekey}: {str(result.metadatum)}', fg='blue'
+        )
+        if show_timings and result.timings:
+            click.secho(
+                f'{result.identifier}: {_format_timings(result.timings)}'
+            )
+
+    click.secho(f'Added {n_added} documents, {n_failed} failed.')
+    if n_failed:
+        sys.exit(1)
+
+
+@click.command()
+@click.argument('identifiers', nargs=-1)
+@click.option(
+    '--citekey',
+    type=str,
+    default=None,
+    help='Specify the BibTex citation key.',
+)
+@click.option(
+    '-f',
+    '--file',
+    'identifier_file',
+    type=click.File('r'),
+    default=None,
+    help='Read identifiers from a file, one per line.  Use "-" for stdin.',
+)
+@click.option(
+    '-j',
+    '--jobs',
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    help='The number of documents to fetch at the same time.',
+)
+@click.option(
+    '--no-cache',
+    is_flag=True,
+    default=False,
+    help='Query the metadata providers even if the responses are cached.',
+)
+@click.option(
+    '--timings',
+    is_flag=True,
+    default=False,
+    help='Show how long each stage of fetching a document took.',
+)
+def add(identifiers, citekey, identifier_file, jobs, no_cache, timings):
+    """Add one or more documents to the library."""
+    identifiers = list(identifiers)
+    if identifier_file is not None:
+        identifiers.extend(_read_identifiers(identifier_file))
+
+    if not identifiers:
+        raise click.UsageError('No identifiers given.')
+    if citekey is not None and len(identifiers) > 1:
+        raise click.UsageError(
+            '--citekey can only be used when adding a single document.'
+        )
+
+    config = zoia.backend.config.load_config()
+    if len(identifiers) == 1:
+        _add_one(config, identifiers[0], citekey, not no_cache, timings)
+    else:
+        _add_many(config, identifiers, jobs, not no_cache, timings)
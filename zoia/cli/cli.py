@@ -1,26 +1,50 @@
 """Entry-point to the zoia CLI."""
 
+import importlib
+
 import click
 
-from zoia.cli.add import add
-from zoia.cli.config import config
-from zoia.cli.edit import edit
-from zoia.cli.init import init
-from zoia.cli.note import note
-from zoia.cli.open import open_
-from zoia.cli.tag import tag
+# Subcommands are only imported when they are invoked.  Several of them pull in
+# heavy dependencies (e.g., `requests`, `sqlalchemy`, `pdfminer`) that would
+# otherwise dominate the startup time of quick commands like `zoia open`.
+SUBCOMMANDS = {
+    'add': 'zoia.cli.add:add',
+    'config': 'zoia.cli.config:config',
+    'download': 'zoia.cli.download:download',
+    'edit': 'zoia.cli.edit:edit',
+    'find': 'zoia.cli.find:find',
+    'import': 'zoia.cli.import_:import_',
+    'init': 'zoia.cli.init:init',
+    'note': 'zoia.cli.note:note',
+    'open': 'zoia.cli.open:open_',
+    'tag': 'zoia.cli.tag:tag',
+}
+
+
+class LazyGroup(click.Group):
+    """A `click` group that only imports a subcommand when it is needed."""
+
+    def __init__(self, *args, lazy_subcommands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_subcommands = lazy_subcommands or {}
+
+    def list_commands(self, ctx):
+        return sorted(
+            set(super().list_commands(ctx)) | set(self.lazy_subcommands)
+        )
 
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.lazy_subcommands:
+            return self._load_command(cmd_name)
+        return super().get_command(ctx, cmd_name)
 
-@click.group()
+    def _load_command(self, cmd_name):
+        module_name, attribute = self.lazy_subcommands[cmd_name].split(':')
+        module = importlib.import_module(module_name)
+        return getattr(module, attribute)
+
+
+@click.group(cls=LazyGroup, lazy_subcommands=SUBCOMMANDS)
 @click.version_option()
 def zoia():
     """The main entry point into `zoia`."""
-
-
-zoia.add_command(add)
-zoia.add_command(config)
-zoia.add_command(edit)
-zoia.add_command(init)
-zoia.add_command(note)
-zoia.add_command(open_)
-zoia.add_command(tag)
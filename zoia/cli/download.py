@@ -0,0 +1,33 @@
+"""Download the document of an entry."""
+
+import sys
+
+import click
+
+import zoia.backend.config
+import zoia.backend.download
+from zoia.backend.download import ZoiaDownloadException
+
+
+@click.command()
+@click.argument('citekey', required=True)
+@click.option(
+    '--force',
+    is_flag=True,
+    default=False,
+    help='Download the document again even if it already exists.',
+)
+def download(citekey, force):
+    """Download the document of an entry.
+
+    An interrupted download is continued where it stopped.
+
+    """
+    config = zoia.backend.config.load_config()
+    try:
+        zoia.backend.download.download_document(config, citekey, force=force)
+    except ZoiaDownloadException as e:
+        click.secho(str(e), fg='red')
+        sys.exit(1)
+
+    click.secho(f'Downloaded the document of {citekey}.', fg='blue')
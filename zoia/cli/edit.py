@@ -5,6 +5,7 @@ import sys
 
 import click
 
+import zoia.backend.config
 import zoia.backend.metadata
 from zoia.backend.metadata import Metadatum
 from zoia.parse import yaml as zoia_yaml
@@ -0,0 +1,33 @@
+"""Search the library."""
+
+import sys
+
+import click
+
+import zoia.backend.config
+import zoia.backend.metadata
+
+
+@click.command()
+@click.argument('query', nargs=-1, required=True)
+@click.option(
+    '-n',
+    '--limit',
+    type=int,
+    default=20,
+    show_default=True,
+    help='The maximum number of results to show.',
+)
+def find(query, limit):
+    """Search the titles, authors, tags, and notes of the library."""
+    config = zoia.backend.config.load_config()
+    metadata = zoia.backend.metadata.get_metadata(config)
+
+    citekeys = metadata.search(' '.join(query), limit=limit)
+    if not citekeys:
+        click.secho('No matching documents found.', fg='red')
+        sys.exit(1)
+
+    for citekey in citekeys:
+        title = metadata[citekey].get('title') or ''
+        click.echo(f'{click.style(citekey, bold=True)}: {title}')
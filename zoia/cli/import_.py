@@ -0,0 +1,89 @@
+"""Import directories of PDFs into the library."""
+
+import sys
+
+import click
+
+import zoia.backend.add
+import zoia.backend.config
+
+
+def _report(results, action):
+    n_added = 0
+    n_failed = 0
+    n_queued = 0
+    for result in results:
+        if result.error is not None:
+            n_failed += 1
+            click.secho(f'{result.identifier}: {result.error}', fg='red')
+        elif result.review_reason is not None:
+            n_queued += 1
+            click.secho(
+                f'{result.identifier}: Queued for review: '
+                f'{result.review_reason}',
+                fg='yellow',
+            )
+        else:
+            n_added += 1
+            for message in result.info_messages:
+                click.secho(f'{result.identifier}: {message}')
+            click.secho(
+                f'Added {result.citekey}: {str(result.metadatum)}', fg='blue'
+            )
+
+    summary = f'{action} {n_added} documents, {n_failed} failed'
+    if n_queued:
+        summary += (
+            f', {n_queued} queued for review.  Run `zoia import --review` to '
+            f'add them'
+        )
+    click.secho(summary + '.')
+    if n_failed:
+        sys.exit(1)
+
+
+@click.command(name='import')
+@click.argument(
+    'directory',
+    required=False,
+    type=click.Path(exists=True, file_okay=False),
+)
+@click.option(
+    '--review',
+    is_flag=True,
+    default=False,
+    help='Add the PDFs that were queued for review by an earlier import.',
+)
+@click.option(
+    '-j',
+    '--jobs',
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    help='The number of documents to fetch at the same time.',
+)
+@click.option(
+    '--no-cache',
+    is_flag=True,
+    default=False,
+    help='Query the metadata providers even if the responses are cached.',
+)
+def import_(directory, review, jobs, no_cache):
+    """Add all of the PDFs in a directory to the library.
+
+    The PDFs whose metadata can't be found are queued for review instead of
+    asking for them.  Add them later with `zoia import --review`.
+
+    """
+    if review == (directory is not None):
+        raise click.UsageError('Give either a directory or --review.')
+
+    config = zoia.backend.config.load_config()
+    if review:
+        results = zoia.backend.add.review_pdfs(config, use_cache=not no_cache)
+        _report(results, 'Reviewed')
+    else:
+        results = zoia.backend.add.import_pdfs(
+            config, directory, jobs=jobs, use_cache=not no_cache
+        )
+        _report(results, 'Added')
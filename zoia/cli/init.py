@@ -6,6 +6,7 @@ from pathlib import Path
 import click
 
 import zoia
+import zoia.backend.config
 import zoia.backend.metadata
 
 
@@ -7,6 +7,7 @@ import yaml
 import click
 
 import zoia.backend.config
+import zoia.backend.metadata
 import zoia.parse.yaml as zoia_yaml
 
 
@@ -76,5 +77,8 @@ def note(citekey):
                         fp.write(text)
         else:
             click.secho('No input recorded. Nothing saved.', fg='red')
+            return
 
         break
+
+    metadata.update_search_index(citekey)
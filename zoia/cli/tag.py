@@ -4,6 +4,7 @@ import sys
 
 import click
 
+import zoia.backend.config
 import zoia.backend.metadata
 
 
@@ -1,9 +1,59 @@
 """Functionality to interact with PDFs."""
 
+import io
 import os
 import re
+import time
+from contextlib import ExitStack
+from dataclasses import dataclass
 
-from pdfminer.high_level import extract_text
+from pdfminer.converter import TextConverter
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdfinterp import PDFPageInterpreter
+from pdfminer.pdfinterp import PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser
+from pdfminer.pdftypes import resolve1
+from pdfminer.pdftypes import PDFStream
+from pdfminer.utils import decode_text
+
+import zoia.parse.arxiv
+import zoia.parse.classification
+import zoia.parse.doi
+import zoia.parse.isbn
+
+# Finds all of the kinds of identifiers in a single pass over the text.  DOIs
+# in the text of a PDF need a prefix since the references are full of bare
+# DOIs, but the metadata of a PDF often have bare DOIs.
+_IDENTIFIER_REGEX = re.compile(
+    r'(?:doi:\s*|doi\.org/)(?P<doi>10\.[1-9][0-9]{3}[^\s/"<>]*/[^\s"<>]+)'
+    r'|(?P<bare_doi>\b10\.[1-9][0-9]{3}[^\s/"<>]*/[^\s"<>]+)'
+    r'|arxiv:\s*(?P<arxiv>[0-9]{4}\.[0-9]{4,5}(?:v[0-9]+)?'
+    r'|[a-z\-]+(?:\.[a-z\-]+)?/[0-9]{7}(?:v[0-9]+)?)'
+    r'|isbn(?:-1[03])?:?\s*(?P<isbn>[0-9][0-9\-]{8,15}[0-9x])',
+    re.IGNORECASE,
+)
+
+# How much each kind of identifier counts towards the score of a candidate.
+# DOIs and arXiv IDs identify the document itself, whereas a book may list
+# the ISBNs of several editions.
+_TYPE_SCORES = {'doi': 3, 'arxiv': 2, 'isbn': 1}
+
+# Identifiers in the metadata of a PDF are put there on purpose, so they win
+# over identifiers in the text.
+_METADATA_SCORE = 10
+
+
+@dataclass
+class IdentifierCandidate:
+    """An identifier found in a PDF."""
+
+    id_type: 'zoia.parse.classification.IdType'
+    # The normalized identifier.
+    identifier: str
+    score: int
+    # Either `'metadata'` or `'text'`.
+    source: str
 
 
 def is_pdf(identifier):
@@ -20,25 +70,172 @@ def is_pdf(identifier):
         return fp.read(4) == b'%PDF'
 
 
-def get_doi_from_pdf(pdf_file):
-    """Try to figure out the DOI of a paper from its PDF.
+def _clean_doi(doi):
+    """Remove punctuation that follows a DOI in running text."""
+    doi = doi.rstrip('.,;')
+    while doi.endswith(')') and doi.count(')') > doi.count('('):
+        doi = doi[:-1].rstrip('.,;')
+    return doi
+
+
+def _scan(text, allow_bare_doi=False):
+    """Yield the valid `(id_type, identifier)` pairs in the text."""
+    IdType = zoia.parse.classification.IdType
+    for match in _IDENTIFIER_REGEX.finditer(text):
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'bare_doi' and not allow_bare_doi:
+            continue
+
+        if kind in {'doi', 'bare_doi'}:
+            value = _clean_doi(value)
+            if zoia.parse.doi.is_doi(value):
+                yield IdType.DOI, zoia.parse.doi.normalize(value)
+        elif kind == 'arxiv':
+            if zoia.parse.arxiv.is_arxiv(value):
+                yield IdType.ARXIV, zoia.parse.arxiv.normalize(value)
+        elif kind == 'isbn':
+            if zoia.parse.isbn.is_isbn(value):
+                yield IdType.ISBN, zoia.parse.isbn.normalize(value)
+
+
+def _get_metadata_texts(document):
+    """Yield the text of the Info dictionary and the XMP metadata."""
+    for info in document.info:
+        for key, value in info.items():
+            value = resolve1(value)
+            if isinstance(value, bytes):
+                value = decode_text(value)
+            if isinstance(value, str):
+                yield f'{key}: {value}'
+
+    xmp = resolve1(document.catalog.get('Metadata'))
+    if isinstance(xmp, PDFStream):
+        yield xmp.get_data().decode('utf-8', errors='replace')
+
+
+def _get_pages_to_search(document, max_pages, search_last_page):
+    """Yield the first `max_pages` pages and possibly the last page.
+
+    Finding the last page only walks the page tree, which is cheap compared to
+    extracting the text of the pages in between.
+
+    """
+    page = None
+    for i_page, page in enumerate(PDFPage.create_pages(document)):
+        if i_page < max_pages:
+            yield page
+
+    if search_last_page and page is not None and i_page >= max_pages:
+        yield page
+
+
+def _get_page_texts(document, max_pages, timeout, search_last_page):
+    """Yield the text of the pages to search until the time is up.
 
-    This will do a basic search through the PDF to find any instances of a
-    string like 'doi:10.XXXX/XXXXXX' in the document.  This will return the
-    first valid DOI found.
+    The text is extracted without layout analysis since we only need the
+    words.
+
+    """
+    deadline = time.monotonic() + timeout
+    resource_manager = PDFResourceManager()
+    output = io.StringIO()
+    with TextConverter(resource_manager, output, laparams=None) as device:
+        interpreter = PDFPageInterpreter(resource_manager, device)
+        for page in _get_pages_to_search(
+            document, max_pages, search_last_page
+        ):
+            if time.monotonic() > deadline:
+                return
+
+            output.seek(0)
+            output.truncate()
+            interpreter.process_page(page)
+            yield output.getvalue()
+
+
+def _rank(found, source):
+    """Score the identifiers found in one source.
+
+    Identifiers that appear more often score higher.
+
+    """
+    candidates = {}
+    for id_type, identifier in found:
+        candidate = candidates.get((id_type, identifier))
+        if candidate is None:
+            score = _TYPE_SCORES[id_type.value]
+            if source == 'metadata':
+                score += _METADATA_SCORE
+            candidates[id_type, identifier] = IdentifierCandidate(
+                id_type, identifier, score, source
+            )
+        else:
+            candidate.score += 1
+
+    return list(candidates.values())
+
+
+def find_identifiers(
+    pdf_file, max_pages=5, timeout=10.0, search_last_page=True
+):
+    """Find the identifiers of a document in its PDF.
+
+    Looks for DOIs, arXiv IDs, and ISBNs in the PDF's metadata (the Info
+    dictionary and XMP) first since that doesn't require extracting any text.
+    Only if there are none there are the pages searched one at a time.  The
+    search stops at the first page with an identifier.
 
     Args:
         pdf_file: str or file-like object
             Either the PDF filename or a file-like object with the PDF.
+        max_pages: int
+            The number of pages to search from the front of the PDF.
+        timeout: float
+            Stop searching after this many seconds.  This is checked between
+            pages.
+        search_last_page: bool
+            Whether to also search the last page.
 
     Returns:
-        doi: str
-            The DOI.
+        candidates: list of IdentifierCandidate
+            The valid identifiers that were found with the most likely
+            identifier of the document first.
+
+    """
+    with ExitStack() as stack:
+        if isinstance(pdf_file, (str, os.PathLike)):
+            pdf_file = stack.enter_context(open(pdf_file, 'rb'))
+
+        document = PDFDocument(PDFParser(pdf_file))
+
+        found = []
+        for text in _get_metadata_texts(document):
+            found.extend(_scan(text, allow_bare_doi=True))
+        candidates = _rank(found, 'metadata')
+
+        if not candidates:
+            for text in _get_page_texts(
+                document, max_pages, timeout, search_last_page
+            ):
+                candidates = _rank(_scan(text), 'text')
+                if candidates:
+                    break
+
+    return sorted(candidates, key=lambda elem: elem.score, reverse=True)
+
+
+def get_doi_from_pdf(
+    pdf_file, max_pages=5, timeout=10.0, search_last_page=True
+):
+    """Try to figure out the DOI of a paper from its PDF.
+
+    Returns the most likely DOI found by `find_identifiers` or `None`.
 
     """
-    text = extract_text(pdf_file)
-    pattern = re.compile(
-        r'(doi:\s*)(10\.[1-9][0-9]{3}[^\s]*/[^\s]*)', re.IGNORECASE
-    )
-    match = pattern.search(text)
-    return match.groups()[1] if match is not None else None
+    for candidate in find_identifiers(
+        pdf_file, max_pages, timeout, search_last_page
+    ):
+        if candidate.id_type == zoia.parse.classification.IdType.DOI:
+            return candidate.identifier
+    return None